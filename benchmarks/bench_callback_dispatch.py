@@ -0,0 +1,148 @@
+"""
+Микробенчмарк выбора обработчика нажатия инлайн-кнопки.
+
+Сравнивает обычный перебор фильтров aiogram (F.data == ..., F.data.in_,
+F.data.startswith в порядке регистрации, как было до индекса) с поиском
+по индексу CallbackIndex на реальных роутерах бота. Для каждого
+callback_data проверяется, что оба способа выбирают один и тот же
+обработчик.
+
+Синхронные фильтры F.data aiogram выполняет в пуле потоков, поэтому
+перебор в десятки тысяч раз медленнее поиска по индексу и измеряется
+меньшим числом вызовов.
+
+Пример:
+    python benchmarks/bench_callback_dispatch.py --number 20000 --linear-number 500
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiogram import Dispatcher, F  # noqa: E402
+from aiogram.dispatcher.event.handler import FilterObject  # noqa: E402
+from aiogram.types import CallbackQuery, Chat, Message, User  # noqa: E402
+
+from handlers.admin_handlers import register_admin_handlers  # noqa: E402
+from handlers.media_handlers import register_media_handlers  # noqa: E402
+from handlers.paid_content_handlers import router as paid_content_router  # noqa: E402
+from utils.callback_router import CallbackIndex  # noqa: E402
+
+SAMPLE_DATA = [
+    "about",
+    "paid_content",
+    "my_paid_content",
+    "submit_shorts",
+    "submit_stream",
+    "platform_youtube",
+    "show_paid_apps",
+    "show_app:next:1700000000:3:25",
+    "show_pending_apps",
+    "approve_request_123",
+    "nav_request_pending_next_123_4",
+    "pay_page:next:123456789",
+    "bulk:toggle:42",
+    "bulk:do:approved",
+    "broadcast:progress:7",
+    "back_to_admin_menu",
+    "unknown_button",
+]
+
+
+def build_dispatcher() -> Dispatcher:
+    """Подключает роутеры бота в том же порядке, что и bootstrap.build_dispatcher"""
+    dp = Dispatcher()
+    dp.include_router(paid_content_router)
+    register_media_handlers(dp, None)
+    register_admin_handlers(dp, None, [])
+    return dp
+
+
+def magic_filters(dp: Dispatcher):
+    """Те же обработчики с фильтрами F.data, как они были зарегистрированы до индекса"""
+    routes = []
+    for router in dp.chain_tail:
+        for handler in router.callback_query.handlers:
+            event_filter = handler.filters[0].callback
+            values = sorted(event_filter.values)
+            if event_filter.is_prefix:
+                magic = F.data.startswith(values[0])
+            elif len(values) == 1:
+                magic = F.data == values[0]
+            else:
+                magic = F.data.in_(values)
+            routes.append((FilterObject(magic), handler))
+    return routes
+
+
+def make_callback(data: str) -> CallbackQuery:
+    user = User(id=1, is_bot=False, first_name="user")
+    message = Message(message_id=1, date=datetime.now(), chat=Chat(id=1, type="private"), text="menu")
+    return CallbackQuery(id="1", from_user=user, chat_instance="1", message=message, data=data)
+
+
+async def linear(routes, event: CallbackQuery):
+    for event_filter, handler in routes:
+        if await event_filter.call(event):
+            return handler
+    return None
+
+
+async def indexed(index: CallbackIndex, data: str):
+    # Middleware вызывает поиск из корутины, поэтому меряем так же
+    return index.match(data)
+
+
+async def measure(func, number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        await func()
+    return (time.perf_counter() - started) / number * 1e9
+
+
+async def run(number: int, linear_number: int) -> bool:
+    dp = build_dispatcher()
+    index = CallbackIndex.build(dp)
+    routes = magic_filters(dp)
+    print(f"{len(routes)} callback handlers, {len(index)} indexed routes")
+
+    mismatches = 0
+    total_linear = total_index = 0.0
+    print(f"{'callback_data':<34} {'handler':<32} {'linear ns':>10} {'index ns':>9}")
+    for data in SAMPLE_DATA:
+        event = make_callback(data)
+        expected = await linear(routes, event)
+        route = index.match(data)
+        found = route[2] if route else None
+        if found is not expected:
+            mismatches += 1
+
+        linear_ns = await measure(lambda: linear(routes, event), linear_number)
+        index_ns = await measure(lambda: indexed(index, data), number)
+        total_linear += linear_ns
+        total_index += index_ns
+        name = found.callback.__name__ if found else "-"
+        mark = "" if found is expected else "  MISMATCH"
+        print(f"{data[:32]:<34} {name[:30]:<32} {linear_ns:>10.0f} {index_ns:>9.0f}{mark}")
+
+    print(f"average: linear {total_linear / len(SAMPLE_DATA):.0f} ns, index {total_index / len(SAMPLE_DATA):.0f} ns")
+    if mismatches:
+        print(f"ERROR: {mismatches} callbacks dispatched to a different handler")
+    return not mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=10_000, help="поисков по индексу на каждое значение")
+    parser.add_argument("--linear-number", type=int, default=100, help="переборов фильтров на каждое значение")
+    args = parser.parse_args()
+    if not asyncio.run(run(args.number, args.linear_number)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Микробенчмарк классификации ссылок.
+
+Измеряет время classify на типичных ссылках без кэша (один проход
+регулярного выражения) и с кэшем (повторная проверка той же ссылки).
+Проверки ссылок выполняются на каждое сообщение пользователя, поэтому
+время с кэшем должно оставаться меньше микросекунды.
+
+Пример:
+    python benchmarks/bench_link_classifier.py --number 200000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.link_classifier import classify  # noqa: E402
+
+SAMPLE_LINKS = [
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtu.be/dQw4w9WgXcQ",
+    "https://youtube.com/shorts/abc_123",
+    "https://youtube.com/@channel_name",
+    "https://www.twitch.tv/videos/1234567890",
+    "https://twitch.tv/streamer",
+    "https://www.tiktok.com/@user.name/video/7234567890123456789",
+    "https://vm.tiktok.com/ZMabcdef/",
+    "https://i.ibb.co/abc123/screenshot.png",
+    "https://example.com/some/page",
+    "просто текст, а не ссылка",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=100_000, help="вызовов на каждую ссылку")
+    parser.add_argument("--budget-ns", type=float, default=1000.0, help="допустимое время вызова с кэшем")
+    args = parser.parse_args()
+
+    uncached = classify.__wrapped__
+    over_budget = False
+    print(f"{'link':<62} {'result':<22} {'uncached ns':>12} {'cached ns':>10}")
+    for link in SAMPLE_LINKS:
+        info = classify(link)
+        raw = timeit.timeit(lambda: uncached(link), number=args.number) / args.number * 1e9
+        cached = timeit.timeit(lambda: classify(link), number=args.number) / args.number * 1e9
+        over_budget |= cached > args.budget_ns
+        result = f"{info.platform}/{info.kind}" if info else "-"
+        print(f"{link[:60]:<62} {result:<22} {raw:>12.0f} {cached:>10.0f}")
+
+    print(classify.cache_info())
+    if over_budget:
+        print(f"WARNING: cached classification is slower than {args.budget_ns:.0f} ns")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,555 @@
+"""
+Микробенчмарк запросов Database на синтетических данных.
+
+Создает временную базу по миграциям и заполняет ее объемами, близкими к
+рабочим (по умолчанию 50k telegram_users, 20k user_channels, 100k
+paid_content_applications, 20k payment_requests). Распределения
+неравномерные, как в жизни: у небольшой части блогеров большинство
+заявок и каналов (закон Ципфа), статусы и платформы взвешены.
+
+Затем каждый публичный метод Database вызывается --number раз со
+случайными аргументами из сгенерированных данных: сначала чтения, потом
+записи и обслуживающие пересчеты. Для каждого метода печатаются время
+вызова (среднее, p50, p99) и EXPLAIN QUERY PLAN всех выполненных им
+запросов (SQL перехватывается trace-callback соединений пула).
+Отмечаются полные проходы по таблице или индексу больше --scan-threshold
+строк, автоматические индексы (SQLite строит их на каждый запрос, когда
+подходящего нет) и сортировка во временном B-дереве в запросах с LIMIT
+(перед выдачей страницы читаются все подходящие строки); с
+--fail-on-scan такие находки завершают скрипт с кодом 1.
+
+Методы, работающие с таблицами, которых нет в схеме миграций, не
+вызываются и перечисляются в конце отчета.
+
+Пример:
+    python benchmarks/db_bench.py
+    python benchmarks/db_bench.py --applications 20000 --number 50 --only get_requests_by_status
+"""
+import argparse
+import asyncio
+import inspect
+import itertools
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.database import Database  # noqa: E402
+from utils.link_classifier import canonical_key, content_key  # noqa: E402
+
+TELEGRAM_ID_BASE = 100_000_000
+
+PLATFORMS = (("youtube", 45), ("tiktok", 25), ("shorts", 15), ("twitch", 10), ("other", 5))
+CHANNEL_STATUSES = (("approved", 55), ("pending", 25), ("rejected", 20))
+APPLICATION_STATUSES = (("pending", 40), ("paid", 35), ("approved", 15), ("rejected", 10))
+PAYMENT_STATUSES = (("pending", 40), ("paid", 30), ("approved", 20), ("rejected", 10))
+CONTENT_TYPES = (("shorts", 50), ("youtube", 25), ("tiktok", 15), ("stream", 10))
+
+# Методы инфраструктуры, а не запросы
+NOT_QUERIES = {"close", "execute_query", "fetch_one", "fetch_all", "migrate", "init_db", "verify_query_plans"}
+
+# Поиск по таблице FTS5 (SCAN ... VIRTUAL TABLE INDEX) идет по ее индексу, это не полный проход
+_PLAN_SCAN = re.compile(r'^SCAN (\w+)(?! USING)(?!.*(?:CONSTANT ROW|VIRTUAL TABLE))')
+_PLAN_INDEX_SCAN = re.compile(r'^SCAN (\w+) USING (?:COVERING )?INDEX (\w+)')
+_PLAN_AUTOMATIC = re.compile(r'^(?:SEARCH|SCAN) (\w+) USING AUTOMATIC')
+_DML = re.compile(r'^\s*(SELECT|UPDATE|DELETE|INSERT|REPLACE|WITH)\b', re.IGNORECASE)
+
+
+def weighted(rng: random.Random, choices: Tuple[Tuple[str, int], ...], k: int) -> List[str]:
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights, k=k)
+
+
+def zipf_weights(count: int, exponent: float) -> List[float]:
+    """Накопленные веса: k-й по популярности элемент выбирается с вероятностью ~1/k^exponent"""
+    return list(itertools.accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+
+
+def timestamp(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def channel_link(platform: str, index: int) -> str:
+    if platform in ("youtube", "shorts"):
+        return f"https://youtube.com/@channel{index}"
+    if platform == "tiktok":
+        return f"https://www.tiktok.com/@channel{index}"
+    if platform == "twitch":
+        return f"https://twitch.tv/channel{index}"
+    return f"https://example.com/channel{index}"
+
+
+def content_link(content_type: str, user_id: int, index: int) -> str:
+    if content_type == "shorts":
+        return f"https://youtube.com/shorts/s{index}"
+    if content_type == "tiktok":
+        return f"https://www.tiktok.com/@u{user_id}/video/{7_000_000_000 + index}"
+    if content_type == "stream":
+        return f"https://www.twitch.tv/videos/{2_000_000_000 + index}"
+    return f"https://www.youtube.com/watch?v=v{index}"
+
+
+class Dataset:
+    """Сгенерированные данные и выбор случайных аргументов для вызовов"""
+
+    def __init__(self, rng: random.Random, users: int, channels: int, applications: int,
+                 payments: int, skew: float):
+        self.rng = rng
+        self.users = users
+        self.skew = skew
+        self.user_weights = zipf_weights(users, skew)
+        self.channels: List[Tuple[int, str, str, int]] = []  # (id, platform, link, владелец - Telegram ID)
+        self.channel_ids_by_status: Dict[str, List[int]] = {}
+        self.approved_owners: List[int] = []
+        self.app_ids_by_user: Dict[int, List[int]] = {}
+        self.app_links: List[str] = []
+        self.pending_app_ids: List[int] = []
+        self.payment_ids_by_status: Dict[str, List[int]] = {}
+        self.broadcast_ids: List[int] = []
+        self.sizes = {"users": users, "channels": channels, "applications": applications, "payments": payments}
+        self._unique = itertools.count(1)
+
+    def telegram_id(self, index: int) -> int:
+        return TELEGRAM_ID_BASE + index
+
+    def user(self) -> int:
+        """Telegram ID пользователя; активные пользователи выбираются чаще"""
+        return self.telegram_id(self.rng.choices(range(1, self.users + 1), cum_weights=self.user_weights)[0])
+
+    def blogger(self) -> int:
+        """Telegram ID одобренного блогера, у которого есть заявки на оплату"""
+        return self.rng.choice(self.approved_owners)
+
+    def channel(self) -> Tuple[int, str, str, int]:
+        return self.rng.choice(self.channels)
+
+    def channel_with_status(self, status: str) -> int:
+        return self.rng.choice(self.channel_ids_by_status[status])
+
+    def app_of(self, telegram_id: int) -> int:
+        return self.rng.choice(self.app_ids_by_user[telegram_id])
+
+    def take(self, ids: List[int], count: int = 1) -> List[int]:
+        """Забирает id из списка, чтобы записи не применялись к одной строке повторно"""
+        taken = ids[-count:]
+        del ids[-count:]
+        return taken
+
+    def unique(self) -> int:
+        return next(self._unique)
+
+
+async def seed(db: Database, data: Dataset, channels: int, applications: int, payments: int):
+    """Заполняет базу синтетическими данными одной транзакцией на таблицу"""
+    rng = data.rng
+    now = datetime.now()
+
+    def moment(max_days: int = 365) -> datetime:
+        return now - timedelta(seconds=rng.randrange(max_days * 86_400))
+
+    async with db.pool.write() as conn:
+        await conn.executemany(
+            "INSERT INTO telegram_users (id, telegram_id, username, created_at, is_blocked) VALUES (?, ?, ?, ?, ?)",
+            [
+                (i, data.telegram_id(i), f"user{i}", timestamp(moment()), int(rng.random() < 0.02))
+                for i in range(1, data.users + 1)
+            ]
+        )
+
+    # Владельцы каналов: у популярных блогеров по нескольку каналов
+    owners = rng.choices(range(1, data.users + 1), cum_weights=data.user_weights, k=channels)
+    platforms = weighted(rng, PLATFORMS, channels)
+    statuses = weighted(rng, CHANNEL_STATUSES, channels)
+    rows = []
+    approved_channels = []
+    for i, (owner, platform, status) in enumerate(zip(owners, platforms, statuses), start=1):
+        link = channel_link(platform, i)
+        is_active = rng.random() < 0.95
+        rows.append((
+            i, owner, platform, link, canonical_key(link), f"channel{i}", f"P{i}",
+            rng.randrange(500, 500_000), "опыт", "раз в неделю", status, is_active, timestamp(moment())
+        ))
+        data.channels.append((i, platform, link, data.telegram_id(owner)))
+        if is_active:
+            data.channel_ids_by_status.setdefault(status, []).append(i)
+        if status == "approved":
+            approved_channels.append(i)
+            data.approved_owners.append(data.telegram_id(owner))
+    async with db.pool.write() as conn:
+        await conn.executemany('''
+            INSERT INTO user_channels
+            (id, telegram_user_id, platform, channel_link, channel_key, channel_name, promo_code,
+             views_count, experience, frequency, status, is_active, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+    data.approved_owners = sorted(set(data.approved_owners))
+
+    # Заявки на оплату подают одобренные блогеры, самые активные - чаще остальных
+    blogger_weights = zipf_weights(len(data.approved_owners), data.skew)
+    authors = rng.choices(data.approved_owners, cum_weights=blogger_weights, k=applications)
+    content_types = weighted(rng, CONTENT_TYPES, applications)
+    statuses = weighted(rng, APPLICATION_STATUSES, applications)
+    started = now - timedelta(days=365)
+    step = 365 * 86_400 / max(1, applications)
+    rows = []
+    for i, (user_id, content_type, status) in enumerate(zip(authors, content_types, statuses), start=1):
+        link = content_link(content_type, user_id, i)
+        created = started + timedelta(seconds=i * step)
+        username = f"user{user_id - TELEGRAM_ID_BASE}"
+        rows.append((
+            i, user_id, username, f"@{username}", content_type, link, content_key(link),
+            (created - timedelta(days=rng.randrange(30))).strftime('%d.%m.%Y'),
+            rng.randrange(1_000, 1_000_000), status, timestamp(created)
+        ))
+        data.app_ids_by_user.setdefault(user_id, []).append(i)
+        data.app_links.append(link)
+        if status == "pending":
+            data.pending_app_ids.append(i)
+    async with db.pool.write() as conn:
+        await conn.executemany('''
+            INSERT INTO paid_content_applications
+            (id, user_id, username, user_mention, content_type, link, link_key, publish_date,
+             views_count, status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+    # Заявки есть только у части одобренных блогеров
+    data.approved_owners = sorted(data.app_ids_by_user)
+
+    channel_weights = zipf_weights(len(approved_channels), data.skew)
+    payment_channels = rng.choices(approved_channels, cum_weights=channel_weights, k=payments)
+    statuses = weighted(rng, PAYMENT_STATUSES, payments)
+    rows = []
+    for i, (channel_id, status) in enumerate(zip(payment_channels, statuses), start=1):
+        amount = round(rng.uniform(5, 500), 2)
+        rows.append((
+            i, channel_id, f"https://youtube.com/watch?v=p{i}", "video", rng.randrange(1_000, 500_000),
+            amount, amount if status in ("approved", "paid") else None,
+            amount if status == "paid" else None, status, timestamp(moment())
+        ))
+        data.payment_ids_by_status.setdefault(status, []).append(i)
+    async with db.pool.write() as conn:
+        await conn.executemany('''
+            INSERT INTO payment_requests
+            (id, channel_id, content_link, content_type, views_count, requested_amount,
+             approved_amount, paid_amount, status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+
+    async with db.pool.write() as conn:
+        await conn.executemany(
+            "INSERT INTO broadcasts (id, text, created_by, status, last_user_id) VALUES (?, ?, ?, ?, ?)",
+            [(i, f"broadcast {i}", TELEGRAM_ID_BASE, "running" if i == 20 else "done", 0) for i in range(1, 21)]
+        )
+    data.broadcast_ids = list(range(1, 21))
+
+
+def cases(db: Database, data: Dataset) -> List[Tuple[str, str, Callable[[], Awaitable[Any]]]]:
+    """(метод, вид, вызов со случайными аргументами) в порядке запуска"""
+    rng = data.rng
+
+    def is_approved_blogger():
+        telegram_id = data.user()
+        # Кэш сбрасывается, чтобы мерить запрос, а не словарь
+        db.approval_cache.invalidate(telegram_id)
+        return db.is_approved_blogger(telegram_id)
+
+    def check_channel_exists():
+        _, platform, link, owner = data.channel()
+        return db.check_channel_exists(link, platform, owner)
+
+    def get_user_application_by_cursor():
+        user_id = data.blogger()
+        return db.get_user_application_by_cursor(user_id, "pending", "next", data.app_of(user_id))
+
+    def add_channel():
+        platform = weighted(rng, PLATFORMS, 1)[0]
+        return db.add_channel(data.user(), platform, channel_link(platform, 10_000_000 + data.unique()), "new", 1000)
+
+    def save_paid_content_application():
+        user_id = data.blogger()
+        link = content_link("shorts", user_id, 10_000_000 + data.unique())
+        return db.save_paid_content_application(user_id, "user", "shorts", link, "01.01.2024", "0", 5000)
+
+    def save_broadcast_progress():
+        blocked = [data.user() for _ in range(rng.randrange(3))]
+        return db.save_broadcast_progress(data.broadcast_ids[-1], data.unique(), 500, 1, blocked)
+
+    return [
+        # Чтения
+        ("is_approved_blogger", "read", is_approved_blogger),
+        ("find_paid_content_duplicate", "read", lambda: db.find_paid_content_duplicate(rng.choice(data.app_links))),
+        ("get_user_applications_stats", "read", lambda: db.get_user_applications_stats(data.blogger())),
+        ("get_user_applications", "read", lambda: db.get_user_applications(data.blogger(), 0, 10)),
+        ("get_user_applications_by_status", "read",
+         lambda: db.get_user_applications_by_status(data.blogger(), weighted(rng, APPLICATION_STATUSES, 1)[0])),
+        ("count_user_applications", "read", lambda: db.count_user_applications(data.blogger(), "pending")),
+        ("get_user_application_by_cursor", "read", get_user_application_by_cursor),
+        ("get_paid_content_applications", "read",
+         lambda: db.get_paid_content_applications(rng.randrange(len(data.pending_app_ids)), 1)),
+        ("get_paid_content_applications_count", "read", db.get_paid_content_applications_count),
+        ("get_paid_content_application", "read",
+         lambda: db.get_paid_content_application(rng.randrange(1, data.sizes["applications"] + 1))),
+        ("get_applications_stats", "read", db.get_applications_stats),
+        ("check_channel_exists", "read", check_channel_exists),
+        ("get_user_channels", "read", lambda: db.get_user_channels(data.user())),
+        ("get_channel_stats", "read", lambda: db.get_channel_stats(data.channel_with_status("approved"))),
+        ("get_channels_by_status", "read",
+         lambda: db.get_channels_by_status(weighted(rng, CHANNEL_STATUSES, 1)[0], 10, rng.randrange(100))),
+        ("get_statistics", "read", db.get_statistics),
+        ("get_payment_stats", "read", lambda: db.get_payment_stats(data.channel_with_status("approved"))),
+        ("check_promo_exists", "read", lambda: db.check_promo_exists(f"P{data.channel()[0]}", data.user())),
+        ("get_payment_requests", "read",
+         lambda: db.get_payment_requests(weighted(rng, PAYMENT_STATUSES, 1)[0], 10, 0)),
+        ("get_requests_by_status", "read", lambda: db.get_requests_by_status("pending")),
+        ("get_next_request", "read",
+         lambda: db.get_next_request("pending", data.channel_with_status("pending"))),
+        ("get_prev_request", "read",
+         lambda: db.get_prev_request("pending", data.channel_with_status("pending"))),
+        ("get_requests_count", "read", lambda: db.get_requests_count("pending")),
+        ("get_collaboration_stats", "read", db.get_collaboration_stats),
+        ("get_users_with_pending_applications", "read",
+         lambda: db.get_users_with_pending_applications(after_user_id=data.blogger())),
+        ("get_pending_payments_summary", "read", db.get_pending_payments_summary),
+        ("get_broadcast", "read", lambda: db.get_broadcast(rng.choice(data.broadcast_ids))),
+        ("get_running_broadcasts", "read", db.get_running_broadcasts),
+        ("count_broadcast_recipients", "read",
+         lambda: db.count_broadcast_recipients(rng.randrange(data.users))),
+        ("get_broadcast_recipients", "read",
+         lambda: db.get_broadcast_recipients(rng.randrange(data.users), 500)),
+        ("get_pending_channels_page", "read",
+         lambda: db.get_pending_channels_page(data.channel_with_status("pending"), 10)),
+        ("get_pending_paid_content_page", "read",
+         lambda: db.get_pending_paid_content_page(rng.choice(data.pending_app_ids), 10)),
+        ("get_pending_paid_content_ids", "read", lambda: db.get_pending_paid_content_ids(data.blogger())),
+        ("get_pending_paid_content_ids(username)", "read",
+         lambda: db.get_pending_paid_content_ids(f"@user{data.blogger() - TELEGRAM_ID_BASE}")),
+        ("search", "read", lambda: db.search(f"@user{rng.randrange(1, data.users + 1)}")),
+        ("search(promo)", "read", lambda: db.search(f"P{data.channel()[0]}")),
+        ("search(common)", "read", lambda: db.search("youtube shorts", limit=10)),
+        # Записи
+        ("get_or_create_user", "write", lambda: db.get_or_create_user(data.user(), "renamed")),
+        ("add_channel", "write", add_channel),
+        ("save_paid_content_application", "write", save_paid_content_application),
+        ("update_paid_content_status", "write",
+         lambda: db.update_paid_content_status(data.take(data.pending_app_ids)[0], "approved")),
+        ("update_channel_status", "write",
+         lambda: db.update_channel_status(data.take(data.channel_ids_by_status["pending"])[0], "approved")),
+        ("approve_request", "write",
+         lambda: db.approve_request(data.take(data.channel_ids_by_status["pending"])[0], "ok")),
+        ("reject_request", "write",
+         lambda: db.reject_request(data.take(data.channel_ids_by_status["pending"])[0], "no")),
+        ("add_admin_comment", "write", lambda: db.add_admin_comment(data.channel()[0], "comment")),
+        ("update_channel_viewers", "write", lambda: db.update_channel_viewers(data.channel()[0], 50)),
+        ("create_payment_request", "write",
+         lambda: db.create_payment_request(data.channel_with_status("approved"), "https://youtube.com/watch?v=n",
+                                           "video", 5000, 10.0)),
+        ("update_payment_request_status", "write",
+         lambda: db.update_payment_request_status(data.take(data.payment_ids_by_status["pending"])[0], "approved")),
+        ("process_payment", "write",
+         lambda: db.process_payment(data.take(data.payment_ids_by_status["approved"])[0], 10.0)),
+        ("bulk_update_channel_status", "write",
+         lambda: db.bulk_update_channel_status(data.take(data.channel_ids_by_status["pending"], 10), "approved")),
+        ("bulk_update_paid_content_status", "write",
+         lambda: db.bulk_update_paid_content_status(data.take(data.pending_app_ids, 10), "paid")),
+        ("create_broadcast", "write", lambda: db.create_broadcast("text", TELEGRAM_ID_BASE)),
+        ("save_broadcast_progress", "write", save_broadcast_progress),
+        ("finish_broadcast", "write", lambda: db.finish_broadcast(rng.choice(data.broadcast_ids))),
+        # Обслуживание: проходят всю таблицу по определению
+        ("rebuild_user_application_counters", "maintenance", db.rebuild_user_application_counters),
+        ("reconcile_channel_totals", "maintenance", db.reconcile_channel_totals),
+    ]
+
+
+class StatementLog:
+    """Собирает SQL, выполненный соединениями пула"""
+
+    def __init__(self):
+        self.enabled = False
+        self.statements: List[str] = []
+
+    def __call__(self, sql: str):
+        if self.enabled:
+            self.statements.append(sql)
+
+    async def attach(self, db: Database):
+        for connection in [db.pool._writer, *db.pool._readers]:
+            await connection.set_trace_callback(self)
+
+
+async def explain(db: Database, sql: str, sizes: Dict[str, int], threshold: int) -> Tuple[List[str], List[str]]:
+    """План запроса и отмеченные в нем проблемы"""
+    async with db.pool.read() as conn:
+        cursor = await conn.execute(f"EXPLAIN QUERY PLAN {sql}")
+        rows = await cursor.fetchall()
+    plan = [row[3] for row in rows]
+
+    problems = []
+    for _, parent, _, step in rows:
+        if step == "USE TEMP B-TREE FOR ORDER BY":
+            # Сортировка внешнего запроса, у которого есть LIMIT
+            if parent == 0 and re.search(r'\bLIMIT\b', outer_query(sql), re.IGNORECASE):
+                problems.append("sort of all matching rows for LIMIT")
+            continue
+        match = _PLAN_AUTOMATIC.match(step) or _PLAN_INDEX_SCAN.match(step) or _PLAN_SCAN.match(step)
+        if match is None:
+            continue
+        table = resolve_table(sql, match.group(1))
+        count = sizes.get(table)
+        if count is None or count < threshold:
+            continue
+        if match.re is _PLAN_AUTOMATIC:
+            problems.append(f"automatic index on {table} ({count} rows)")
+        elif match.re is _PLAN_INDEX_SCAN:
+            problems.append(f"full scan of index {match.group(2)} on {table} ({count} rows)")
+        else:
+            problems.append(f"full scan of {table} ({count} rows)")
+    return plan, problems
+
+
+def outer_query(sql: str) -> str:
+    """Текст запроса без подзапросов и других выражений в скобках"""
+    while True:
+        stripped = re.sub(r'\([^()]*\)', '', sql)
+        if stripped == sql:
+            return sql
+        sql = stripped
+
+
+def resolve_table(sql: str, name: str) -> str:
+    """Имя таблицы по псевдониму из плана (SCAN uc -> user_channels)"""
+    match = re.search(rf'\b(?:FROM|JOIN|UPDATE)\s+(\w+)\s+(?:AS\s+)?{name}\b', sql, re.IGNORECASE)
+    return match.group(1) if match else name
+
+
+async def table_sizes(db: Database) -> Dict[str, int]:
+    async with db.pool.read() as conn:
+        cursor = await conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        names = [row[0] for row in await cursor.fetchall()]
+        sizes = {}
+        for name in names:
+            cursor = await conn.execute(f"SELECT COUNT(*) FROM {name}")
+            sizes[name] = (await cursor.fetchone())[0]
+    return sizes
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу (values отсортирован)"""
+    rank = max(1, int(round(q / 100 * len(values) + 0.5)))
+    return values[min(rank, len(values)) - 1]
+
+
+def compact(sql: str, width: int = 110) -> str:
+    text = " ".join(sql.split())
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+
+async def run(args: argparse.Namespace) -> bool:
+    rng = random.Random(args.seed)
+    workdir = tempfile.TemporaryDirectory(prefix="db_bench_")
+    db = Database(os.path.join(workdir.name, "bench.db"), pool_size=2)
+    data = Dataset(rng, args.users, args.channels, args.applications, args.payments, args.skew)
+    problems_total: List[str] = []
+    try:
+        await db.migrate()
+        started = time.perf_counter()
+        await seed(db, data, args.channels, args.applications, args.payments)
+        sizes = await table_sizes(db)
+        print(f"seeded in {time.perf_counter() - started:.1f} s: "
+              + ", ".join(f"{name} {sizes[name]}" for name in
+                          ("telegram_users", "user_channels", "paid_content_applications", "payment_requests")))
+
+        log = StatementLog()
+        await log.attach(db)
+        selected = [case for case in cases(db, data) if not args.only or case[0] in args.only]
+        results = []
+        for name, kind, call in selected:
+            number = args.number if kind != "maintenance" else min(args.number, 3)
+
+            # Первый вызов - для плана запросов, остальные - для замера
+            log.statements.clear()
+            timings = []
+            try:
+                log.enabled = True
+                await call()
+                log.enabled = False
+                for _ in range(number):
+                    call_started = time.perf_counter()
+                    await call()
+                    timings.append(time.perf_counter() - call_started)
+            except Exception as e:
+                print(f"\n== {name}: failed: {e!r}")
+                results.append((name, kind, None, ["failed"]))
+                continue
+            finally:
+                log.enabled = False
+            timings.sort()
+            statements = list(dict.fromkeys(sql for sql in log.statements if _DML.match(sql)))
+
+            print(f"\n== {name} [{kind}]")
+            flags = []
+            for sql in statements:
+                plan, problems = await explain(db, sql, sizes, args.scan_threshold)
+                print(f"   {compact(sql)}")
+                for step in plan:
+                    print(f"     {step}")
+                for problem in problems:
+                    print(f"     ! {problem}")
+                flags.extend(problems)
+            if kind != "maintenance":
+                problems_total.extend(f"{name}: {problem}" for problem in dict.fromkeys(flags))
+            results.append((name, kind, timings, list(dict.fromkeys(flags))))
+
+        print(f"\n{'method':<40} {'kind':<11} {'calls':>6} {'mean us':>10} {'p50 us':>10} {'p99 us':>10}  flags")
+        for name, kind, timings, flags in results:
+            if timings is None:
+                print(f"{name:<40} {kind:<11} {'-':>6} {'-':>10} {'-':>10} {'-':>10}  {', '.join(flags)}")
+                continue
+            mean = sum(timings) / len(timings) * 1e6
+            print(f"{name:<40} {kind:<11} {len(timings):>6} {mean:>10.1f} "
+                  f"{percentile(timings, 50) * 1e6:>10.1f} {percentile(timings, 99) * 1e6:>10.1f}  "
+                  f"{len(flags) or ''}".rstrip())
+
+        covered = {name.split("(")[0] for name, _, _ in cases(db, data)}
+        public = {
+            name for name, member in inspect.getmembers(Database, inspect.iscoroutinefunction)
+            if not name.startswith("_") and name not in NOT_QUERIES
+        }
+        if not args.only and public - covered:
+            print(f"\nnot benchmarked (tables absent from the migrated schema): {', '.join(sorted(public - covered))}")
+
+        if problems_total:
+            print("\nflagged query plans:")
+            for problem in problems_total:
+                print(f"  {problem}")
+    finally:
+        await db.close()
+        workdir.cleanup()
+    return not (args.fail_on_scan and problems_total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--channels", type=int, default=20_000)
+    parser.add_argument("--applications", type=int, default=100_000)
+    parser.add_argument("--payments", type=int, default=20_000)
+    parser.add_argument("--skew", type=float, default=1.1, help="показатель закона Ципфа для активности пользователей")
+    parser.add_argument("--number", type=int, default=100, help="вызовов каждого метода")
+    parser.add_argument("--seed", type=int, default=1, help="seed генератора данных")
+    parser.add_argument("--only", nargs="+", help="мерить только эти методы")
+    parser.add_argument("--scan-threshold", type=int, default=1_000,
+                        help="отмечать полные проходы таблиц от стольких строк")
+    parser.add_argument("--fail-on-scan", action="store_true", help="код 1, если в планах есть отмеченные шаги")
+    args = parser.parse_args()
+    if not asyncio.run(run(args)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Локальная имитация Telegram для проверки бота без реального Bot API.
+
+Сервер отвечает на вызовы Bot API (getMe, sendMessage, setWebhook и т.д.)
+правдоподобными ответами и считает вызовы по методам. Обновления,
+добавленные через push_update, отдаются боту в getUpdates (long polling
+с учетом offset, как у Telegram). При указании --webhook сервер
+дополнительно отправляет боту синтетические обновления так же, как это
+делает Telegram.
+
+Пример:
+    TELEGRAM_API_URL=http://127.0.0.1:8081 BOT_MODE=webhook \\
+    WEBHOOK_URL=http://127.0.0.1:8080 WEBHOOK_SECRET=secret python main.py
+
+    python benchmarks/fake_bot_api.py --port 8081 \\
+        --webhook http://127.0.0.1:8080/webhook --secret secret --updates 1000
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter, deque
+from typing import Any, Dict, List, Optional
+
+from aiohttp import ClientSession, web
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "FakeBot", "username": "fake_bot"}
+
+
+class FakeBotAPI:
+    """HTTP-сервер, отвечающий на запросы бота вместо api.telegram.org"""
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+        self._message_ids = itertools.count(1)
+        self._update_ids = itertools.count(1)
+        # Обновления, которые бот еще не подтвердил через offset
+        self._updates: deque = deque()
+        self._has_updates = asyncio.Event()
+
+    def push_update(self, update: Dict[str, Any]) -> int:
+        """Ставит обновление в очередь getUpdates и возвращает присвоенный update_id"""
+        update_id = next(self._update_ids)
+        update["update_id"] = update_id
+        self._updates.append(update)
+        self._has_updates.set()
+        return update_id
+
+    async def _get_updates(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        offset = int(params.get("offset") or 0)
+        limit = int(params.get("limit") or 100)
+        # Обновления с id меньше offset бот уже получил
+        while self._updates and self._updates[0]["update_id"] < offset:
+            self._updates.popleft()
+
+        if not self._updates:
+            self._has_updates.clear()
+            try:
+                await asyncio.wait_for(self._has_updates.wait(), min(float(params.get("timeout") or 0), 1.0))
+            except asyncio.TimeoutError:
+                return []
+        return list(itertools.islice(self._updates, limit))
+
+    def _message(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        chat_id = int(params.get("chat_id") or 0)
+        return {
+            "message_id": int(params.get("message_id") or next(self._message_ids)),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+            "text": params.get("text", ""),
+        }
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.calls[method] += 1
+
+        if request.content_type == "application/json":
+            params = await request.json()
+        else:
+            params = dict(await request.post())
+
+        if method == "getMe":
+            result: Any = BOT_USER
+        elif method in ("sendMessage", "editMessageText", "sendDocument", "sendPhoto"):
+            result = self._message(params)
+        elif method == "getUpdates":
+            result = await self._get_updates(params)
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    async def stats(self, request: web.Request) -> web.Response:
+        """Количество вызовов Bot API по методам"""
+        return web.json_response(dict(self.calls))
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        app.router.add_get("/stats", self.stats)
+        return app
+
+
+def make_update(update_id: int, user_id: int) -> Dict[str, Any]:
+    """Создает синтетическое обновление: команда /start или нажатие кнопки"""
+    user = {"id": user_id, "is_bot": False, "first_name": f"user{user_id}", "username": f"user{user_id}"}
+    chat = {"id": user_id, "type": "private"}
+    if update_id % 2:
+        return {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": chat,
+                "from": user,
+                "text": "/start",
+                "entities": [{"type": "bot_command", "offset": 0, "length": 6}],
+            },
+        }
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": user,
+            "chat_instance": str(user_id),
+            "data": "about",
+            "message": {"message_id": update_id, "date": int(time.time()), "chat": chat, "text": "menu"},
+        },
+    }
+
+
+async def post_updates(url: str, secret: Optional[str], updates: int, users: int, concurrency: int):
+    """Отправляет обновления на webhook и печатает распределение ответов и задержек"""
+    headers = {"X-Telegram-Bot-Api-Secret-Token": secret} if secret else {}
+    statuses: Counter = Counter()
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with ClientSession() as session:
+        async def send(update_id: int):
+            async with semaphore:
+                started = time.perf_counter()
+                async with session.post(url, json=make_update(update_id, 1000 + update_id % users),
+                                        headers=headers) as response:
+                    statuses[response.status] += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(send(i) for i in range(1, updates + 1)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(json.dumps({
+        "updates": updates,
+        "statuses": dict(statuses),
+        "updates_per_sec": round(updates / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+    }, indent=2))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--webhook", help="адрес webhook бота, на который отправлять обновления")
+    parser.add_argument("--secret", help="секретный токен webhook")
+    parser.add_argument("--updates", type=int, default=100)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    api = FakeBotAPI()
+    runner = web.AppRunner(api.build_app())
+    await runner.setup()
+    await web.TCPSite(runner, args.host, args.port).start()
+    print(f"Fake Bot API listening on http://{args.host}:{args.port}")
+
+    try:
+        if args.webhook:
+            await post_updates(args.webhook, args.secret, args.updates, args.users, args.concurrency)
+            # Даем боту закончить ответы на отправленные обновления
+            await asyncio.sleep(1)
+            print(f"Bot API calls: {dict(api.calls)}")
+        else:
+            await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
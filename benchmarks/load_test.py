@@ -0,0 +1,385 @@
+"""
+Нагрузочный тест бота на локальной имитации Telegram.
+
+Поднимает FakeBotAPI, направляет на него Bot (TELEGRAM_API_URL) и
+запускает настоящий диспетчер бота в режиме polling с временной базой.
+Синтетические пользователи проходят сценарии целиком, каждое следующее
+обновление отправляется после обработки предыдущего:
+
+    collab - /start и заявка на сотрудничество (CollaborationStates);
+    paid   - заявка на оплату Shorts одобренного блогера (PaidContentStates);
+    admin  - экраны /apps и /pay, поиск /find и выгрузка /export администратора.
+
+Задержка шага - время от постановки обновления в getUpdates до конца
+его обработки диспетчером. В отчете p50/p99 по шагам и сценариям и
+общая пропускная способность (обновлений в секунду). Результат можно
+сохранить (--save) и сравнить с сохраненным прогоном прошлой версии
+(--baseline): при ухудшении задержек или пропускной способности больше чем
+на --max-regression скрипт завершается с кодом 1.
+
+Лимиты исходящих запросов по умолчанию подняты, чтобы мерить обработку,
+а не ожидание в планировщике; --real-limits оставляет лимиты из окружения.
+
+Пример:
+    python benchmarks/load_test.py --collab 200 --paid 200 --admins 5 --save baseline.json
+    python benchmarks/load_test.py --collab 200 --paid 200 --admins 5 --baseline baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiogram import BaseMiddleware  # noqa: E402
+from aiogram.dispatcher.event.bases import UNHANDLED  # noqa: E402
+from aiogram.types import Update  # noqa: E402
+from aiohttp import web  # noqa: E402
+
+from benchmarks.fake_bot_api import FakeBotAPI  # noqa: E402
+
+# Диапазоны Telegram ID синтетических пользователей
+COLLAB_USER_BASE = 10_000_000
+PAID_USER_BASE = 20_000_000
+ADMIN_USER_BASE = 30_000_000
+
+# (название шага, фабрика обновления)
+Step = Tuple[str, Callable[[int, int], Dict[str, Any]]]
+
+
+def message(text: str) -> Callable[[int, int], Dict[str, Any]]:
+    """Шаг-сообщение; в тексте можно использовать {user} и {round}"""
+    def build(user_id: int, round_no: int) -> Dict[str, Any]:
+        body = text.format(user=user_id, round=round_no, today=datetime.now().strftime("%d.%m.%Y"))
+        update = {"message": {
+            "message_id": 1,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": _user(user_id),
+            "text": body,
+        }}
+        if body.startswith("/"):
+            update["message"]["entities"] = [{"type": "bot_command", "offset": 0, "length": len(body.split()[0])}]
+        return update
+    return build
+
+
+def button(data: str) -> Callable[[int, int], Dict[str, Any]]:
+    """Шаг-нажатие инлайн-кнопки под сообщением бота"""
+    def build(user_id: int, round_no: int) -> Dict[str, Any]:
+        return {"callback_query": {
+            "id": f"{user_id}:{round_no}:{data}",
+            "from": _user(user_id),
+            "chat_instance": str(user_id),
+            "data": data,
+            "message": {
+                "message_id": 1,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": 1, "is_bot": True, "first_name": "FakeBot"},
+                "text": "menu",
+            },
+        }}
+    return build
+
+
+def _user(user_id: int) -> Dict[str, Any]:
+    return {"id": user_id, "is_bot": False, "first_name": f"user{user_id}", "username": f"user{user_id}"}
+
+
+FLOWS: Dict[str, List[Step]] = {
+    "collab": [
+        ("start", message("/start")),
+        ("apply", button("apply_collab")),
+        ("platform", button("platform_youtube")),
+        ("link", message("https://youtube.com/@load{user}r{round}")),
+        ("views", message("5000")),
+        ("experience", message("Снимаю видео по Rust два года")),
+        ("frequency", message("Два видео в неделю")),
+        ("promo", message("P{user}")),
+        ("finish", button("finish_application")),
+    ],
+    "paid": [
+        ("menu", button("paid_content")),
+        ("submit", button("submit_paid_content")),
+        ("type", button("submit_shorts")),
+        ("link", message("https://youtube.com/shorts/load{user}r{round}")),
+        ("date", message("{today}")),
+        ("views", message("5000")),
+        ("note", message("0")),
+        ("confirm", button("confirm_paid_content")),
+    ],
+    "admin": [
+        ("apps", message("/apps")),
+        ("pending", button("show_pending_apps")),
+        ("pay", message("/pay")),
+        ("refresh", button("refresh_pay_list")),
+        ("find", message("/find load")),
+        ("find_page", button("find:page:10")),
+        ("export", message("/export clips xlsx")),
+    ],
+}
+
+
+class CompletionTracker(BaseMiddleware):
+    """Внешний middleware обновлений: отмечает конец обработки каждого update_id"""
+
+    def __init__(self):
+        self.waiters: Dict[int, asyncio.Future] = {}
+        self.failed: Dict[str, int] = defaultdict(int)
+
+    def expect(self, update_id: int) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.waiters[update_id] = future
+        return future
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any]
+    ) -> Any:
+        outcome = "ok"
+        try:
+            result = await handler(event, data)
+            if result is UNHANDLED:
+                outcome = "unhandled"
+            return result
+        except Exception as e:
+            outcome = type(e).__name__
+            raise
+        finally:
+            future = self.waiters.pop(event.update_id, None)
+            if future is not None and not future.done():
+                future.set_result(outcome)
+
+
+def configure_environment(args: argparse.Namespace, api_url: str, db_path: str):
+    """Окружение для load_config: фейковый Bot API, временная база и синтетические админы"""
+    os.environ["BOT_TOKEN"] = "42:LOAD-TEST"
+    os.environ["BOT_MODE"] = "polling"
+    os.environ["TELEGRAM_API_URL"] = api_url
+    os.environ["DB_PATH"] = db_path
+    os.environ["WORKER_PROCESSES"] = "1"
+    os.environ["ADMIN_IDS"] = ",".join(str(ADMIN_USER_BASE + i) for i in range(max(1, args.admins)))
+    if not args.real_limits:
+        os.environ["OUTBOUND_GLOBAL_RATE"] = "1000000"
+        os.environ["OUTBOUND_CHAT_RATE"] = "1000000"
+        os.environ["OUTBOUND_BURST"] = "1000000"
+
+
+async def seed_bloggers(db, count: int):
+    """Создает одобренных блогеров для сценария paid"""
+    channel_ids = []
+    for i in range(count):
+        user_id = PAID_USER_BASE + i
+        await db.get_or_create_user(user_id, f"user{user_id}")
+        channel_ids.append(await db.add_channel(
+            telegram_id=user_id,
+            platform="youtube",
+            channel_link=f"https://youtube.com/@seed{user_id}",
+            channel_name=f"seed{user_id}",
+            views_count=10_000,
+            experience="seed",
+            frequency="seed",
+            promo_code=f"S{user_id}"
+        ))
+    if channel_ids:
+        await db.bulk_update_channel_status(channel_ids, "approved")
+
+
+async def run_user(api: FakeBotAPI, tracker: CompletionTracker, flow: str, user_id: int,
+                   rounds: int, think: float, timeout: float, samples: Dict[str, List[float]]):
+    """Проводит пользователя по сценарию rounds раз, дожидаясь обработки каждого шага"""
+    for round_no in range(1, rounds + 1):
+        for step, build in FLOWS[flow]:
+            update_id = api.push_update(build(user_id, round_no))
+            done = tracker.expect(update_id)
+            started = time.perf_counter()
+            try:
+                outcome = await asyncio.wait_for(done, timeout)
+            except asyncio.TimeoutError:
+                tracker.waiters.pop(update_id, None)
+                outcome = "timeout"
+            samples[f"{flow}.{step}"].append(time.perf_counter() - started)
+            if outcome != "ok":
+                tracker.failed[f"{flow}.{step}: {outcome}"] += 1
+            if think:
+                await asyncio.sleep(think)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу (values отсортирован)"""
+    rank = max(1, int(round(q / 100 * len(values) + 0.5)))
+    return values[min(rank, len(values)) - 1]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+    }
+
+
+async def count_results(db) -> Dict[str, int]:
+    """Сколько заявок дошло до базы"""
+    async with db.pool.read() as conn:
+        cursor = await conn.execute("SELECT COUNT(*) FROM user_channels WHERE status = 'pending'")
+        collab = (await cursor.fetchone())[0]
+        cursor = await conn.execute("SELECT COUNT(*) FROM paid_content_applications")
+        paid = (await cursor.fetchone())[0]
+    return {"collab": collab, "paid": paid}
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    api = FakeBotAPI()
+    runner = web.AppRunner(api.build_app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+
+    workdir = tempfile.TemporaryDirectory(prefix="load_test_")
+    configure_environment(args, f"http://{host}:{port}", os.path.join(workdir.name, "load.db"))
+
+    # Конфигурация читается из окружения, поэтому модули бота импортируются после него
+    from bootstrap import build_dispatcher, create_bot, create_database
+    from config.config import load_config
+
+    config = load_config()
+    db = create_database(config)
+    await db.migrate()
+    await seed_bloggers(db, args.paid)
+
+    bot = create_bot(config)
+    dp = build_dispatcher(config, db, resume_broadcasts=False)
+    tracker = CompletionTracker()
+    dp.update.outer_middleware(tracker)
+    polling = asyncio.create_task(dp.start_polling(bot, handle_signals=False, close_bot_session=False))
+
+    users = (
+        [("collab", COLLAB_USER_BASE + i) for i in range(args.collab)]
+        + [("paid", PAID_USER_BASE + i) for i in range(args.paid)]
+        + [("admin", ADMIN_USER_BASE + i) for i in range(args.admins)]
+    )
+    samples: Dict[str, List[float]] = defaultdict(list)
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            run_user(api, tracker, flow, user_id, args.rounds, args.think, args.timeout, samples)
+            for flow, user_id in users
+        ))
+        elapsed = time.perf_counter() - started
+        stored = await count_results(db)
+    finally:
+        await dp.stop_polling()
+        await polling
+        await bot.session.close()
+        await db.close()
+        await runner.cleanup()
+        workdir.cleanup()
+
+    flows: Dict[str, List[float]] = defaultdict(list)
+    for name, values in samples.items():
+        flows[name.split(".")[0]].extend(values)
+    total = sum(len(values) for values in samples.values())
+    return {
+        "params": {
+            "collab": args.collab, "paid": args.paid, "admins": args.admins,
+            "rounds": args.rounds, "think": args.think, "real_limits": args.real_limits,
+        },
+        "updates": total,
+        "seconds": round(elapsed, 3),
+        "updates_per_sec": round(total / elapsed, 1) if elapsed else 0.0,
+        "overall": summarize([value for values in samples.values() for value in values]),
+        "flows": {name: summarize(values) for name, values in sorted(flows.items())},
+        "steps": {
+            f"{flow}.{step}": summarize(samples[f"{flow}.{step}"])
+            for flow, steps in FLOWS.items() for step, _ in steps if f"{flow}.{step}" in samples
+        },
+        "failed": dict(tracker.failed),
+        "stored": stored,
+        "expected": {"collab": args.collab * args.rounds, "paid": args.paid * args.rounds},
+        "api_calls": dict(api.calls),
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"{report['updates']} updates in {report['seconds']} s: {report['updates_per_sec']} updates/sec")
+    print(f"{'step':<24} {'count':>7} {'p50 ms':>9} {'p99 ms':>9}")
+    for section in ("steps", "flows"):
+        for name, stats in report[section].items():
+            print(f"{name:<24} {stats['count']:>7} {stats['p50_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+    overall = report["overall"]
+    print(f"{'overall':<24} {overall['count']:>7} {overall['p50_ms']:>9.2f} {overall['p99_ms']:>9.2f}")
+    print(f"stored applications: {report['stored']} (expected {report['expected']})")
+    for name, count in report["failed"].items():
+        print(f"FAILED {name}: {count}")
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> bool:
+    """Печатает изменения относительно базового прогона; False - если есть регрессия"""
+    if report["params"] != baseline.get("params"):
+        print(f"warning: baseline was recorded with {baseline.get('params')}")
+
+    ok = True
+
+    def check(name: str, current: float, previous: float, higher_is_better: bool):
+        nonlocal ok
+        if not previous:
+            return
+        change = (current - previous) / previous
+        regressed = -change > max_regression if higher_is_better else change > max_regression
+        ok = ok and not regressed
+        print(f"{name:<32} {previous:>10.2f} -> {current:>10.2f} ({change:+.1%}){'  REGRESSION' if regressed else ''}")
+
+    check("updates/sec", report["updates_per_sec"], baseline["updates_per_sec"], True)
+    check("overall p50 ms", report["overall"]["p50_ms"], baseline["overall"]["p50_ms"], False)
+    check("overall p99 ms", report["overall"]["p99_ms"], baseline["overall"]["p99_ms"], False)
+    for name, stats in report["flows"].items():
+        previous = baseline["flows"].get(name)
+        if previous:
+            check(f"{name} p99 ms", stats["p99_ms"], previous["p99_ms"], False)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collab", type=int, default=100, help="пользователей в сценарии collab")
+    parser.add_argument("--paid", type=int, default=100, help="одобренных блогеров в сценарии paid")
+    parser.add_argument("--admins", type=int, default=2, help="администраторов в сценарии admin")
+    parser.add_argument("--rounds", type=int, default=1, help="сколько раз каждый проходит свой сценарий")
+    parser.add_argument("--think", type=float, default=0.0, help="пауза пользователя между шагами (секунды)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="предел ожидания обработки одного шага")
+    parser.add_argument("--real-limits", action="store_true", help="не поднимать лимиты исходящих запросов")
+    parser.add_argument("--save", help="сохранить отчет в JSON")
+    parser.add_argument("--baseline", help="JSON прошлого прогона для сравнения")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="допустимое ухудшение задержек и пропускной способности (доля)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_report(report)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    ok = not report["failed"] and report["stored"] == report["expected"]
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            ok = compare(report, json.load(f), args.max_regression) and ok
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
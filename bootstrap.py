@@ -0,0 +1,99 @@
+"""Сборка бота, базы данных и диспетчера из конфигурации (общая для всех режимов запуска)"""
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from config.config import Config
+from database.database import Database
+from database.pool import StorageProfile
+from database.fsm_storage import SQLiteStorage
+from handlers.media_handlers import register_media_handlers
+from handlers.admin_handlers import register_admin_handlers
+from handlers.paid_content_handlers import router as paid_content_router
+from utils.broadcast import Broadcaster
+from utils.callback_router import install_callback_dispatcher
+from utils.outbound import OutboundScheduler
+
+
+def create_database(config: Config) -> Database:
+    """Создает базу данных с пулом соединений и профилем хранилища из конфигурации"""
+    return Database(
+        config.db.path,
+        pool_size=config.db.pool_size,
+        acquire_timeout=config.db.acquire_timeout,
+        write_timeout=config.db.write_timeout,
+        profile=StorageProfile(
+            journal_mode=config.db.journal_mode,
+            synchronous=config.db.synchronous,
+            mmap_size=config.db.mmap_size,
+            cache_size=config.db.cache_size,
+            busy_timeout=config.db.busy_timeout
+        ),
+        approval_cache_ttl=config.db.approval_cache_ttl,
+        approval_cache_size=config.db.approval_cache_size
+    )
+
+
+def create_bot(config: Config) -> Bot:
+    """Создает экземпляр бота"""
+    # Свой адрес Bot API нужен для локального сервера или тестового стенда
+    session = AiohttpSession(
+        api=TelegramAPIServer.from_base(config.bot.api_url)
+    ) if config.bot.api_url else None
+    bot = Bot(token=config.bot.token, session=session)
+
+    # Все отправки и редактирования проходят через планировщик с учетом лимитов Telegram
+    bot.session.middleware(OutboundScheduler(
+        global_rate=config.outbound.global_rate,
+        chat_rate=config.outbound.chat_rate,
+        group_rate=config.outbound.group_rate,
+        burst=config.outbound.burst,
+        max_retries=config.outbound.max_retries,
+        flood_chats=config.outbound.flood_chats,
+        admin_ids=config.bot.admin_ids
+    ))
+    return bot
+
+
+def build_dispatcher(config: Config, db: Database, resume_broadcasts: bool = True) -> Dispatcher:
+    """
+    Создает диспетчер с хранилищем FSM и подключает все роутеры.
+
+    resume_broadcasts - продолжать ли при запуске прерванные рассылки
+    (при нескольких рабочих процессах это делает только один из них).
+    """
+    # Состояния FSM храним в базе, чтобы незавершенные заявки переживали перезапуск
+    if config.fsm.backend == 'sqlite':
+        storage = SQLiteStorage(
+            db,
+            ttl=config.fsm.ttl,
+            flush_interval=config.fsm.flush_interval,
+            cache_size=config.fsm.cache_size
+        )
+    else:
+        storage = MemoryStorage()
+    dp = Dispatcher(storage=storage)
+
+    # Регистрируем хендлеры
+    paid_content_router.database = db
+    dp.include_router(paid_content_router)
+
+    register_media_handlers(dp, db)
+
+    # Рассылки работают в фоне и прерываются вместе с диспетчером
+    broadcaster = Broadcaster(
+        db,
+        chunk_size=config.broadcast.chunk_size,
+        concurrency=config.broadcast.concurrency
+    )
+    if resume_broadcasts:
+        dp.startup.register(broadcaster.resume)
+    dp.shutdown.register(broadcaster.stop)
+
+    # Регистрируем админ-хендлеры с передачей списка админов
+    register_admin_handlers(dp, db, config.bot.admin_ids, broadcaster)
+
+    # Нажатия кнопок находят обработчик по индексу callback_data, а не перебором фильтров
+    install_callback_dispatcher(dp)
+    return dp
@@ -5,10 +5,86 @@ from environs import Env
 class BotConfig:
     token: str
     admin_ids: list[int]
+    mode: str              # polling или webhook
+    api_url: str           # адрес Bot API (пустой - api.telegram.org)
+
+@dataclass
+class WebhookConfig:
+    url: str               # публичный адрес бота, на который Telegram отправляет обновления
+    path: str
+    host: str
+    port: int
+    secret: str            # секретный токен из заголовка X-Telegram-Bot-Api-Secret-Token (пусто - случайный при запуске)
+    workers: int           # количество параллельных обработчиков обновлений
+    queue_size: int        # сколько обновлений может ждать обработки
+
+@dataclass
+class DatabaseConfig:
+    path: str
+    pool_size: int
+    acquire_timeout: float
+    write_timeout: float
+    # Профиль хранилища SQLite
+    journal_mode: str
+    synchronous: str
+    mmap_size: int
+    cache_size: int
+    busy_timeout: int
+    # Кэш статуса одобренного блогера
+    approval_cache_ttl: float
+    approval_cache_size: int
+
+@dataclass
+class FSMConfig:
+    backend: str           # sqlite - состояния сохраняются в базе, memory - в памяти процесса
+    ttl: float             # через сколько секунд брошенный сценарий удаляется
+    flush_interval: float  # как часто изменения записываются в базу
+    cache_size: int        # сколько записей держать в памяти
+
+@dataclass
+class OutboundConfig:
+    global_rate: float     # сообщений в секунду на весь бот
+    chat_rate: float       # сообщений в секунду в один личный чат
+    group_rate: float      # сообщений в секунду в одну группу
+    burst: int             # сколько сообщений можно отправить подряд без ожидания
+    max_retries: int       # повторов после ответа 429
+    flood_chats: int       # сколько чатов с 429 за секунду приостанавливают весь бот
+
+@dataclass
+class BroadcastConfig:
+    chunk_size: int        # получателей в одной пачке (контрольная точка после каждой)
+    concurrency: int       # одновременных запросов к Bot API в рассылке
+
+@dataclass
+class ShardingConfig:
+    processes: int         # количество рабочих процессов (1 - все в одном процессе)
+    lanes: int             # параллельных обработчиков в каждом рабочем процессе
+    queue_size: int        # сколько обновлений может ждать обработки во всех процессах
+
+@dataclass
+class LoggingConfig:
+    format: str            # text - обычные строки, json - одна JSON-запись на строку
+    queue_size: int        # сколько записей может ждать записи в файл (при переполнении INFO отбрасываются)
 
 @dataclass
 class Config:
     bot: BotConfig
+    db: DatabaseConfig
+    fsm: FSMConfig
+    webhook: WebhookConfig
+    sharding: ShardingConfig
+    outbound: OutboundConfig
+    broadcast: BroadcastConfig
+    logging: LoggingConfig
+
+def load_logging_config() -> LoggingConfig:
+    """Читает настройки логирования (до остальной конфигурации, чтобы логировать ее ошибки)"""
+    env = Env()
+    env.read_env()
+    return LoggingConfig(
+        format=env.str('LOG_FORMAT', default='text'),
+        queue_size=env.int('LOG_QUEUE_SIZE', default=10_000)
+    )
 
 def load_config() -> Config:
     env = Env()
@@ -21,6 +97,54 @@ def load_config() -> Config:
     return Config(
         bot=BotConfig(
             token=env.str('BOT_TOKEN'),
-            admin_ids=admin_ids
-        )
-    ) 
\ No newline at end of file
+            admin_ids=admin_ids,
+            mode=env.str('BOT_MODE', default='polling'),
+            api_url=env.str('TELEGRAM_API_URL', default='')
+        ),
+        db=DatabaseConfig(
+            path=env.str('DB_PATH', default='rust_media.db'),
+            pool_size=env.int('DB_POOL_SIZE', default=4),
+            acquire_timeout=env.float('DB_ACQUIRE_TIMEOUT', default=5.0),
+            write_timeout=env.float('DB_WRITE_TIMEOUT', default=60.0),
+            journal_mode=env.str('DB_JOURNAL_MODE', default='WAL'),
+            synchronous=env.str('DB_SYNCHRONOUS', default='NORMAL'),
+            mmap_size=env.int('DB_MMAP_SIZE', default=268_435_456),
+            cache_size=env.int('DB_CACHE_SIZE', default=-64_000),
+            busy_timeout=env.int('DB_BUSY_TIMEOUT', default=5_000),
+            approval_cache_ttl=env.float('APPROVAL_CACHE_TTL', default=300.0),
+            approval_cache_size=env.int('APPROVAL_CACHE_SIZE', default=10_000)
+        ),
+        fsm=FSMConfig(
+            backend=env.str('FSM_STORAGE', default='sqlite'),
+            ttl=env.float('FSM_TTL', default=86_400.0),
+            flush_interval=env.float('FSM_FLUSH_INTERVAL', default=1.0),
+            cache_size=env.int('FSM_CACHE_SIZE', default=10_000)
+        ),
+        webhook=WebhookConfig(
+            url=env.str('WEBHOOK_URL', default=''),
+            path=env.str('WEBHOOK_PATH', default='/webhook'),
+            host=env.str('WEBHOOK_HOST', default='0.0.0.0'),
+            port=env.int('WEBHOOK_PORT', default=8080),
+            secret=env.str('WEBHOOK_SECRET', default=''),
+            workers=env.int('WEBHOOK_WORKERS', default=8),
+            queue_size=env.int('WEBHOOK_QUEUE_SIZE', default=1_000)
+        ),
+        sharding=ShardingConfig(
+            processes=env.int('WORKER_PROCESSES', default=1),
+            lanes=env.int('WORKER_LANES', default=8),
+            queue_size=env.int('WORKER_QUEUE_SIZE', default=1_000)
+        ),
+        outbound=OutboundConfig(
+            global_rate=env.float('OUTBOUND_GLOBAL_RATE', default=30.0),
+            chat_rate=env.float('OUTBOUND_CHAT_RATE', default=1.0),
+            group_rate=env.float('OUTBOUND_GROUP_RATE', default=20 / 60),
+            burst=env.int('OUTBOUND_BURST', default=3),
+            max_retries=env.int('OUTBOUND_MAX_RETRIES', default=3),
+            flood_chats=env.int('OUTBOUND_FLOOD_CHATS', default=3)
+        ),
+        broadcast=BroadcastConfig(
+            chunk_size=env.int('BROADCAST_CHUNK_SIZE', default=500),
+            concurrency=env.int('BROADCAST_CONCURRENCY', default=10)
+        ),
+        logging=load_logging_config()
+    )
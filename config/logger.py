@@ -1,24 +1,133 @@
+"""
+Настройка логирования.
+
+Логгер бота не пишет в файл и консоль сам: записи кладутся в
+ограниченную очередь (QueueHandler), а в файл и консоль их выводит
+фоновый поток QueueListener. Поэтому logger.info в обработчиках не
+делает файловых операций в цикле событий. Если очередь переполнена
+(например, при всплеске логов или медленном диске), записи уровня INFO
+и ниже отбрасываются, а WARNING и выше вытесняют самую старую запись;
+количество потерянных записей попадает в лог не чаще раза в
+DROP_REPORT_INTERVAL секунд. При LOG_FORMAT=json каждая запись выводится
+одной строкой JSON.
+"""
+import atexit
+import copy
+import json
 import logging
-from logging.handlers import RotatingFileHandler
 import os
+import queue
 import sys
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+from config.config import LoggingConfig
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Как часто сообщать о потерянных записях (секунды)
+DROP_REPORT_INTERVAL = 10.0
+
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись - одна строка JSON (для сборщиков логов)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record, DATE_FORMAT),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler, который при переполнении очереди не блокирует, а отбрасывает записи"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._reported = 0
+        self._reported_at = 0.0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Подставляет аргументы и текст исключения, не форматируя запись (это делает фоновый поток)"""
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.dropped > self._reported and time.monotonic() - self._reported_at >= DROP_REPORT_INTERVAL:
+            self._report_dropped()
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if record.levelno < logging.WARNING:
+            self.dropped += 1
+            return
+        # Предупреждения и ошибки важнее: вытесняем самую старую запись
+        try:
+            self.queue.get_nowait()
+            self.dropped += 1
+        except queue.Empty:
+            pass
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _report_dropped(self):
+        """Сообщает в лог, сколько записей потеряно с прошлого сообщения"""
+        count = self.dropped - self._reported
+        notice = logging.LogRecord(
+            'bot_logger', logging.WARNING, __file__, 0,
+            f"Log queue overflow: {count} records dropped", None, None
+        )
+        try:
+            self.queue.put_nowait(notice)
+            self._reported = self.dropped
+            self._reported_at = time.monotonic()
+        except queue.Full:
+            pass
+
+
+def setup_logger(name: str = 'bot_logger', config: Optional[LoggingConfig] = None) -> logging.Logger:
+    """Настраивает и возвращает логгер с фоновой записью в файл и консоль"""
+    global _listener
+    config = config or LoggingConfig(format='text', queue_size=10_000)
+
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    if any(isinstance(handler, DroppingQueueHandler) for handler in logger.handlers):
+        # Логгер уже настроен в этом процессе
+        return logger
 
-def setup_logger(name: str = 'bot_logger') -> logging.Logger:
-    """Настраивает и возвращает логгер с обработчиками для файла и консоли"""
-    
     # Создаем директорию для логов, если её нет
     if not os.path.exists('logs'):
         os.makedirs('logs')
-    
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    
+
     # Форматтер для логов
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        '%Y-%m-%d %H:%M:%S'
-    )
-    
+    if config.format == 'json':
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s', DATE_FORMAT)
+
     # Обработчик для записи в файл с ротацией (максимум 5 файлов по 5 МБ)
     file_handler = RotatingFileHandler(
         'logs/bot.log',
@@ -28,14 +137,25 @@ def setup_logger(name: str = 'bot_logger') -> logging.Logger:
     )
     file_handler.setLevel(logging.INFO)
     file_handler.setFormatter(formatter)
-    
+
     # Обработчик для вывода в консоль
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
-    
-    # Добавляем обработчики к логгеру
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
-    return logger 
\ No newline at end of file
+
+    # Записи выводит фоновый поток, логгер только кладет их в очередь
+    log_queue = queue.Queue(maxsize=max(1, config.queue_size))
+    _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logger)
+
+    logger.addHandler(DroppingQueueHandler(log_queue))
+    return logger
+
+
+def shutdown_logger():
+    """Дописывает оставшиеся в очереди записи и останавливает фоновый поток"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
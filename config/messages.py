@@ -32,4 +32,106 @@ PAID_CONTENT_MESSAGE = (
     "- Загрузить свой контент\n"
     "- Просмотреть статус оплаты\n"
     "- Узнать условия оплаты"
-) 
\ No newline at end of file
+) 
+
+# Статические экраны меню (собираются в keyboards/screens.py)
+COLLABORATION_INFO_MESSAGE = (
+    "💎 Информация о сотрудничестве:\n\n"
+    "- Условия сотрудничества\n"
+    "- Требования к контенту\n"
+    "- Контактные данные\n\n"
+    "Для получения дополнительной информации, пожалуйста,\n"
+    "свяжитесь с администратором."
+)
+
+REQUIREMENTS_MESSAGE = (
+    "📋 <b>Требования для сотрудничества:</b>\n\n"
+    "🎥 <b>YouTube:</b>\n"
+    "• От 1000 просмотров в среднем на Rust-контенте\n"
+    "• Регулярные выпуски видео\n"
+    "• Качественный монтаж и звук\n\n"
+    "📱 <b>Shorts/TikTok:</b>\n"
+    "• От 3000 просмотров на видео по Rust\n"
+    "• Активная публикация контента\n"
+    "• Креативный подход к съемке\n\n"
+    "🎮 <b>Twitch:</b>\n"
+    "• Стабильно 20+ зрителей на стриме\n"
+    "• Регулярные стримы по Rust\n"
+    "• Взаимодействие с аудиторией\n\n"
+    "🌐 <b>Другие площадки:</b>\n"
+    "• Обсуждаются индивидуально\n"
+    "• Важен охват и вовлеченность аудитории"
+)
+
+FAQ_MESSAGE = (
+    "❓ <b>Часто задаваемые вопросы:</b>\n\n"
+    "1️⃣ <b>Как часто нужно выпускать контент?</b>\n"
+    "• Минимум 2-3 видео/стрима в месяц\n"
+    "• Для Shorts/TikTok желательно 2-3 видео в неделю\n\n"
+    "2️⃣ <b>Какие требования к баннеру/интеграции?</b>\n"
+    "• Баннер должен быть хорошо виден\n"
+    "• Не должен перекрываться интерфейсом\n"
+    "• Минимальное время показа - 8 секунд\n\n"
+    "3️⃣ <b>Как происходит оплата?</b>\n"
+    "• Индивидуальные условия\n"
+    "• Зависит от охвата и качества контента\n"
+    "• Обсуждается после одобрения заявки\n\n"
+    "4️⃣ <b>Можно ли совмещать с другими проектами?</b>\n"
+    "• Да, если это не конкурирующие проекты\n"
+    "• Обсуждается индивидуально"
+)
+
+PAID_CONTENT_MENU_MESSAGE = (
+    "💰 <b>Раздел контента на оплату</b>\n\n"
+    "Здесь вы можете:\n"
+    "• Подать заявку на оплату контента\n"
+    "• Просмотреть статус ваших заявок\n"
+    "• Проверить баннер на соответствие требованиям\n"
+    "• Ознакомиться с правилами и условиями"
+)
+
+SUBMIT_PAID_CONTENT_MESSAGE = (
+    "📤 <b>Подача заявки на оплату контента</b>\n\n"
+    "Выберите платформу, на которой размещен контент:"
+)
+
+MY_PAID_CONTENT_MESSAGE = (
+    "📋 <b>Мои заявки</b>\n\n"
+    "Выберите категорию для просмотра:"
+)
+
+INFO_FOR_CUTTERS_MESSAGE = (
+    "📋 <b>Правила и условия оплаты контента</b>\n\n"
+    "⚠️ <b>ВАЖНО:</b> Расчеты за 16:9 ролики и стримы в индивидуальном порядке\n\n"
+    "🎬 <b>Технические требования к ролику:</b>\n"
+    "• Баннер должен быть размещен по центру, сверху или снизу\n"
+    "• Баннер не должен перекрываться интерфейсом приложения\n"
+    "• Минимальная длительность ролика: 8 секунд\n"
+    "• Запрещено удалять ролики в течение 3 месяцев\n\n"
+    "💰 <b>Система выплат:</b>\n"
+    "• Выплаты производятся при накоплении 500 000 просмотров\n"
+    "• Просмотры фиксируются на 14-й день после публикации\n"
+    "• Минимальное количество просмотров для подачи: 1000\n\n"
+    "📈 <b>Пример расчета просмотров:</b>\n"
+    "Дата публикации: 10.02.2025\n"
+    "Дата фиксации просмотров: 24.02.2025\n"
+    "<i>Просмотры после даты фиксации не учитываются</i>\n\n"
+    "⭐️ <b>Возможности увеличения CPM:</b>\n"
+    "• Мотивируйте зрителей использовать ВАШ промокод\n"
+    "• Мы отслеживаем статистику введенных промокодов\n"
+    "• CPM повышается для авторов с высокой конверсией промокодов"
+)
+
+FUNCTIONALITY_MESSAGE = (
+    "📌 <b>О функционале кнопок</b>\n\n"
+    "📤 <b>Подать заявку:</b>\n"
+    "• Прикрепление ссылки на шортс/видео/стрим\n"
+    "• Указание количества просмотров/прикрепление статистики\n"
+    "• Указание даты публикации\n\n"
+    "📋 <b>Мои заявки:</b>\n"
+    "• Просмотр списка ваших заявок\n"
+    "• Просмотр статуса заявки (оплачено/в ожидании)\n\n"
+    "🔍 <b>Проверить баннер:</b>\n"
+    "• Ссылка на ваш актуальный баннер\n"
+    "• По приходу рассылки о новом баннере, необходимо скачать баннер по ссылке"
+)
@@ -0,0 +1,71 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    LRU-кэш в памяти процесса с ограничением времени жизни записей.
+
+    Запись вытесняется по истечении ttl секунд или когда кэш переполнен
+    (удаляется давно не использовавшаяся). Поколение увеличивается при
+    каждой инвалидации: значение, прочитанное из базы до инвалидации,
+    не попадет в кэш после нее.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 300.0):
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self.generation = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Возвращает значение из кэша или default, если записи нет или она устарела"""
+        item = self._data.get(key)
+        if item is None:
+            self._misses += 1
+            return default
+
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self._misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        """
+        Сохраняет значение в кэш.
+
+        Если передано поколение, на момент чтения которого получено значение,
+        и с тех пор была инвалидация, значение считается устаревшим и не сохраняется.
+        """
+        if generation is not None and generation != self.generation:
+            return
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        """Удаляет запись из кэша"""
+        self.generation += 1
+        self._data.pop(key, None)
+
+    def clear(self):
+        """Очищает кэш"""
+        self.generation += 1
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Возвращает статистику кэша для мониторинга"""
+        return {
+            'size': len(self._data),
+            'hits': self._hits,
+            'misses': self._misses
+        }
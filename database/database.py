@@ -1,61 +1,76 @@
 import aiosqlite
 import logging
 import asyncio
-from typing import Optional, Tuple, List, Dict, Any
-from datetime import datetime
+from typing import Optional, Tuple, List, Dict, Any, AsyncIterator
+from datetime import date, datetime
+
+from .exceptions import DatabaseError
+from .pool import ConnectionPool, StorageProfile
+from .cache import TTLCache
+from . import migrations
+from .query_plans import HOT_QUERIES, check_query_plans, hot_query
+from .search import HIGHLIGHT_END, HIGHLIGHT_START, match_expression
+from utils.link_classifier import canonical_key, content_key
 
 logger = logging.getLogger('bot_logger')
 
-class DatabaseError(Exception):
-    """Базовый класс для ошибок базы данных"""
-    pass
+# Допустимые переходы статусов заявки на выплату
+PAYMENT_TRANSITIONS = {
+    'pending': ('approved', 'rejected'),
+    'approved': ('paid',)
+}
 
-class ConnectionError(DatabaseError):
-    """Ошибка подключения к базе данных"""
-    pass
+# Столбцы user_application_counters для каждого статуса заявки на оплату контента
+USER_APPLICATION_COUNTER_COLUMNS = {
+    'pending': 'pending_count',
+    'approved': 'approved_count',
+    'rejected': 'rejected_count',
+    'paid': 'paid_count'
+}
 
 class Database:
-    def __init__(self, db_path: str = "rust_media.db"):
+    def __init__(
+        self,
+        db_path: str = "rust_media.db",
+        pool_size: int = 4,
+        acquire_timeout: float = 5.0,
+        write_timeout: float = 60.0,
+        profile: Optional[StorageProfile] = None,
+        approval_cache_ttl: float = 300.0,
+        approval_cache_size: int = 10_000
+    ):
         self.db_path = db_path
-        self._connection_retries = 3
-        self._retry_delay = 1  # секунда
         self.logger = logging.getLogger(__name__)
-        self._connection = None
         self._lock = asyncio.Lock()
-
-    async def _create_connection(self) -> aiosqlite.Connection:
-        """Создает новое соединение с базой данных"""
-        try:
-            connection = await aiosqlite.connect(self.db_path)
-            connection.row_factory = aiosqlite.Row
-            return connection
-        except Exception as e:
-            self.logger.error(f"Failed to create database connection: {e}")
-            raise ConnectionError(f"Failed to connect to database: {e}")
-
-    async def _get_connection(self) -> aiosqlite.Connection:
-        """Получает соединение с базой данных"""
-        try:
-            if self._connection is None or self._connection.closed:
-                self._connection = await self._create_connection()
-            return self._connection
-        except Exception as e:
-            self.logger.error(f"Error getting database connection: {e}")
-            raise ConnectionError(f"Failed to get database connection: {e}")
+        # Все методы работают через общий пул: одно соединение на запись и pool_size на чтение.
+        # Записи выполняются по очереди задачей писателя, настройки SQLite берутся из profile
+        self.pool = ConnectionPool(
+            db_path,
+            readers=pool_size,
+            acquire_timeout=acquire_timeout,
+            write_timeout=write_timeout,
+            profile=profile
+        )
+        # Статус одобренного блогера по Telegram ID: проверяется при каждом открытии меню,
+        # а меняется только при модерации каналов, которая явно сбрасывает запись
+        self.approval_cache = TTLCache(maxsize=approval_cache_size, ttl=approval_cache_ttl)
+        # Токенизатор поисковых таблиц (trigram или unicode61), определяется при первом поиске
+        self._search_trigram: Optional[bool] = None
 
     async def close(self):
-        """Закрывает соединение с базой данных"""
+        """Закрывает соединения с базой данных"""
         async with self._lock:
-            if self._connection is not None:
-                await self._connection.close()
-                self._connection = None
+            await self.pool.close()
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Возвращает загрузку пула соединений для мониторинга"""
+        return self.pool.stats()
 
     async def execute_query(self, query: str, params: tuple = None) -> Any:
         """Выполняет SQL-запрос с обработкой ошибок"""
         try:
-            async with await self._get_connection() as db:
+            async with self.pool.write() as db:
                 cursor = await db.execute(query, params or ())
-                await db.commit()
                 return cursor
         except Exception as e:
             logger.error(f"Database query failed: {str(e)}\nQuery: {query}\nParams: {params}")
@@ -64,7 +79,7 @@ class Database:
     async def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict]:
         """Получает одну запись из базы данных"""
         try:
-            async with await self._get_connection() as db:
+            async with self.pool.read() as db:
                 cursor = await db.execute(query, params or ())
                 return await cursor.fetchone()
         except Exception as e:
@@ -74,213 +89,54 @@ class Database:
     async def fetch_all(self, query: str, params: tuple = None) -> List[Dict]:
         """Получает все записи из базы данных"""
         try:
-            async with await self._get_connection() as db:
+            async with self.pool.read() as db:
                 cursor = await db.execute(query, params or ())
                 return await cursor.fetchall()
         except Exception as e:
             logger.error(f"Database fetch_all failed: {str(e)}\nQuery: {query}\nParams: {params}")
             raise DatabaseError(f"Database fetch_all failed: {str(e)}") from e
 
-    async def create_tables(self):
-        """Создает необходимые таблицы в базе данных"""
+    async def migrate(self) -> int:
+        """Приводит схему базы данных к актуальной версии"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                # Основная таблица пользователей Telegram
-                await db.execute('''
-                    CREATE TABLE IF NOT EXISTS telegram_users (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        telegram_id INTEGER UNIQUE,
-                        username TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-
-                # Таблица каналов пользователей
-                await db.execute('''
-                    CREATE TABLE IF NOT EXISTS user_channels (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        telegram_user_id INTEGER,
-                        platform TEXT CHECK(platform IN ('youtube', 'tiktok', 'shorts', 'twitch', 'other')),
-                        channel_link TEXT,
-                        channel_name TEXT,
-                        
-                        -- Данные для партнерской программы
-                        promo_code TEXT,                    -- Промокод блогера
-                        blogger_nickname TEXT,              -- Никнейм на платформе
-                        
-                        -- Статистика канала
-                        views_count INTEGER DEFAULT 0,      -- Количество просмотров
-                        twitch_viewers INTEGER DEFAULT 0,   -- Среднее количество зрителей (для Twitch)
-                        experience TEXT,                    -- Опыт работы
-                        frequency TEXT,                     -- Частота выпуска контента
-                        
-                        -- Общая статистика
-                        total_requests INTEGER DEFAULT 0,      -- Всего заявок
-                        approved_requests INTEGER DEFAULT 0,   -- Одобренных заявок
-                        pending_requests INTEGER DEFAULT 0,    -- Заявок в ожидании
-                        rejected_requests INTEGER DEFAULT 0,   -- Отклоненных заявок
-                        
-                        -- Финансовая статистика
-                        pending_amount DECIMAL(10,2) DEFAULT 0.00,    -- Сумма в ожидании
-                        total_earned DECIMAL(10,2) DEFAULT 0.00,      -- Всего заработано
-                        
-                        -- Служебные поля
-                        status TEXT DEFAULT 'pending',
-                        admin_comment TEXT,
-                        is_active BOOLEAN DEFAULT TRUE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        
-                        FOREIGN KEY (telegram_user_id) REFERENCES telegram_users(id),
-                        UNIQUE(telegram_user_id, channel_link, platform)
-                    )
-                ''')
-
-                # Добавляем новые колонки, если их нет
-                try:
-                    await db.execute('ALTER TABLE user_channels ADD COLUMN views_count INTEGER DEFAULT 0')
-                    await db.execute('ALTER TABLE user_channels ADD COLUMN experience TEXT')
-                    await db.execute('ALTER TABLE user_channels ADD COLUMN frequency TEXT')
-                    await db.execute('ALTER TABLE user_channels ADD COLUMN twitch_viewers INTEGER DEFAULT 0')
-                except aiosqlite.OperationalError:
-                    # Колонки уже существуют
-                    pass
-
-                # Таблица заявок на выплаты
-                await db.execute('''
-                    CREATE TABLE IF NOT EXISTS payment_requests (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        channel_id INTEGER,
-                        content_link TEXT NOT NULL,           -- Ссылка на контент
-                        content_type TEXT NOT NULL,           -- Тип контента (видео/стрим/etc)
-                        views_count INTEGER,                  -- Количество просмотров
-                        requested_amount DECIMAL(10,2),       -- Запрошенная сумма
-                        approved_amount DECIMAL(10,2),        -- Одобренная сумма
-                        status TEXT DEFAULT 'pending' CHECK(
-                            status IN ('pending', 'approved', 'rejected', 'paid')
-                        ),
-                        admin_comment TEXT,                   -- Комментарий администратора
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        
-                        FOREIGN KEY (channel_id) REFERENCES user_channels(id)
-                    )
-                ''')
-
-                # Удаляем создание таблицы blogger_connections
-                await db.execute('DROP TABLE IF EXISTS blogger_connections')
-                await db.commit()
-
-                # Таблица для заявок с множественными площадками
-                await db.execute('''
-                    CREATE TABLE IF NOT EXISTS collaboration_applications (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        telegram_user_id INTEGER,
-                        status TEXT DEFAULT 'pending',
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (telegram_user_id) REFERENCES telegram_users(id)
-                    )
-                ''')
-
-                # Таблица для площадок в рамках одной заявки
-                await db.execute('''
-                    CREATE TABLE IF NOT EXISTS application_platforms (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        application_id INTEGER,
-                        platform TEXT CHECK(platform IN ('youtube', 'tiktok', 'shorts', 'twitch', 'other')),
-                        channel_link TEXT,
-                        views_count INTEGER,
-                        experience TEXT,
-                        frequency TEXT,
-                        promo_code TEXT,
-                        platform_order INTEGER,  -- порядковый номер площадки в заявке
-                        FOREIGN KEY (application_id) REFERENCES collaboration_applications(id)
-                    )
-                ''')
-
-                # Таблица для заявок на оплату контента
-                await db.execute('''
-                    CREATE TABLE IF NOT EXISTS paid_content_applications (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        user_id INTEGER NOT NULL,
-                        username TEXT,
-                        user_mention TEXT,
-                        content_type TEXT NOT NULL,
-                        link TEXT NOT NULL,
-                        publish_date TEXT,
-                        views_count INTEGER,
-                        current_views INTEGER,
-                        payment_amount REAL,
-                        note TEXT,
-                        status TEXT DEFAULT 'pending' CHECK(
-                            status IN ('pending', 'approved', 'rejected', 'paid')
-                        ),
-                        admin_comment TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (user_id) REFERENCES telegram_users(id)
-                    )
-                ''')
+            return await migrations.migrate(self.pool)
+        except Exception as e:
+            self.logger.error(f"Error migrating database: {e}")
+            raise DatabaseError(f"Failed to migrate database: {e}")
 
-                # Добавляем колонку channel_id, если её нет
-                try:
-                    await db.execute('ALTER TABLE paid_content_applications ADD COLUMN channel_id INTEGER REFERENCES user_channels(id)')
-                except aiosqlite.OperationalError:
-                    # Колонка уже существует
-                    pass
+    async def verify_query_plans(self) -> Dict[str, List[str]]:
+        """
+        Проверяет, что частые запросы (hot_query) выполняются по индексам.
 
-                # Добавляем индексы для оптимизации запросов
-                await db.execute('''
-                    CREATE INDEX IF NOT EXISTS idx_paid_content_user_id 
-                    ON paid_content_applications(user_id)
-                ''')
-                await db.execute('''
-                    CREATE INDEX IF NOT EXISTS idx_paid_content_status 
-                    ON paid_content_applications(status)
-                ''')
+        Проблемы только пишутся в лог: без индекса бот работает, но медленнее.
 
-                await db.commit()
-                
-                # Проверяем существование необходимых столбцов
-                cursor = await db.execute("PRAGMA table_info(paid_content_applications)")
-                columns = {column[1] for column in await cursor.fetchall()}
-                
-                required_columns = {
-                    'user_id', 'username', 'user_mention', 'content_type', 'link',
-                    'publish_date', 'views_count', 'current_views', 'payment_amount',
-                    'note', 'status', 'admin_comment', 'created_at', 'updated_at'
-                }
-                
-                missing_columns = required_columns - columns
-                if missing_columns:
-                    self.logger.warning(f"Missing columns in paid_content_applications: {missing_columns}")
-                    for column in missing_columns:
-                        try:
-                            if column in {'current_views', 'payment_amount'}:
-                                await db.execute(f'ALTER TABLE paid_content_applications ADD COLUMN {column} REAL')
-                            else:
-                                await db.execute(f'ALTER TABLE paid_content_applications ADD COLUMN {column} TEXT')
-                        except Exception as e:
-                            self.logger.error(f"Error adding column {column}: {e}")
-                
-                await db.commit()
-                
+        Returns:
+            Запросы без подходящего индекса и проблемные шаги их планов
+        """
+        try:
+            async with self.pool.read() as db:
+                problems = await check_query_plans(db)
         except Exception as e:
-            self.logger.error(f"Error creating tables: {e}")
-            raise DatabaseError(f"Failed to create tables: {e}")
+            self.logger.error(f"Error checking query plans: {e}")
+            return {}
+
+        for name, steps in problems.items():
+            logger.warning(f"Hot query {name} does not use an index: {'; '.join(steps)}")
+        if not problems:
+            logger.info(f"Query plan self-check passed: {len(HOT_QUERIES)} hot queries use indexes")
+        return problems
 
     async def add_media(self, user_id: int, media_type: str, file_id: str, caption: str = None):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.pool.write() as db:
             await db.execute(
                 'INSERT INTO media_content (user_id, media_type, file_id, caption) VALUES (?, ?, ?, ?)',
                 (user_id, media_type, file_id, caption)
             )
-            await db.commit()
 
     async def get_applications_stats(self):
         """Получает статистику по всем каналам и заявкам"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 cursor = await db.execute('''
                     SELECT 
                         COUNT(DISTINCT uc.id) as total_channels,
@@ -315,62 +171,99 @@ class Database:
                 'total_earned': 0.0
             }
 
-    async def is_approved_blogger(self, username: str) -> bool:
-        """Проверяет, является ли пользователь одобренным блогером."""
+    _IS_APPROVED_BLOGGER_SQL = hot_query('is_approved_blogger', '''
+        SELECT 1 FROM user_channels uc
+        JOIN telegram_users tu ON uc.telegram_user_id = tu.id
+        WHERE tu.telegram_id = ?
+        AND uc.is_active = TRUE
+        AND uc.status = 'approved'
+        LIMIT 1
+    ''')
+
+    async def is_approved_blogger(self, telegram_id: int) -> bool:
+        """Проверяет, является ли пользователь одобренным блогером (с кэшированием по Telegram ID)."""
+        cached = self.approval_cache.get(telegram_id)
+        if cached is not None:
+            return cached
+
+        generation = self.approval_cache.generation
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
-                cursor = await db.execute('''
-                    SELECT 1 FROM user_channels uc
-                    JOIN telegram_users tu ON uc.telegram_user_id = tu.id
-                    WHERE (tu.username = ? OR tu.username = ? OR tu.username = ?)
-                    AND uc.is_active = TRUE
-                    AND uc.status = 'approved'
-                    LIMIT 1
-                ''', (
-                    username,  # Проверяем как есть
-                    f"@{username}",  # Проверяем с @
-                    username.lstrip('@')  # Проверяем без @
-                ))
-                result = await cursor.fetchone()
-                return bool(result)
+            async with self.pool.read() as db:
+                cursor = await db.execute(self._IS_APPROVED_BLOGGER_SQL, (telegram_id,))
+                is_approved = bool(await cursor.fetchone())
         except Exception as e:
             logger.error(f"Error checking approved blogger status: {e}")
             return False
 
+        self.approval_cache.set(telegram_id, is_approved, generation)
+        return is_approved
+
+    async def _get_channel_owner(self, db: aiosqlite.Connection, channel_id: int) -> Optional[int]:
+        """Получает Telegram ID владельца канала"""
+        cursor = await db.execute('''
+            SELECT tu.telegram_id FROM user_channels uc
+            JOIN telegram_users tu ON uc.telegram_user_id = tu.id
+            WHERE uc.id = ?
+        ''', (channel_id,))
+        row = await cursor.fetchone()
+        return row[0] if row else None
+
     async def save_paid_content_application(self, user_id: int, username: str | None, 
                                           content_type: str, link: str, publish_date: str, 
-                                          note: str, views_count: int) -> int:
+                                          note: str, views_count: int) -> Optional[int]:
+        """Сохраняет заявку на оплату контента (None - на эту публикацию уже есть заявка)"""
         # Создаем user_mention: если есть username, используем его, иначе используем ID
         user_mention = f"@{username}" if username else f"id{user_id}"
         
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute('''
-                INSERT INTO paid_content_applications 
-                (user_id, username, user_mention, content_type, link, publish_date, note, views_count, status)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending')
-            ''', (user_id, username, user_mention, content_type, link, publish_date, note, views_count))
-            await db.commit()
+        async with self.pool.write() as db:
+            try:
+                cursor = await db.execute('''
+                    INSERT INTO paid_content_applications 
+                    (user_id, username, user_mention, content_type, link, link_key, publish_date, note, views_count, status)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending')
+                ''', (user_id, username, user_mention, content_type, link, content_key(link),
+                      publish_date, note, views_count))
+            except aiosqlite.IntegrityError:
+                # Заявку на ту же публикацию успели подать между проверкой и сохранением
+                self.logger.warning(f"Duplicate paid content application from {user_id}: {link}")
+                return None
             return cursor.lastrowid
 
+    _PAID_CONTENT_DUPLICATE_SQL = hot_query('find_paid_content_duplicate', '''
+        SELECT id, user_id, status FROM paid_content_applications
+        WHERE link_key = ? AND status != 'rejected'
+    ''')
+
+    async def find_paid_content_duplicate(self, link: str) -> Optional[Dict]:
+        """Ищет неотклоненную заявку на ту же публикацию (по нормализованному ключу ссылки)"""
+        key = content_key(link)
+        if key is None:
+            return None
+        async with self.pool.read() as db:
+            cursor = await db.execute(self._PAID_CONTENT_DUPLICATE_SQL, (key,))
+            row = await cursor.fetchone()
+            return dict(row) if row else None
+
+    _USER_APPLICATIONS_STATS_SQL = hot_query('get_user_applications_stats', '''
+        SELECT 
+            paid_count,
+            pending_count + approved_count + rejected_count as unpaid_count
+        FROM user_application_counters 
+        WHERE user_id = ?
+    ''')
+
     async def get_user_applications_stats(self, user_id: int):
-        """Получает статистику заявок пользователя"""
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute('''
-                SELECT 
-                    COUNT(CASE WHEN status = 'paid' THEN 1 END) as paid_count,
-                    COUNT(CASE WHEN status != 'paid' THEN 1 END) as unpaid_count
-                FROM paid_content_applications 
-                WHERE user_id = ?
-            ''', (user_id,))
+        """Получает статистику заявок пользователя (из счетчиков user_application_counters)"""
+        async with self.pool.read() as db:
+            cursor = await db.execute(self._USER_APPLICATIONS_STATS_SQL, (user_id,))
             row = await cursor.fetchone()
+            if not row:
+                return {'paid': 0, 'unpaid': 0}
             return {'paid': row[0], 'unpaid': row[1]}
 
     async def get_user_applications(self, user_id: int, offset: int = 0, limit: int = 10):
         """Получает список заявок пользователя с пагинацией"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            
+        async with self.pool.read() as db:
             # Получаем общее количество заявок пользователя
             cursor = await db.execute(
                 'SELECT COUNT(*) as total FROM paid_content_applications WHERE user_id = ?',
@@ -389,46 +282,9 @@ class Database:
             applications = await cursor.fetchall()
             return applications, total
 
-    async def add_username_column(self):
-        """Добавляет столбец username в таблицу paid_content_applications если его нет"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Проверяем существование столбца username
-            cursor = await db.execute("PRAGMA table_info(paid_content_applications)")
-            columns = await cursor.fetchall()
-            has_username = any(column[1] == 'username' for column in columns)
-            
-            if not has_username:
-                try:
-                    await db.execute('ALTER TABLE paid_content_applications ADD COLUMN username TEXT')
-                    await db.commit()
-                except:
-                    pass  # Если столбец уже существует, пропускаем 
-
-    async def add_user_mention_column(self):
-        """Добавляет столбец user_mention в таблицу paid_content_applications если его нет"""
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute("PRAGMA table_info(paid_content_applications)")
-            columns = await cursor.fetchall()
-            has_user_mention = any(column[1] == 'user_mention' for column in columns)
-            
-            if not has_user_mention:
-                try:
-                    await db.execute('ALTER TABLE paid_content_applications ADD COLUMN user_mention TEXT')
-                    # Обновляем существующие записи
-                    await db.execute('''
-                        UPDATE paid_content_applications 
-                        SET user_mention = COALESCE('@' || username, 'id' || user_id)
-                        WHERE user_mention IS NULL
-                    ''')
-                    await db.commit()
-                except:
-                    pass 
-
     async def get_user_applications_by_status(self, user_id: int, status: str, offset: int = 0, limit: int = 10):
         """Получает список заявок пользователя с фильтром по статусу"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            
+        async with self.pool.read() as db:
             # Получаем общее количество заявок пользователя с данным статусом
             cursor = await db.execute(
                 'SELECT COUNT(*) as total FROM paid_content_applications WHERE user_id = ? AND status = ?',
@@ -447,10 +303,146 @@ class Database:
             applications = await cursor.fetchall()
             return applications, total 
 
+    async def count_user_applications(self, user_id: int, status: str) -> int:
+        """Получает количество заявок пользователя с указанным статусом (из счетчиков)"""
+        column = USER_APPLICATION_COUNTER_COLUMNS.get(status)
+        if column is None:
+            return 0
+        async with self.pool.read() as db:
+            cursor = await db.execute(
+                f'SELECT {column} FROM user_application_counters WHERE user_id = ?',
+                (user_id,)
+            )
+            row = await cursor.fetchone()
+            return row[0] if row else 0
+
+    async def rebuild_user_application_counters(self) -> int:
+        """
+        Пересчитывает счетчики заявок всех пользователей с нуля.
+
+        Счетчики поддерживаются триггерами; пересчет нужен, если таблицу
+        заявок меняли в обход них (например, восстановили из резервной копии).
+
+        Returns:
+            Количество пользователей со счетчиками
+        """
+        try:
+            async with self.pool.write() as db:
+                await db.execute('DELETE FROM user_application_counters')
+                cursor = await db.execute('''
+                    INSERT INTO user_application_counters
+                        (user_id, pending_count, approved_count, rejected_count, paid_count)
+                    SELECT
+                        user_id,
+                        SUM(status IS 'pending'), SUM(status IS 'approved'),
+                        SUM(status IS 'rejected'), SUM(status IS 'paid')
+                    FROM paid_content_applications
+                    GROUP BY user_id
+                ''')
+                return cursor.rowcount
+        except Exception as e:
+            logger.error(f"Error rebuilding user application counters: {e}")
+            raise DatabaseError(f"Failed to rebuild user application counters: {e}")
+
+    async def rekey_links(self) -> int:
+        """
+        Пересчитывает ключи ссылок каналов и публикаций по текущим правилам LINK_RULES.
+
+        Миграция 0009 считает ключи по своей замороженной копии правил, поэтому
+        после изменения правил ключи в базе обновляются этой командой. Как и в
+        миграции, при дублях ключ получает самая ранняя заявка, у остальных он
+        сбрасывается (они видны в логе).
+
+        Returns:
+            Количество заявок, у которых изменился ключ
+        """
+        # (таблица, столбец ключа, функция ключа, запрос: id, ключ, ссылка, область уникальности, под индексом)
+        tables = (
+            ('user_channels', 'channel_key', canonical_key, '''
+                SELECT id, channel_key, channel_link, platform, is_active = TRUE AND status != 'rejected'
+                FROM user_channels ORDER BY id
+            '''),
+            ('paid_content_applications', 'link_key', content_key, '''
+                SELECT id, link_key, link, NULL, status != 'rejected'
+                FROM paid_content_applications ORDER BY id
+            '''),
+        )
+        try:
+            changed = 0
+            async with self.pool.write() as db:
+                for table, column, make_key, query in tables:
+                    cursor = await db.execute(query)
+                    seen = set()
+                    updates = []
+                    for row_id, old_key, link, scope, indexed in await cursor.fetchall():
+                        key = make_key(link) if link else None
+                        if key is not None and indexed:
+                            if (scope, key) in seen:
+                                logger.warning(f"{table} {row_id} duplicates an earlier row: {key}")
+                                key = None
+                            seen.add((scope, key))
+                        if key != old_key:
+                            updates.append((key, row_id))
+
+                    # Сначала сбрасываем измененные ключи, чтобы обмен ключами между
+                    # строками не нарушил уникальный индекс посреди обновления
+                    await db.executemany(
+                        f"UPDATE {table} SET {column} = NULL WHERE id = ?",
+                        [(row_id,) for _, row_id in updates]
+                    )
+                    await db.executemany(f"UPDATE {table} SET {column} = ? WHERE id = ?", updates)
+                    changed += len(updates)
+            return changed
+        except Exception as e:
+            logger.error(f"Error rekeying links: {e}")
+            raise DatabaseError(f"Failed to rekey links: {e}")
+
+    # Навигация по заявкам пользователя: запрос для каждого действия
+    _USER_APPLICATION_CURSOR_SQL = {
+        action: hot_query(f'get_user_application_by_cursor:{action}', f'''
+            SELECT * FROM paid_content_applications 
+            WHERE user_id = ? AND status = ? {seek}
+            ORDER BY created_at {order}, id {order}
+            LIMIT 1
+        ''')
+        for action, seek, order in (
+            ('first', '', 'DESC'),
+            ('last', '', 'ASC'),
+            ('next', '''AND (created_at, id) < (
+                SELECT created_at, id FROM paid_content_applications WHERE id = ?
+            )''', 'DESC'),
+            ('prev', '''AND (created_at, id) > (
+                SELECT created_at, id FROM paid_content_applications WHERE id = ?
+            )''', 'ASC'),
+        )
+    }
+
+    async def get_user_application_by_cursor(self, user_id: int, status: str, action: str, cursor_id: int = None):
+        """
+        Получает одну заявку пользователя относительно заявки cursor_id.
+
+        Заявки упорядочены от новых к старым по (created_at, id).
+        action: first - самая новая, last - самая старая,
+        next - следующая (более старая) после cursor_id,
+        prev - предыдущая (более новая) перед cursor_id.
+        Каждый вызов - один поиск по индексу (user_id, status, created_at, id).
+        """
+        query = self._USER_APPLICATION_CURSOR_SQL.get(action)
+        if query is None:
+            raise ValueError(f"Unknown navigation action: {action}")
+
+        params = [user_id, status]
+        if action in ('next', 'prev'):
+            params.append(cursor_id)
+
+        async with self.pool.read() as db:
+            cursor = await db.execute(query, params)
+            return await cursor.fetchone()
+
     async def get_paid_content_applications(self, offset: int = 0, limit: int = 1):
         """Получает список заявок на оплату контента с пагинацией"""
         try:
-            async with await self._get_connection() as db:
+            async with self.pool.read() as db:
                 cursor = await db.execute('''
                     SELECT * FROM paid_content_applications 
                     WHERE status = 'pending'
@@ -465,7 +457,7 @@ class Database:
     async def get_paid_content_applications_count(self) -> int:
         """Получает общее количество заявок на оплату контента"""
         try:
-            async with await self._get_connection() as db:
+            async with self.pool.read() as db:
                 cursor = await db.execute('''
                     SELECT COUNT(*) as count 
                     FROM paid_content_applications 
@@ -480,8 +472,7 @@ class Database:
     async def get_paid_content_application(self, app_id: int):
         """Получает информацию о конкретной заявке на оплату контента"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.pool.read() as db:
                 cursor = await db.execute('''
                     SELECT * FROM paid_content_applications 
                     WHERE id = ?
@@ -494,9 +485,7 @@ class Database:
     async def update_paid_content_status(self, app_id: int, status: str, current_views: int = None, payment_amount: float = None):
         """Обновляет статус заявки на оплату контента"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
-                
+            async with self.pool.write() as db:
                 # Формируем SQL запрос в зависимости от наличия дополнительных данных
                 if current_views is not None and payment_amount is not None:
                     await db.execute('''
@@ -504,18 +493,17 @@ class Database:
                         SET status = ?,
                             current_views = ?,
                             payment_amount = ?,
-                            status_changed_at = CURRENT_TIMESTAMP
+                            updated_at = CURRENT_TIMESTAMP
                         WHERE id = ?
                     ''', (status, current_views, payment_amount, app_id))
                 else:
                     await db.execute('''
                         UPDATE paid_content_applications 
                         SET status = ?,
-                            status_changed_at = CURRENT_TIMESTAMP
+                            updated_at = CURRENT_TIMESTAMP
                         WHERE id = ?
                     ''', (status, app_id))
                 
-                await db.commit()
                 
                 cursor = await db.execute('''
                     SELECT * FROM paid_content_applications 
@@ -529,8 +517,7 @@ class Database:
     async def get_existing_connections(self, telegram_username: str, platform: str) -> List[Dict]:
         """Получает все существующие связи пользователя для указанной платформы"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.pool.read() as db:
                 # Очищаем username от @ если он есть
                 clean_username = telegram_username.lstrip('@')
                 
@@ -550,8 +537,7 @@ class Database:
     async def create_blogger_connection(self, telegram_username: str, blogger_nickname: str, platform: str, promo: str, channel_link: str):
         """Создает связь между Telegram пользователем и никнеймом блогера для конкретной платформы"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.pool.write() as db:
                 # Очищаем username от @ если он есть
                 clean_username = telegram_username.lstrip('@')
                 
@@ -562,7 +548,6 @@ class Database:
                     VALUES (?, ?, ?, ?, ?, TRUE)
                 ''', (clean_username, blogger_nickname, platform, promo, channel_link))
                 
-                await db.commit()
         except Exception as e:
             logger.error(f"Error creating blogger connection: {e}")
             raise DatabaseError(f"Failed to create blogger connection: {e}")
@@ -570,8 +555,7 @@ class Database:
     async def get_blogger_by_telegram(self, telegram_username: str) -> List[Dict]:
         """Получает все активные связи блогера по Telegram username"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.pool.read() as db:
                 cursor = await db.execute('''
                     SELECT blogger_nickname, platform, promo_code 
                     FROM blogger_connections 
@@ -586,8 +570,7 @@ class Database:
     async def get_telegram_by_blogger(self, blogger_nickname: str) -> Optional[str]:
         """Получает Telegram username по никнейму блогера"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.pool.read() as db:
                 cursor = await db.execute('''
                     SELECT telegram_username 
                     FROM blogger_connections 
@@ -602,8 +585,7 @@ class Database:
     async def get_all_active_bloggers(self) -> List[Dict]:
         """Получает список всех активных блогеров с количеством ожидающих заявок"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.pool.read() as db:
                 cursor = await db.execute('''
                     SELECT 
                         bc.blogger_nickname,
@@ -624,8 +606,7 @@ class Database:
     async def get_blogger_applications(self, blogger_nickname: str, status: Optional[str] = None, page: int = 0, limit: int = 5) -> List[Dict]:
         """Получает заявки блогера с фильтром по статусу и пагинацией"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.pool.read() as db:
                 query = '''
                     SELECT pca.* 
                     FROM paid_content_applications pca
@@ -650,8 +631,7 @@ class Database:
     async def get_application(self, app_id: int):
         """Получает информацию о конкретной заявке на сотрудничество"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.pool.read() as db:
                 cursor = await db.execute('''
                     SELECT * FROM collaboration 
                     WHERE id = ?
@@ -661,30 +641,10 @@ class Database:
             logger.error(f"Error getting application {app_id}: {e}")
             raise DatabaseError(f"Failed to get application: {e}")
 
-    async def add_payment_columns(self):
-        """Добавляет столбцы для хранения информации об оплате"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Проверяем существование столбцов
-            cursor = await db.execute("PRAGMA table_info(paid_content_applications)")
-            columns = await cursor.fetchall()
-            column_names = [column[1] for column in columns]
-            
-            try:
-                if 'current_views' not in column_names:
-                    await db.execute('ALTER TABLE paid_content_applications ADD COLUMN current_views INTEGER')
-                
-                if 'payment_amount' not in column_names:
-                    await db.execute('ALTER TABLE paid_content_applications ADD COLUMN payment_amount REAL')
-                
-                await db.commit()
-            except Exception as e:
-                logger.error(f"Error adding payment columns: {e}")
-                raise DatabaseError(f"Failed to add payment columns: {e}") 
-
     async def count_blogger_applications(self, blogger_nickname: str, status: Optional[str] = None) -> int:
         """Получает количество заявок блогера с фильтром по статусу"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 query = '''
                     SELECT COUNT(*) as count
                     FROM paid_content_applications pca
@@ -707,7 +667,7 @@ class Database:
     async def init_db(self):
         """Инициализирует базу данных"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 # Создаем таблицы
                 await db.execute('''
                     CREATE TABLE IF NOT EXISTS users (
@@ -729,7 +689,6 @@ class Database:
                 # Добавляем колонку promo_code, если её нет
                 try:
                     await db.execute('ALTER TABLE blogger_connections ADD COLUMN promo_code TEXT')
-                    await db.commit()
                 except aiosqlite.OperationalError:
                     # Колонка уже существует
                     pass
@@ -746,10 +705,21 @@ class Database:
                     )
                 ''')
 
-                await db.commit()
         except Exception as e:
             raise DatabaseError(f"Failed to initialize database: {e}") 
 
+    # Канал ищется по нормализованному ключу ссылки (один проход по уникальному индексу),
+    # поэтому разные написания одной ссылки считаются одним каналом
+    _CHANNEL_EXISTS_SQL = hot_query('check_channel_exists', """
+        SELECT uc.*, tu.telegram_id, tu.username
+        FROM user_channels uc
+        JOIN telegram_users tu ON uc.telegram_user_id = tu.id
+        WHERE uc.channel_key = ? 
+        AND uc.platform = ?
+        AND uc.is_active = TRUE
+        AND uc.status != 'rejected'
+    """)
+
     async def check_channel_exists(self, channel_link: str, platform: str, telegram_id: int = None) -> Dict:
         """
         Проверяет существование канала в базе
@@ -758,22 +728,10 @@ class Database:
             Dict с информацией о существующем канале или None
         """
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.pool.read() as db:
+                params = [canonical_key(channel_link), platform]
                 
-                # Базовый запрос для проверки существования канала
-                query = """
-                    SELECT uc.*, tu.telegram_id, tu.username
-                    FROM user_channels uc
-                    JOIN telegram_users tu ON uc.telegram_user_id = tu.id
-                    WHERE uc.channel_link = ? 
-                    AND uc.platform = ?
-                    AND uc.is_active = TRUE
-                    AND uc.status != 'rejected'
-                """
-                params = [channel_link, platform]
-                
-                cursor = await db.execute(query, params)
+                cursor = await db.execute(self._CHANNEL_EXISTS_SQL, params)
                 channel = await cursor.fetchone()
                 
                 if not channel:
@@ -798,6 +756,13 @@ class Database:
             self.logger.error(f"Error checking channel existence: {e}")
             raise DatabaseError(f"Failed to check channel: {e}")
 
+    _USER_CHANNEL_BY_KEY_SQL = hot_query('add_channel:existing', """
+        SELECT id, status 
+        FROM user_channels 
+        WHERE telegram_user_id = ? AND channel_key = ? AND platform = ?
+        ORDER BY status = 'rejected'
+    """)
+
     async def add_channel(
         self, 
         telegram_id: int, 
@@ -808,10 +773,16 @@ class Database:
         experience: str = None,
         frequency: str = None,
         promo_code: str = None
-    ) -> int:
-        """Добавляет новый канал пользователю или обновляет отклоненную заявку"""
+    ) -> Optional[int]:
+        """
+        Добавляет новый канал пользователю или обновляет отклоненную заявку.
+
+        Returns:
+            ID канала; None - канал уже зарегистрирован (этим или другим пользователем);
+            False - ошибка сохранения
+        """
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 # Получаем telegram_user_id
                 cursor = await db.execute(
                     "SELECT id FROM telegram_users WHERE telegram_id = ?",
@@ -822,24 +793,25 @@ class Database:
                     self.logger.error(f"User not found: {telegram_id}")
                     return False
 
-                # Проверяем существование канала
-                cursor = await db.execute("""
-                    SELECT id, status 
-                    FROM user_channels 
-                    WHERE telegram_user_id = ? AND channel_link = ? AND platform = ?
-                """, (user[0], channel_link, platform))
+                # Проверяем существование канала (по нормализованному ключу, неотклоненные первыми)
+                channel_key = canonical_key(channel_link)
+                cursor = await db.execute(
+                    self._USER_CHANNEL_BY_KEY_SQL,
+                    (user[0], channel_key, platform)
+                )
                 existing_channel = await cursor.fetchone()
 
                 if existing_channel:
                     if existing_channel[1] != 'rejected':
                         self.logger.warning(f"Channel already exists and not rejected: {channel_link}")
-                        return False
+                        return None
                     
                     # Обновляем существующую отклоненную заявку
                     self.logger.info(f"Updating rejected channel application: {channel_link}")
                     await db.execute("""
                         UPDATE user_channels 
                         SET status = 'pending',
+                            channel_link = ?,
                             channel_name = ?,
                             views_count = ?,
                             experience = ?,
@@ -848,27 +820,33 @@ class Database:
                             admin_comment = NULL,
                             updated_at = CURRENT_TIMESTAMP
                         WHERE id = ?
-                    """, (channel_name, views_count, experience, frequency, promo_code, existing_channel[0]))
-                    await db.commit()
+                    """, (channel_link, channel_name, views_count, experience, frequency, promo_code, existing_channel[0]))
                     return existing_channel[0]
                 
                 # Добавляем новый канал
                 self.logger.info(f"Adding new channel for user {telegram_id}: {platform} - {channel_link}")
                 cursor = await db.execute("""
                     INSERT INTO user_channels 
-                    (telegram_user_id, platform, channel_link, channel_name, 
+                    (telegram_user_id, platform, channel_link, channel_key, channel_name, 
                      views_count, experience, frequency, promo_code, status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending')
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending')
                 """, (
-                    user[0], platform, channel_link, channel_name,
+                    user[0], platform, channel_link, channel_key, channel_name,
                     views_count, experience, frequency, promo_code
                 ))
-                await db.commit()
                 
                 channel_id = cursor.lastrowid
                 self.logger.info(f"Channel added successfully with ID: {channel_id}")
                 return channel_id
 
+        except aiosqlite.IntegrityError as e:
+            if 'UNIQUE' not in str(e):
+                self.logger.error(f"Error adding channel: {e}")
+                return False
+            # Уникальный индекс общий для всех пользователей: канал успел зарегистрировать
+            # другой пользователь (в том числе пока заявка этого была отклонена)
+            self.logger.warning(f"Channel already registered: {platform} {channel_link}")
+            return None
         except Exception as e:
             self.logger.error(f"Error adding channel: {e}")
             return False
@@ -876,8 +854,7 @@ class Database:
     async def get_user_channels(self, telegram_id: int) -> List[Dict]:
         """Получает все каналы пользователя со статистикой"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.pool.read() as db:
                 cursor = await db.execute("""
                     SELECT uc.* 
                     FROM user_channels uc
@@ -898,7 +875,7 @@ class Database:
     ) -> int:
         """Создает новую заявку на сотрудничество"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 cursor = await db.execute(
                     """
                     INSERT INTO collaboration_requests 
@@ -907,7 +884,6 @@ class Database:
                     """,
                     (channel_id, views_count, additional_info)
                 )
-                await db.commit()
                 return cursor.lastrowid
         except Exception as e:
             self.logger.error(f"Error creating collaboration request: {e}")
@@ -916,7 +892,7 @@ class Database:
     async def get_or_create_user(self, telegram_id: int, username: str) -> int:
         """Получает или создает пользователя Telegram"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 # Проверяем существование пользователя
                 cursor = await db.execute(
                     "SELECT id FROM telegram_users WHERE telegram_id = ?",
@@ -926,11 +902,11 @@ class Database:
                 
                 if user:
                     # Обновляем username если он изменился
+                    # Пользователь снова пишет боту - значит, больше его не блокирует
                     await db.execute(
-                        "UPDATE telegram_users SET username = ? WHERE telegram_id = ?",
+                        "UPDATE telegram_users SET username = ?, is_blocked = 0 WHERE telegram_id = ?",
                         (username, telegram_id)
                     )
-                    await db.commit()
                     return user[0]
                 
                 # Создаем нового пользователя
@@ -938,7 +914,6 @@ class Database:
                     "INSERT INTO telegram_users (telegram_id, username) VALUES (?, ?)",
                     (telegram_id, username)
                 )
-                await db.commit()
                 return cursor.lastrowid
         except Exception as e:
             self.logger.error(f"Error in get_or_create_user: {e}")
@@ -954,7 +929,7 @@ class Database:
     ) -> int:
         """Создает новую заявку на выплату"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 # Добавляем заявку
                 cursor = await db.execute("""
                     INSERT INTO payment_requests 
@@ -967,16 +942,106 @@ class Database:
                     UPDATE user_channels 
                     SET total_requests = total_requests + 1,
                         pending_requests = pending_requests + 1,
-                        pending_amount = pending_amount + ?
+                        pending_amount = ROUND(pending_amount + ?, 2)
                     WHERE id = ?
                 """, (requested_amount, channel_id))
                 
-                await db.commit()
                 return cursor.lastrowid
         except Exception as e:
             self.logger.error(f"Error creating payment request: {e}")
             raise DatabaseError(f"Failed to create payment request: {e}")
 
+    async def _apply_payment_transition(
+        self,
+        db: aiosqlite.Connection,
+        request_id: int,
+        new_status: str,
+        amount: float = None,
+        admin_comment: str = None
+    ) -> bool:
+        """
+        Переводит заявку на выплату в новый статус и обновляет итоги канала.
+
+        Статус меняется только при совпадении со старым (compare-and-set),
+        поэтому повторный клик или параллельная обработка той же заявки не
+        учитывают деньги дважды. Повтор уже выполненного перехода ничего не
+        меняет и считается успешным.
+        """
+        cursor = await db.execute(
+            "SELECT channel_id, requested_amount, approved_amount, status FROM payment_requests WHERE id = ?",
+            (request_id,)
+        )
+        request = await cursor.fetchone()
+        if not request:
+            return False
+
+        channel_id, requested_amount, approved_amount, old_status = request
+        if old_status == new_status:
+            return True
+        if new_status not in PAYMENT_TRANSITIONS.get(old_status, ()):
+            self.logger.warning(
+                f"Payment request {request_id}: transition {old_status} -> {new_status} is not allowed"
+            )
+            return False
+
+        if new_status == 'approved':
+            approved_amount = amount if amount is not None else requested_amount
+            cursor = await db.execute("""
+                UPDATE payment_requests 
+                SET status = 'approved',
+                    approved_amount = ?,
+                    admin_comment = COALESCE(?, admin_comment),
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND status = ?
+            """, (approved_amount, admin_comment, request_id, old_status))
+            stats_update = ("""
+                UPDATE user_channels 
+                SET pending_requests = pending_requests - 1,
+                    approved_requests = approved_requests + 1,
+                    pending_amount = ROUND(pending_amount - ?, 2),
+                    total_earned = ROUND(total_earned + ?, 2)
+                WHERE id = ?
+            """, (requested_amount or 0, approved_amount or 0, channel_id))
+        elif new_status == 'rejected':
+            cursor = await db.execute("""
+                UPDATE payment_requests 
+                SET status = 'rejected',
+                    admin_comment = COALESCE(?, admin_comment),
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND status = ?
+            """, (admin_comment, request_id, old_status))
+            stats_update = ("""
+                UPDATE user_channels 
+                SET pending_requests = pending_requests - 1,
+                    rejected_requests = rejected_requests + 1,
+                    pending_amount = ROUND(pending_amount - ?, 2)
+                WHERE id = ?
+            """, (requested_amount or 0, channel_id))
+        else:
+            # Выплата: в заработок канала идет фактически выплаченная сумма вместо одобренной
+            paid_amount = amount if amount is not None else approved_amount
+            cursor = await db.execute("""
+                UPDATE payment_requests 
+                SET status = 'paid',
+                    paid_amount = ?,
+                    paid_at = CURRENT_TIMESTAMP,
+                    admin_comment = COALESCE(?, admin_comment),
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND status = ?
+            """, (paid_amount, admin_comment, request_id, old_status))
+            stats_update = ("""
+                UPDATE user_channels 
+                SET total_earned = ROUND(total_earned + ? - ?, 2)
+                WHERE id = ?
+            """, (paid_amount or 0, approved_amount or 0, channel_id))
+
+        if cursor.rowcount == 0:
+            # Статус изменился между чтением и записью
+            return False
+
+        await db.execute(*stats_update)
+        return True
+
     async def update_payment_request_status(
         self, 
         request_id: int, 
@@ -984,59 +1049,72 @@ class Database:
         approved_amount: float = None,
         admin_comment: str = None
     ) -> bool:
-        """Обновляет статус заявки на выплату"""
+        """Обновляет статус заявки на выплату (pending -> approved/rejected, approved -> paid)"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                # Получаем текущую заявку
-                cursor = await db.execute(
-                    "SELECT channel_id, requested_amount, status FROM payment_requests WHERE id = ?",
-                    (request_id,)
+            async with self.pool.write() as db:
+                return await self._apply_payment_transition(
+                    db, request_id, new_status, approved_amount, admin_comment
                 )
-                request = await cursor.fetchone()
-                if not request:
-                    return False
-                    
-                channel_id, old_amount, old_status = request
-                
-                # Обновляем заявку
-                await db.execute("""
-                    UPDATE payment_requests 
-                    SET status = ?,
-                        approved_amount = ?,
-                        admin_comment = ?,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                """, (new_status, approved_amount, admin_comment, request_id))
-                
-                # Обновляем статистику канала
-                if new_status == 'approved':
-                    await db.execute("""
-                        UPDATE user_channels 
-                        SET pending_requests = pending_requests - 1,
-                            approved_requests = approved_requests + 1,
-                            pending_amount = pending_amount - ?,
-                            total_earned = total_earned + ?
-                        WHERE id = ?
-                    """, (old_amount, approved_amount, channel_id))
-                elif new_status == 'rejected':
-                    await db.execute("""
-                        UPDATE user_channels 
-                        SET pending_requests = pending_requests - 1,
-                            rejected_requests = rejected_requests + 1,
-                            pending_amount = pending_amount - ?
-                        WHERE id = ?
-                    """, (old_amount, channel_id))
-                
-                await db.commit()
-                return True
         except Exception as e:
             self.logger.error(f"Error updating payment request: {e}")
             return False 
 
+    async def reconcile_channel_totals(self) -> int:
+        """
+        Пересчитывает итоги всех каналов по таблице payment_requests.
+
+        Один UPDATE с группировкой заявок по каналам; каналы без заявок
+        получают нули.
+
+        Returns:
+            Количество каналов, итоги которых расходились с заявками
+        """
+        try:
+            async with self.pool.write() as db:
+                cursor = await db.execute("""
+                    UPDATE user_channels 
+                    SET total_requests = totals.total_requests,
+                        pending_requests = totals.pending_requests,
+                        approved_requests = totals.approved_requests,
+                        rejected_requests = totals.rejected_requests,
+                        pending_amount = totals.pending_amount,
+                        total_earned = totals.total_earned
+                    FROM (
+                        SELECT
+                            uc.id AS channel_id,
+                            COUNT(pr.id) AS total_requests,
+                            COUNT(CASE WHEN pr.status = 'pending' THEN 1 END) AS pending_requests,
+                            COUNT(CASE WHEN pr.status IN ('approved', 'paid') THEN 1 END) AS approved_requests,
+                            COUNT(CASE WHEN pr.status = 'rejected' THEN 1 END) AS rejected_requests,
+                            ROUND(TOTAL(CASE WHEN pr.status = 'pending' THEN pr.requested_amount END), 2) AS pending_amount,
+                            ROUND(TOTAL(CASE
+                                WHEN pr.status = 'approved' THEN pr.approved_amount
+                                WHEN pr.status = 'paid' THEN COALESCE(pr.paid_amount, pr.approved_amount)
+                            END), 2) AS total_earned
+                        FROM user_channels uc
+                        LEFT JOIN payment_requests pr ON pr.channel_id = uc.id
+                        GROUP BY uc.id
+                    ) AS totals
+                    WHERE totals.channel_id = user_channels.id
+                    AND (
+                        user_channels.total_requests, user_channels.pending_requests,
+                        user_channels.approved_requests, user_channels.rejected_requests,
+                        user_channels.pending_amount, user_channels.total_earned
+                    ) IS NOT (
+                        totals.total_requests, totals.pending_requests,
+                        totals.approved_requests, totals.rejected_requests,
+                        totals.pending_amount, totals.total_earned
+                    )
+                """)
+                return cursor.rowcount
+        except Exception as e:
+            self.logger.error(f"Error reconciling channel totals: {e}")
+            raise DatabaseError(f"Failed to reconcile channel totals: {e}")
+
     async def get_channel_stats(self, channel_id: int) -> Dict:
         """Получает статистику по конкретному каналу"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 cursor = await db.execute("""
                     SELECT 
                         COUNT(*) as total_requests,
@@ -1075,7 +1153,7 @@ class Database:
     async def update_channel_status(self, channel_id: int, status: str, admin_comment: str = None) -> bool:
         """Обновляет статус канала и добавляет комментарий администратора"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 if admin_comment:
                     await db.execute("""
                         UPDATE user_channels 
@@ -1088,9 +1166,11 @@ class Database:
                         SET status = ?, updated_at = CURRENT_TIMESTAMP
                         WHERE id = ?
                     """, (status, channel_id))
-                
-                await db.commit()
-                return True
+                owner_id = await self._get_channel_owner(db, channel_id)
+
+            # Сбрасываем кэш после фиксации транзакции
+            self.approval_cache.invalidate(owner_id)
+            return True
         except Exception as e:
             self.logger.error(f"Error updating channel status: {e}")
             return False
@@ -1098,8 +1178,7 @@ class Database:
     async def get_channels_by_status(self, status: str, limit: int = 10, offset: int = 0) -> List[Dict]:
         """Получает список каналов с определенным статусом"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.pool.read() as db:
                 cursor = await db.execute("""
                     SELECT 
                         uc.*,
@@ -1120,13 +1199,12 @@ class Database:
     async def add_admin_comment(self, channel_id: int, comment: str) -> bool:
         """Добавляет комментарий администратора к каналу"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute("""
                     UPDATE user_channels 
                     SET admin_comment = ?, updated_at = CURRENT_TIMESTAMP
                     WHERE id = ?
                 """, (comment, channel_id))
-                await db.commit()
                 return True
         except Exception as e:
             self.logger.error(f"Error adding admin comment: {e}")
@@ -1135,7 +1213,7 @@ class Database:
     async def get_statistics(self) -> Dict:
         """Получает общую статистику для админ-панели"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 cursor = await db.execute("""
                     SELECT 
                         COUNT(DISTINCT telegram_user_id) as total_users,
@@ -1167,7 +1245,7 @@ class Database:
     async def get_payment_stats(self, channel_id: int) -> Dict:
         """Получает статистику выплат по каналу"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 cursor = await db.execute("""
                     SELECT 
                         COUNT(*) as total_payments,
@@ -1198,18 +1276,10 @@ class Database:
             }
 
     async def process_payment(self, request_id: int, payment_amount: float) -> bool:
-        """Обрабатывает выплату"""
+        """Обрабатывает выплату по одобренной заявке (approved -> paid)"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute("""
-                    UPDATE payment_requests 
-                    SET status = 'paid',
-                        paid_amount = ?,
-                        paid_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                """, (payment_amount, request_id))
-                await db.commit()
-                return True
+            async with self.pool.write() as db:
+                return await self._apply_payment_transition(db, request_id, 'paid', payment_amount)
         except Exception as e:
             self.logger.error(f"Error processing payment: {e}")
             return False 
@@ -1217,7 +1287,7 @@ class Database:
     async def get_promo_stats(self, promo_code: str) -> Dict:
         """Получает статистику использования промокода"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 cursor = await db.execute("""
                     SELECT 
                         COUNT(*) as total_uses,
@@ -1244,17 +1314,25 @@ class Database:
     async def log_promo_use(self, promo_code: str, user_id: int, amount: float) -> bool:
         """Логирует использование промокода"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute("""
                     INSERT INTO promo_uses (promo_code, user_id, amount)
                     VALUES (?, ?, ?)
                 """, (promo_code, user_id, amount))
-                await db.commit()
                 return True
         except Exception as e:
             self.logger.error(f"Error logging promo use: {e}")
             return False 
 
+    _PROMO_OWNER_SQL = hot_query('check_promo_exists', """
+        SELECT tu.telegram_id 
+        FROM user_channels uc
+        JOIN telegram_users tu ON uc.telegram_user_id = tu.id
+        WHERE uc.promo_code = ? 
+        AND uc.is_active = TRUE
+        LIMIT 1
+    """)
+
     async def check_promo_exists(self, promo_code: str, telegram_id: int) -> bool:
         """
         Проверяет, существует ли промокод в базе данных
@@ -1268,15 +1346,8 @@ class Database:
             False если промокод свободен или принадлежит этому пользователю
         """
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                cursor = await db.execute("""
-                    SELECT tu.telegram_id 
-                    FROM user_channels uc
-                    JOIN telegram_users tu ON uc.telegram_user_id = tu.id
-                    WHERE uc.promo_code = ? 
-                    AND uc.is_active = TRUE
-                    LIMIT 1
-                """, (promo_code,))
+            async with self.pool.read() as db:
+                cursor = await db.execute(self._PROMO_OWNER_SQL, (promo_code,))
                 
                 result = await cursor.fetchone()
                 
@@ -1296,9 +1367,7 @@ class Database:
     async def get_payment_requests(self, status: str = None, limit: int = 10, offset: int = 0) -> List[Dict]:
         """Получает список заявок на выплату с фильтрацией"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
-                
+            async with self.pool.read() as db:
                 query = """
                     SELECT 
                         pr.*,
@@ -1325,20 +1394,12 @@ class Database:
     async def update_channel_viewers(self, channel_id: int, viewers_count: int) -> bool:
         """Обновляет количество зрителей для Twitch канала"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                # Добавляем колонку twitch_viewers, если её нет
-                try:
-                    await db.execute('ALTER TABLE user_channels ADD COLUMN twitch_viewers INTEGER DEFAULT 0')
-                except aiosqlite.OperationalError:
-                    # Колонка уже существует
-                    pass
-                
+            async with self.pool.write() as db:
                 await db.execute("""
                     UPDATE user_channels 
                     SET twitch_viewers = ?
                     WHERE id = ? AND platform = 'twitch'
                 """, (viewers_count, channel_id))
-                await db.commit()
                 return True
         except Exception as e:
             self.logger.error(f"Error updating Twitch viewers: {e}")
@@ -1347,7 +1408,7 @@ class Database:
     async def get_promo_effectiveness(self, promo_code: str) -> Dict:
         """Анализирует эффективность промокода"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 cursor = await db.execute("""
                     SELECT 
                         COUNT(*) as total_uses,
@@ -1378,7 +1439,7 @@ class Database:
     async def save_stream_stats(self, channel_id: int, stream_data: Dict) -> bool:
         """Сохраняет статистику стрима"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute("""
                     INSERT INTO stream_stats (
                         channel_id, 
@@ -1398,7 +1459,6 @@ class Database:
                     stream_data['chat_messages'],
                     stream_data['followers_gained']
                 ))
-                await db.commit()
                 return True
         except Exception as e:
             self.logger.error(f"Error saving stream stats: {e}")
@@ -1407,7 +1467,7 @@ class Database:
     async def save_vod_stats(self, channel_id: int, vod_data: Dict) -> bool:
         """Сохраняет статистику VOD"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute("""
                     INSERT INTO vod_stats (
                         channel_id,
@@ -1427,7 +1487,6 @@ class Database:
                     vod_data['likes'],
                     vod_data['comments']
                 ))
-                await db.commit()
                 return True
         except Exception as e:
             self.logger.error(f"Error saving VOD stats: {e}")
@@ -1436,7 +1495,7 @@ class Database:
     async def check_twitch_requirements(self, channel_id: int) -> Dict:
         """Проверяет соответствие требованиям для Twitch"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 # Получаем среднюю статистику за последний месяц
                 cursor = await db.execute("""
                     SELECT 
@@ -1474,8 +1533,7 @@ class Database:
     async def get_requests_by_status(self, status: str) -> List[Dict]:
         """Получает список заявок с определенным статусом"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.pool.read() as db:
                 cursor = await db.execute("""
                     SELECT 
                         uc.id,
@@ -1498,10 +1556,69 @@ class Database:
             self.logger.error(f"Error getting requests by status: {e}")
             return []
 
+    # Навигация по очереди заявок: следующая (next) и предыдущая (prev) заявка
+    _REQUEST_CURSOR_SQL = {
+        action: hot_query(f'get_{action}_request', f"""
+            SELECT 
+                uc.id,
+                tu.username,
+                uc.platform,
+                uc.channel_link as link,
+                uc.views_count,
+                uc.experience,
+                uc.frequency,
+                uc.promo_code,
+                uc.status,
+                uc.admin_comment,
+                datetime(uc.created_at, 'localtime') as created_at
+            FROM user_channels uc
+            JOIN telegram_users tu ON uc.telegram_user_id = tu.id
+            WHERE uc.status = ? AND uc.is_active = TRUE AND uc.id {condition} ?
+            ORDER BY uc.id {order}
+            LIMIT 1
+        """)
+        for action, condition, order in (('next', '<', 'DESC'), ('prev', '>', 'ASC'))
+    }
+
+    async def _get_request_by_cursor(self, status: str, action: str, cursor_id: int) -> Optional[Dict]:
+        """Получает одну заявку с указанным статусом рядом с заявкой cursor_id (поиск по индексу)"""
+        try:
+            async with self.pool.read() as db:
+                cursor = await db.execute(self._REQUEST_CURSOR_SQL[action], (status, cursor_id))
+                row = await cursor.fetchone()
+                return dict(row) if row else None
+        except Exception as e:
+            self.logger.error(f"Error getting request by cursor: {e}")
+            return None
+
+    async def get_next_request(self, status: str, after_id: Optional[int] = None) -> Optional[Dict]:
+        """Получает следующую заявку очереди после заявки after_id (новые заявки идут первыми)"""
+        if after_id is None:
+            after_id = 2 ** 63 - 1  # максимальный INTEGER в SQLite
+        return await self._get_request_by_cursor(status, 'next', after_id)
+
+    async def get_prev_request(self, status: str, before_id: int) -> Optional[Dict]:
+        """Получает предыдущую заявку очереди перед заявкой before_id"""
+        return await self._get_request_by_cursor(status, 'prev', before_id)
+
+    async def get_requests_count(self, status: str) -> int:
+        """Получает количество активных заявок с указанным статусом из счетчика"""
+        try:
+            async with self.pool.read() as db:
+                cursor = await db.execute(
+                    "SELECT total FROM channel_status_counters WHERE status = ?",
+                    (status,)
+                )
+                row = await cursor.fetchone()
+                return row[0] if row else 0
+        except Exception as e:
+            self.logger.error(f"Error getting requests count: {e}")
+            return 0
+
     async def approve_request(self, request_id: int, comment: str) -> bool:
         """Одобряет заявку на сотрудничество с комментарием"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute("""
                     UPDATE user_channels 
                     SET status = 'approved',
@@ -1509,8 +1626,10 @@ class Database:
                         updated_at = CURRENT_TIMESTAMP
                     WHERE id = ?
                 """, (comment, request_id))
-                await db.commit()
-                return True
+                owner_id = await self._get_channel_owner(db, request_id)
+
+            self.approval_cache.invalidate(owner_id)
+            return True
         except Exception as e:
             self.logger.error(f"Error approving request: {e}")
             return False
@@ -1518,7 +1637,7 @@ class Database:
     async def reject_request(self, request_id: int, comment: str) -> bool:
         """Отклоняет заявку на сотрудничество с комментарием"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute("""
                     UPDATE user_channels 
                     SET status = 'rejected', 
@@ -1526,8 +1645,10 @@ class Database:
                         updated_at = CURRENT_TIMESTAMP
                     WHERE id = ?
                 """, (comment, request_id))
-                await db.commit()
-                return True
+                owner_id = await self._get_channel_owner(db, request_id)
+
+            self.approval_cache.invalidate(owner_id)
+            return True
         except Exception as e:
             self.logger.error(f"Error rejecting request: {e}")
             return False 
@@ -1535,15 +1656,15 @@ class Database:
     async def get_collaboration_stats(self) -> Dict:
         """Получает статистику по заявкам на сотрудничество"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
+                # Счетчики поддерживаются триггерами на user_channels
                 cursor = await db.execute("""
                     SELECT 
-                        COUNT(*) as total_applications,
-                        COUNT(CASE WHEN status = 'pending' THEN 1 END) as pending_applications,
-                        COUNT(CASE WHEN status = 'approved' THEN 1 END) as approved_applications,
-                        COUNT(CASE WHEN status = 'rejected' THEN 1 END) as rejected_applications
-                    FROM user_channels
-                    WHERE is_active = TRUE
+                        SUM(total) as total_applications,
+                        SUM(CASE WHEN status = 'pending' THEN total END) as pending_applications,
+                        SUM(CASE WHEN status = 'approved' THEN total END) as approved_applications,
+                        SUM(CASE WHEN status = 'rejected' THEN total END) as rejected_applications
+                    FROM channel_status_counters
                 """)
                 row = await cursor.fetchone()
                 return {
@@ -1561,70 +1682,495 @@ class Database:
                 'rejected_applications': 0
             } 
 
-    async def get_users_with_pending_applications(self) -> List[Dict]:
-        """Получает список пользователей с заявками в ожидании оплаты"""
+    # Страница пользователей /pay: после курсора (after) или перед ним (before)
+    _PENDING_USERS_PAGE_SQL = {
+        direction: hot_query(f'get_users_with_pending_applications:{direction}', f"""
+            SELECT
+                page.user_id AS telegram_id,
+                COALESCE(tu.username, page.username) AS username,
+                page.pending_count,
+                (
+                    SELECT group_concat(DISTINCT uc.platform)
+                    FROM user_channels uc
+                    WHERE uc.telegram_user_id = tu.id
+                    AND uc.status = 'approved'
+                ) AS platforms
+            FROM (
+                SELECT user_id, COUNT(*) AS pending_count, MAX(username) AS username
+                FROM paid_content_applications
+                WHERE status = 'pending' AND user_id {condition} ?
+                GROUP BY user_id
+                ORDER BY user_id {order}
+                LIMIT ?
+            ) page
+            LEFT JOIN telegram_users tu ON tu.telegram_id = page.user_id
+            ORDER BY page.user_id
+        """)
+        for direction, condition, order in (('after', '>', 'ASC'), ('before', '<', 'DESC'))
+    }
+
+    async def get_users_with_pending_applications(
+        self,
+        after_user_id: Optional[int] = None,
+        before_user_id: Optional[int] = None,
+        limit: int = 20
+    ) -> List[Dict]:
+        """
+        Получает страницу пользователей с заявками в ожидании оплаты.
+
+        Пагинация по курсору: страница начинается после after_user_id
+        (или заканчивается перед before_user_id), поэтому стоимость запроса
+        зависит от размера страницы, а не от общего числа заявок.
+        Пользователи упорядочены по Telegram ID.
+        """
+        # paid_content_applications.user_id хранит Telegram ID пользователя
+        if before_user_id is not None:
+            query = self._PENDING_USERS_PAGE_SQL['before']
+            cursor_value = before_user_id
+        else:
+            query = self._PENDING_USERS_PAGE_SQL['after']
+            cursor_value = after_user_id if after_user_id is not None else -1
+
         try:
-            self.logger.info("Starting get_users_with_pending_applications")
-            connection = await self._create_connection()  # Создаем новое соединение
-            try:
-                # Проверяем существование таблиц и их структуру
-                self.logger.info("Checking tables structure")
-                tables_cursor = await connection.execute("SELECT name FROM sqlite_master WHERE type='table'")
-                tables = [table[0] for table in await tables_cursor.fetchall()]
-                self.logger.info(f"Found tables: {tables}")
-                
-                if 'paid_content_applications' not in tables or 'telegram_users' not in tables:
-                    self.logger.error("Required tables are missing!")
-                    return []
-                
-                # Сначала получаем пользователей с ожидающими заявками
-                self.logger.info("Executing main query for pending applications")
-                query = """
-                    SELECT 
-                        tu.telegram_id,
-                        tu.username,
-                        COUNT(pca.id) as pending_count
-                    FROM telegram_users tu
-                    INNER JOIN paid_content_applications pca ON tu.id = pca.user_id
-                    WHERE pca.status = 'pending'
-                    GROUP BY tu.telegram_id, tu.username
-                    HAVING pending_count > 0
-                    ORDER BY pending_count DESC
-                """
-                self.logger.info(f"Query: {query}")
-                
-                cursor = await connection.execute(query)
+            async with self.pool.read() as db:
+                cursor = await db.execute(query, (cursor_value, limit))
                 rows = await cursor.fetchall()
-                self.logger.info(f"Found {len(rows)} users with pending applications")
-                
-                results = []
-                for row in rows:
-                    self.logger.info(f"Processing user: {row['username']} (ID: {row['telegram_id']})")
-                    # Получаем платформы для каждого пользователя
-                    platforms_query = """
-                        SELECT DISTINCT uc.platform
-                        FROM user_channels uc
-                        JOIN telegram_users tu ON uc.telegram_user_id = tu.id
-                        WHERE tu.telegram_id = ?
-                        AND uc.status = 'approved'
-                    """
-                    platforms_cursor = await connection.execute(platforms_query, (row['telegram_id'],))
-                    platforms = [platform[0] for platform in await platforms_cursor.fetchall()]
-                    self.logger.info(f"Found platforms for user {row['username']}: {platforms}")
-                    
-                    results.append({
+                return [
+                    {
                         'telegram_id': row['telegram_id'],
                         'username': row['username'],
                         'pending_count': row['pending_count'],
-                        'platforms': platforms
-                    })
-                
-                self.logger.info(f"Returning {len(results)} results")
-                return results
-            finally:
-                await connection.close()  # Всегда закрываем соединение
-                
+                        'platforms': row['platforms'].split(',') if row['platforms'] else []
+                    }
+                    for row in rows
+                ]
+        except Exception as e:
+            self.logger.error(f"Error in get_users_with_pending_applications: {e}")
+            return []
+
+    async def get_pending_payments_summary(self) -> Dict[str, int]:
+        """Получает общее количество заявок в ожидании оплаты и число их авторов"""
+        try:
+            async with self.pool.read() as db:
+                cursor = await db.execute('''
+                    SELECT COUNT(*), COUNT(DISTINCT user_id)
+                    FROM paid_content_applications
+                    WHERE status = 'pending'
+                ''')
+                row = await cursor.fetchone()
+                return {
+                    'total_pending': row[0] or 0,
+                    'users_count': row[1] or 0
+                }
+        except Exception as e:
+            self.logger.error(f"Error getting pending payments summary: {e}")
+            return {'total_pending': 0, 'users_count': 0}
+
+    async def create_broadcast(self, text: str, created_by: int) -> int:
+        """Создает рассылку и возвращает ее ID"""
+        try:
+            async with self.pool.write() as db:
+                cursor = await db.execute(
+                    "INSERT INTO broadcasts (text, created_by) VALUES (?, ?)",
+                    (text, created_by)
+                )
+                return cursor.lastrowid
+        except Exception as e:
+            self.logger.error(f"Error creating broadcast: {e}")
+            raise DatabaseError(f"Failed to create broadcast: {e}")
+
+    async def get_broadcast(self, broadcast_id: int) -> Optional[Dict]:
+        """Получает рассылку с ее прогрессом"""
+        try:
+            async with self.pool.read() as db:
+                cursor = await db.execute(
+                    "SELECT * FROM broadcasts WHERE id = ?",
+                    (broadcast_id,)
+                )
+                row = await cursor.fetchone()
+                return dict(row) if row else None
+        except Exception as e:
+            self.logger.error(f"Error getting broadcast {broadcast_id}: {e}")
+            return None
+
+    async def get_running_broadcasts(self) -> List[Dict]:
+        """Получает незавершенные рассылки (для продолжения после перезапуска)"""
+        try:
+            async with self.pool.read() as db:
+                cursor = await db.execute(
+                    "SELECT * FROM broadcasts WHERE status = 'running' ORDER BY id"
+                )
+                return [dict(row) for row in await cursor.fetchall()]
+        except Exception as e:
+            self.logger.error(f"Error getting running broadcasts: {e}")
+            return []
+
+    async def count_broadcast_recipients(self, after_user_id: int = 0) -> int:
+        """Считает получателей рассылки, которые еще не обработаны"""
+        try:
+            async with self.pool.read() as db:
+                cursor = await db.execute(
+                    "SELECT COUNT(*) FROM telegram_users WHERE id > ? AND is_blocked = 0",
+                    (after_user_id,)
+                )
+                row = await cursor.fetchone()
+                return row[0] if row else 0
+        except Exception as e:
+            self.logger.error(f"Error counting broadcast recipients: {e}")
+            return 0
+
+    _BROADCAST_RECIPIENTS_SQL = hot_query('get_broadcast_recipients', '''
+        SELECT id, telegram_id
+        FROM telegram_users
+        WHERE id > ? AND is_blocked = 0 AND telegram_id IS NOT NULL
+        ORDER BY id
+        LIMIT ?
+    ''')
+
+    async def get_broadcast_recipients(self, after_user_id: int, limit: int = 500) -> List[Tuple[int, int]]:
+        """
+        Получает следующую пачку получателей рассылки.
+
+        Пользователи перебираются по telegram_users.id после after_user_id,
+        поэтому каждая пачка читается по первичному ключу, а не OFFSET'ом.
+
+        Returns:
+            Список пар (telegram_users.id, telegram_id)
+        """
+        try:
+            async with self.pool.read() as db:
+                cursor = await db.execute(self._BROADCAST_RECIPIENTS_SQL, (after_user_id, limit))
+                return [(row[0], row[1]) for row in await cursor.fetchall()]
+        except Exception as e:
+            self.logger.error(f"Error getting broadcast recipients: {e}")
+            raise DatabaseError(f"Failed to get broadcast recipients: {e}")
+
+    async def save_broadcast_progress(
+        self,
+        broadcast_id: int,
+        last_user_id: int,
+        sent: int,
+        failed: int,
+        blocked_ids: List[int]
+    ) -> bool:
+        """
+        Сохраняет контрольную точку рассылки после пачки получателей.
+
+        Прогресс и отметки заблокировавших бота пользователей записываются
+        одной транзакцией, поэтому после сбоя пачка не учитывается дважды.
+
+        Returns:
+            False, если рассылка уже остановлена (в том числе другим процессом);
+            ошибка записи выбрасывает DatabaseError
+        """
+        try:
+            async with self.pool.write() as db:
+                if blocked_ids:
+                    await db.executemany(
+                        "UPDATE telegram_users SET is_blocked = 1 WHERE telegram_id = ?",
+                        [(telegram_id,) for telegram_id in blocked_ids]
+                    )
+                cursor = await db.execute('''
+                    UPDATE broadcasts
+                    SET last_user_id = ?,
+                        sent_count = sent_count + ?,
+                        failed_count = failed_count + ?,
+                        blocked_count = blocked_count + ?,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ? AND status = 'running'
+                ''', (last_user_id, sent, failed, len(blocked_ids), broadcast_id))
+                return cursor.rowcount > 0
+        except Exception as e:
+            # Ошибку записи нельзя путать с остановкой рассылки: ее обрабатывает Broadcaster
+            self.logger.error(f"Error saving broadcast {broadcast_id} progress: {e}")
+            raise DatabaseError(f"Failed to save broadcast {broadcast_id} progress: {e}") from e
+
+    async def finish_broadcast(self, broadcast_id: int, status: str = 'done') -> bool:
+        """Завершает рассылку (done), отменяет ее (cancelled) или отмечает прерванной ошибкой (failed)"""
+        try:
+            async with self.pool.write() as db:
+                cursor = await db.execute('''
+                    UPDATE broadcasts
+                    SET status = ?, updated_at = CURRENT_TIMESTAMP, finished_at = CURRENT_TIMESTAMP
+                    WHERE id = ? AND status = 'running'
+                ''', (status, broadcast_id))
+                return cursor.rowcount > 0
+        except Exception as e:
+            self.logger.error(f"Error finishing broadcast {broadcast_id}: {e}")
+            return False
+
+    _PENDING_CHANNELS_PAGE_SQL = hot_query('get_pending_channels_page', """
+        SELECT uc.id, uc.platform, uc.channel_name, uc.channel_link, tu.username
+        FROM user_channels uc
+        LEFT JOIN telegram_users tu ON uc.telegram_user_id = tu.id
+        WHERE uc.status = 'pending' AND uc.is_active = TRUE AND uc.id > ?
+        ORDER BY uc.id
+        LIMIT ?
+    """)
+
+    async def get_pending_channels_page(self, after_id: int = 0, limit: int = 10) -> List[Dict]:
+        """Получает страницу заявок на сотрудничество в ожидании (по возрастанию id, после after_id)"""
+        try:
+            async with self.pool.read() as db:
+                cursor = await db.execute(self._PENDING_CHANNELS_PAGE_SQL, (after_id, limit))
+                return [dict(row) for row in await cursor.fetchall()]
+        except Exception as e:
+            self.logger.error(f"Error getting pending channels page: {e}")
+            return []
+
+    _PENDING_PAID_CONTENT_PAGE_SQL = hot_query('get_pending_paid_content_page', """
+        SELECT id, user_id, user_mention, content_type, link, views_count
+        FROM paid_content_applications
+        WHERE status = 'pending' AND id > ?
+        ORDER BY id
+        LIMIT ?
+    """)
+
+    async def get_pending_paid_content_page(self, after_id: int = 0, limit: int = 10) -> List[Dict]:
+        """Получает страницу заявок на оплату контента в ожидании (по возрастанию id, после after_id)"""
+        try:
+            async with self.pool.read() as db:
+                cursor = await db.execute(self._PENDING_PAID_CONTENT_PAGE_SQL, (after_id, limit))
+                return [dict(row) for row in await cursor.fetchall()]
+        except Exception as e:
+            self.logger.error(f"Error getting pending paid content page: {e}")
+            return []
+
+    # Заявки пользователя в ожидании для /bulk: по Telegram ID (user_id) или username
+    _PENDING_PAID_CONTENT_IDS_SQL = {
+        column: hot_query(f'get_pending_paid_content_ids:{column}', f"""
+            SELECT id FROM paid_content_applications
+            WHERE status = 'pending' AND {column} = ?
+            ORDER BY id
+        """)
+        for column in ('user_id', 'username')
+    }
+
+    async def get_pending_paid_content_ids(self, user: int | str) -> List[int]:
+        """Получает ID всех заявок на оплату пользователя в ожидании (по Telegram ID или username)"""
+        if isinstance(user, int):
+            query, value = self._PENDING_PAID_CONTENT_IDS_SQL['user_id'], user
+        else:
+            query, value = self._PENDING_PAID_CONTENT_IDS_SQL['username'], user.lstrip('@')
+        try:
+            async with self.pool.read() as db:
+                cursor = await db.execute(query, (value,))
+                return [row[0] for row in await cursor.fetchall()]
+        except Exception as e:
+            self.logger.error(f"Error getting pending paid content of user {user}: {e}")
+            return []
+
+    # Поиск по трем таблицам FTS5, общий порядок - по релевантности (bm25, меньше - лучше)
+    _SEARCH_SQL = """
+        SELECT 'channel' AS kind, uc.id, tu.telegram_id, tu.username, uc.platform, uc.status,
+               snippet(search_channels, -1, :start, :end, '…', 24) AS snippet,
+               search_channels.rank AS rank
+        FROM search_channels
+        JOIN user_channels uc ON uc.id = search_channels.rowid
+        LEFT JOIN telegram_users tu ON tu.id = uc.telegram_user_id
+        WHERE search_channels MATCH :query
+        UNION ALL
+        SELECT 'paid_content', pca.id, pca.user_id, pca.username, pca.content_type, pca.status,
+               snippet(search_paid_content, -1, :start, :end, '…', 24),
+               search_paid_content.rank
+        FROM search_paid_content
+        JOIN paid_content_applications pca ON pca.id = search_paid_content.rowid
+        WHERE search_paid_content MATCH :query
+        UNION ALL
+        SELECT 'user', tu.id, tu.telegram_id, tu.username, NULL, NULL,
+               snippet(search_users, -1, :start, :end, '…', 24),
+               search_users.rank
+        FROM search_users
+        JOIN telegram_users tu ON tu.id = search_users.rowid
+        WHERE search_users MATCH :query
+        ORDER BY rank
+        LIMIT :limit OFFSET :offset
+    """
+
+    async def _uses_trigram_search(self, db: aiosqlite.Connection) -> bool:
+        """Проверяет, созданы ли поисковые таблицы с токенизатором trigram"""
+        if self._search_trigram is None:
+            cursor = await db.execute("SELECT sql FROM sqlite_master WHERE name = 'search_users'")
+            row = await cursor.fetchone()
+            self._search_trigram = bool(row) and 'trigram' in row[0]
+        return self._search_trigram
+
+    async def search(self, text: str, offset: int = 0, limit: int = 10) -> Optional[List[Dict]]:
+        """
+        Ищет заявки на сотрудничество, заявки на оплату и пользователей (/find).
+
+        Находит username, промокод, ссылку, название канала, примечание или
+        комментарий админа по части текста. Результаты упорядочены по
+        релевантности; в snippet найденный текст обрамлен HIGHLIGHT_START/END.
+
+        Returns:
+            None, если запрос слишком короткий для поиска
+        """
+        try:
+            async with self.pool.read() as db:
+                query = match_expression(text, await self._uses_trigram_search(db))
+                if query is None:
+                    return None
+                cursor = await db.execute(
+                    self._SEARCH_SQL,
+                    {
+                        'query': query, 'limit': limit, 'offset': offset,
+                        'start': HIGHLIGHT_START, 'end': HIGHLIGHT_END
+                    }
+                )
+                return [dict(row) for row in await cursor.fetchall()]
+        except Exception as e:
+            self.logger.error(f"Error searching for {text!r}: {e}")
+            raise DatabaseError(f"Failed to search: {e}")
+
+    # Выгрузки для бухгалтерии (/export): заявки на оплату контента и выплаты по каналам
+    _EXPORT_SQL = {
+        'clips': """
+            SELECT r.id, r.user_id AS telegram_id, r.username, r.content_type, r.link,
+                   r.publish_date, r.views_count, r.current_views, r.payment_amount,
+                   r.status, r.admin_comment,
+                   datetime(r.created_at, 'localtime') AS created_at,
+                   datetime(r.updated_at, 'localtime') AS updated_at
+            FROM paid_content_applications r
+        """,
+        'payments': """
+            SELECT r.id, tu.telegram_id, tu.username, uc.platform, uc.channel_link,
+                   r.content_link, r.content_type, r.views_count,
+                   r.requested_amount, r.approved_amount, r.paid_amount,
+                   r.status, r.admin_comment,
+                   datetime(r.created_at, 'localtime') AS created_at,
+                   datetime(r.paid_at, 'localtime') AS paid_at
+            FROM payment_requests r
+            LEFT JOIN user_channels uc ON uc.id = r.channel_id
+            LEFT JOIN telegram_users tu ON tu.id = uc.telegram_user_id
+        """,
+    }
+
+    async def iter_export_rows(
+        self,
+        kind: str,
+        status: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        chunk_size: int = 1000
+    ) -> AsyncIterator[List[aiosqlite.Row]]:
+        """
+        Выгружает заявки (clips) или выплаты (payments) пачками по chunk_size строк.
+
+        SQLite выбирает строки по мере чтения курсора, поэтому в памяти
+        одновременно только одна пачка. Даты создания сравниваются по
+        местному времени, обе границы включаются. Соединение на чтение
+        занято, пока выгрузка не дочитана или генератор не закрыт.
+        """
+        query = self._EXPORT_SQL.get(kind)
+        if query is None:
+            raise ValueError(f"Unknown export kind: {kind}")
+
+        conditions, params = [], []
+        if status is not None:
+            conditions.append("r.status = ?")
+            params.append(status)
+        if date_from is not None:
+            conditions.append("date(r.created_at, 'localtime') >= ?")
+            params.append(date_from.isoformat())
+        if date_to is not None:
+            conditions.append("date(r.created_at, 'localtime') <= ?")
+            params.append(date_to.isoformat())
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY r.id"
+
+        try:
+            async with self.pool.read() as db:
+                cursor = await db.execute(query, params)
+                while rows := await cursor.fetchmany(chunk_size):
+                    yield rows
+        except Exception as e:
+            self.logger.error(f"Error exporting {kind}: {e}")
+            raise DatabaseError(f"Failed to export {kind}: {e}")
+
+    async def bulk_update_channel_status(
+        self,
+        channel_ids: List[int],
+        status: str,
+        admin_comment: str = None
+    ) -> List[Dict]:
+        """
+        Одобряет или отклоняет несколько заявок на сотрудничество одной транзакцией.
+
+        Меняются только заявки, которые еще ожидают проверки, поэтому
+        повторная обработка той же выборки ничего не делает.
+
+        Returns:
+            Измененные заявки с Telegram ID владельцев (для уведомлений)
+        """
+        if not channel_ids:
+            return []
+        placeholders = ",".join("?" * len(channel_ids))
+        try:
+            async with self.pool.write() as db:
+                cursor = await db.execute(f"""
+                    UPDATE user_channels 
+                    SET status = ?,
+                        admin_comment = ?,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id IN ({placeholders}) AND status = 'pending' AND is_active = TRUE
+                    RETURNING id
+                """, (status, admin_comment, *channel_ids))
+                updated = [row[0] for row in await cursor.fetchall()]
+                if not updated:
+                    return []
+
+                cursor = await db.execute(f"""
+                    SELECT uc.id, uc.platform, uc.channel_name, uc.channel_link, tu.telegram_id
+                    FROM user_channels uc
+                    JOIN telegram_users tu ON uc.telegram_user_id = tu.id
+                    WHERE uc.id IN ({",".join("?" * len(updated))})
+                """, updated)
+                channels = [dict(row) for row in await cursor.fetchall()]
+
+            for channel in channels:
+                self.approval_cache.invalidate(channel['telegram_id'])
+            return channels
+        except Exception as e:
+            self.logger.error(f"Error in bulk channel status update: {e}")
+            raise DatabaseError(f"Failed to update channels status: {e}")
+
+    async def bulk_update_paid_content_status(
+        self,
+        app_ids: List[int],
+        status: str,
+        admin_comment: str = None,
+        payment_amount: float = None
+    ) -> List[Dict]:
+        """
+        Меняет статус нескольких заявок на оплату контента одной транзакцией.
+
+        Меняются только заявки в ожидании, поэтому повторная обработка той же
+        выборки ничего не делает. payment_amount - сумма выплаты за каждую
+        заявку (для статуса paid); конечными просмотрами, если они не заданы,
+        становятся просмотры из заявки.
+
+        Returns:
+            Измененные заявки (id, user_id, link, payment_amount) для уведомлений
+        """
+        if not app_ids:
+            return []
+        placeholders = ",".join("?" * len(app_ids))
+        try:
+            async with self.pool.write() as db:
+                cursor = await db.execute(f"""
+                    UPDATE paid_content_applications 
+                    SET status = ?,
+                        admin_comment = COALESCE(?, admin_comment),
+                        payment_amount = COALESCE(?, payment_amount),
+                        current_views = CASE WHEN ? IS NULL THEN current_views
+                                             ELSE COALESCE(current_views, views_count) END,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id IN ({placeholders}) AND status = 'pending'
+                    RETURNING id, user_id, link, payment_amount
+                """, (status, admin_comment, payment_amount, payment_amount, *app_ids))
+                return [dict(row) for row in await cursor.fetchall()]
         except Exception as e:
-            self.logger.error(f"Error in get_users_with_pending_applications: {str(e)}")
-            self.logger.exception(e)  # Это выведет полный стек ошибки
-            return [] 
\ No newline at end of file
+            self.logger.error(f"Error in bulk paid content status update: {e}")
+            raise DatabaseError(f"Failed to update paid content applications status: {e}")
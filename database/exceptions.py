@@ -0,0 +1,11 @@
+class DatabaseError(Exception):
+    """Базовый класс для ошибок базы данных"""
+    pass
+
+class ConnectionError(DatabaseError):
+    """Ошибка подключения к базе данных"""
+    pass
+
+class PoolTimeoutError(ConnectionError):
+    """Не удалось получить соединение из пула за отведенное время"""
+    pass
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+logger = logging.getLogger('bot_logger')
+
+
+class _Record:
+    """Состояние и данные FSM одного пользователя"""
+    __slots__ = ('state', 'data', 'updated_at')
+
+    def __init__(self, state: Optional[str] = None, data: Optional[Dict[str, Any]] = None,
+                 updated_at: Optional[float] = None):
+        self.state = state
+        self.data = data or {}
+        self.updated_at = updated_at if updated_at is not None else time.time()
+
+    @property
+    def is_empty(self) -> bool:
+        return self.state is None and not self.data
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    Хранилище FSM в таблице fsm_storage той же базы SQLite.
+
+    Незавершенные заявки переживают перезапуск бота. Изменения
+    накапливаются в памяти и сбрасываются одной транзакцией раз в
+    flush_interval секунд: несколько шагов одного пользователя между
+    сбросами превращаются в одну запись. Прочитанные записи хранятся в
+    ограниченном LRU-кэше, брошенные на середине сценарии удаляются
+    через ttl секунд после последнего изменения.
+    """
+
+    def __init__(
+        self,
+        database,
+        ttl: float = 86_400.0,
+        flush_interval: float = 1.0,
+        cache_size: int = 10_000,
+        sweep_interval: float = 600.0
+    ):
+        self.database = database
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self.cache_size = max(1, cache_size)
+        self.sweep_interval = sweep_interval
+
+        self._cache: "OrderedDict[str, _Record]" = OrderedDict()
+        self._dirty: Dict[str, _Record] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._last_sweep = 0.0
+
+    @staticmethod
+    def _make_key(key: StorageKey) -> str:
+        """Компактный строковый ключ записи"""
+        return f"{key.bot_id}:{key.chat_id}:{key.user_id}:{key.thread_id or ''}:{key.destiny}"
+
+    def _is_expired(self, record: _Record) -> bool:
+        return record.updated_at < time.time() - self.ttl
+
+    def _remember(self, storage_key: str, record: _Record):
+        """Кладет запись в LRU-кэш, вытесняя самые старые"""
+        self._cache[storage_key] = record
+        self._cache.move_to_end(storage_key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _load(self, key: StorageKey) -> _Record:
+        """Возвращает запись из памяти или из базы"""
+        storage_key = self._make_key(key)
+
+        # Несохраненные изменения важнее кэша и базы
+        record = self._dirty.get(storage_key) or self._cache.get(storage_key)
+        if record is None:
+            async with self.database.pool.read() as db:
+                cursor = await db.execute(
+                    "SELECT state, data, updated_at FROM fsm_storage WHERE key = ?",
+                    (storage_key,)
+                )
+                row = await cursor.fetchone()
+            loaded = _Record(row[0], json.loads(row[1]) if row[1] else {}, row[2]) if row else _Record()
+
+            # Пока шло чтение, запись могла измениться - более свежая версия важнее
+            record = self._dirty.get(storage_key) or self._cache.get(storage_key)
+            if record is None:
+                record = loaded
+                self._remember(storage_key, record)
+
+        if self._is_expired(record):
+            record = _Record()
+            self._store(storage_key, record)
+        return record
+
+    def _store(self, storage_key: str, record: _Record):
+        """Помечает запись для записи в базу при следующем сбросе"""
+        record.updated_at = time.time()
+        self._dirty[storage_key] = record
+        self._remember(storage_key, record)
+        self._ensure_flusher()
+
+    def _ensure_flusher(self):
+        """Запускает фоновую задачу сброса изменений, если она не запущена"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        """Периодически сбрасывает накопленные изменения и удаляет просроченные записи"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+                if time.monotonic() - self._last_sweep >= self.sweep_interval:
+                    await self.sweep()
+            except Exception as e:
+                # Изменения остаются в памяти и будут записаны при следующей попытке
+                logger.error(f"Failed to flush FSM storage: {e}")
+
+    async def flush(self):
+        """Записывает накопленные изменения в базу одной транзакцией"""
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, {}
+
+            upserts = []
+            deletes = []
+            for storage_key, record in dirty.items():
+                if record.is_empty:
+                    deletes.append((storage_key,))
+                    continue
+                try:
+                    data = json.dumps(record.data, ensure_ascii=False, separators=(',', ':')) if record.data else None
+                except Exception as e:
+                    # Несериализуемые данные одного сценария не должны мешать сохранению остальных:
+                    # запись остается только в памяти
+                    logger.error(f"Skipping FSM record {storage_key}: data is not JSON serializable: {e}")
+                    continue
+                upserts.append((storage_key, record.state, data, record.updated_at))
+
+            try:
+                async with self.database.pool.write() as db:
+                    if upserts:
+                        await db.executemany('''
+                            INSERT INTO fsm_storage (key, state, data, updated_at)
+                            VALUES (?, ?, ?, ?)
+                            ON CONFLICT(key) DO UPDATE SET
+                                state = excluded.state,
+                                data = excluded.data,
+                                updated_at = excluded.updated_at
+                        ''', upserts)
+                    if deletes:
+                        await db.executemany("DELETE FROM fsm_storage WHERE key = ?", deletes)
+            except BaseException:
+                # Возвращаем изменения (в том числе при отмене задачи), не затирая более свежие
+                for storage_key, record in dirty.items():
+                    self._dirty.setdefault(storage_key, record)
+                raise
+
+    async def sweep(self):
+        """Удаляет сценарии, брошенные дольше ttl секунд назад"""
+        self._last_sweep = time.monotonic()
+        expire_before = time.time() - self.ttl
+        async with self.database.pool.write() as db:
+            cursor = await db.execute("DELETE FROM fsm_storage WHERE updated_at < ?", (expire_before,))
+            if cursor.rowcount:
+                logger.info(f"Expired {cursor.rowcount} abandoned FSM records")
+
+        for storage_key in [k for k, record in self._cache.items() if self._is_expired(record)]:
+            if storage_key not in self._dirty:
+                del self._cache[storage_key]
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = await self._load(key)
+        record.state = state.state if isinstance(state, State) else state
+        self._store(self._make_key(key), record)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return (await self._load(key)).state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        record = await self._load(key)
+        record.data = data.copy()
+        self._store(self._make_key(key), record)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return (await self._load(key)).data.copy()
+
+    async def close(self) -> None:
+        """Сбрасывает несохраненные изменения и останавливает фоновую задачу"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush FSM storage on close: {e}")
@@ -0,0 +1,171 @@
+"""Базовая схема: таблицы, которые раньше создавались create_tables и add_*_column"""
+import aiosqlite
+
+from . import add_missing_columns
+
+
+async def upgrade(db: aiosqlite.Connection):
+    # Основная таблица пользователей Telegram
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS telegram_users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            telegram_id INTEGER UNIQUE,
+            username TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Таблица каналов пользователей
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS user_channels (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            telegram_user_id INTEGER,
+            platform TEXT CHECK(platform IN ('youtube', 'tiktok', 'shorts', 'twitch', 'other')),
+            channel_link TEXT,
+            channel_name TEXT,
+
+            -- Данные для партнерской программы
+            promo_code TEXT,                    -- Промокод блогера
+            blogger_nickname TEXT,              -- Никнейм на платформе
+
+            -- Статистика канала
+            views_count INTEGER DEFAULT 0,      -- Количество просмотров
+            twitch_viewers INTEGER DEFAULT 0,   -- Среднее количество зрителей (для Twitch)
+            experience TEXT,                    -- Опыт работы
+            frequency TEXT,                     -- Частота выпуска контента
+
+            -- Общая статистика
+            total_requests INTEGER DEFAULT 0,      -- Всего заявок
+            approved_requests INTEGER DEFAULT 0,   -- Одобренных заявок
+            pending_requests INTEGER DEFAULT 0,    -- Заявок в ожидании
+            rejected_requests INTEGER DEFAULT 0,   -- Отклоненных заявок
+
+            -- Финансовая статистика
+            pending_amount DECIMAL(10,2) DEFAULT 0.00,    -- Сумма в ожидании
+            total_earned DECIMAL(10,2) DEFAULT 0.00,      -- Всего заработано
+
+            -- Служебные поля
+            status TEXT DEFAULT 'pending',
+            admin_comment TEXT,
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+            FOREIGN KEY (telegram_user_id) REFERENCES telegram_users(id),
+            UNIQUE(telegram_user_id, channel_link, platform)
+        )
+    ''')
+
+    # Колонки, добавленные после первых версий бота
+    await add_missing_columns(db, 'user_channels', {
+        'views_count': 'INTEGER DEFAULT 0',
+        'experience': 'TEXT',
+        'frequency': 'TEXT',
+        'twitch_viewers': 'INTEGER DEFAULT 0',
+    })
+
+    # Таблица заявок на выплаты
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS payment_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            channel_id INTEGER,
+            content_link TEXT NOT NULL,           -- Ссылка на контент
+            content_type TEXT NOT NULL,           -- Тип контента (видео/стрим/etc)
+            views_count INTEGER,                  -- Количество просмотров
+            requested_amount DECIMAL(10,2),       -- Запрошенная сумма
+            approved_amount DECIMAL(10,2),        -- Одобренная сумма
+            status TEXT DEFAULT 'pending' CHECK(
+                status IN ('pending', 'approved', 'rejected', 'paid')
+            ),
+            admin_comment TEXT,                   -- Комментарий администратора
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+            FOREIGN KEY (channel_id) REFERENCES user_channels(id)
+        )
+    ''')
+
+    # Таблица blogger_connections больше не используется
+    await db.execute('DROP TABLE IF EXISTS blogger_connections')
+
+    # Таблица для заявок с множественными площадками
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS collaboration_applications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            telegram_user_id INTEGER,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (telegram_user_id) REFERENCES telegram_users(id)
+        )
+    ''')
+
+    # Таблица для площадок в рамках одной заявки
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS application_platforms (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            application_id INTEGER,
+            platform TEXT CHECK(platform IN ('youtube', 'tiktok', 'shorts', 'twitch', 'other')),
+            channel_link TEXT,
+            views_count INTEGER,
+            experience TEXT,
+            frequency TEXT,
+            promo_code TEXT,
+            platform_order INTEGER,  -- порядковый номер площадки в заявке
+            FOREIGN KEY (application_id) REFERENCES collaboration_applications(id)
+        )
+    ''')
+
+    # Таблица для заявок на оплату контента
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS paid_content_applications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            username TEXT,
+            user_mention TEXT,
+            content_type TEXT NOT NULL,
+            link TEXT NOT NULL,
+            publish_date TEXT,
+            views_count INTEGER,
+            current_views INTEGER,
+            payment_amount REAL,
+            note TEXT,
+            status TEXT DEFAULT 'pending' CHECK(
+                status IN ('pending', 'approved', 'rejected', 'paid')
+            ),
+            admin_comment TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            channel_id INTEGER REFERENCES user_channels(id),
+            FOREIGN KEY (user_id) REFERENCES telegram_users(id)
+        )
+    ''')
+
+    await add_missing_columns(db, 'paid_content_applications', {
+        'channel_id': 'INTEGER REFERENCES user_channels(id)',
+        'username': 'TEXT',
+        'user_mention': 'TEXT',
+        'publish_date': 'TEXT',
+        'views_count': 'INTEGER',
+        'current_views': 'REAL',
+        'payment_amount': 'REAL',
+        'note': 'TEXT',
+        'admin_comment': 'TEXT',
+        'updated_at': 'TEXT',
+    })
+
+    # Заполняем упоминания для заявок, созданных до появления столбца user_mention
+    await db.execute('''
+        UPDATE paid_content_applications
+        SET user_mention = COALESCE('@' || username, 'id' || user_id)
+        WHERE user_mention IS NULL
+    ''')
+
+    # Индексы для оптимизации запросов
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_paid_content_user_id
+        ON paid_content_applications(user_id)
+    ''')
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_paid_content_status
+        ON paid_content_applications(status)
+    ''')
@@ -0,0 +1,15 @@
+"""Индексы для списка пользователей с заявками в ожидании оплаты (/pay)"""
+import aiosqlite
+
+
+async def upgrade(db: aiosqlite.Connection):
+    # Страница /pay читается по (status, user_id) без сортировки и полного сканирования
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_paid_content_status_user
+        ON paid_content_applications(status, user_id)
+    ''')
+    # Подзапрос платформ ищет одобренные каналы конкретного пользователя
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_channels_owner_status
+        ON user_channels(telegram_user_id, status)
+    ''')
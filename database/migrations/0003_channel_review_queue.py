@@ -0,0 +1,60 @@
+"""Очередь проверки заявок на сотрудничество: индекс для постраничного просмотра и счетчики по статусам"""
+import aiosqlite
+
+
+async def upgrade(db: aiosqlite.Connection):
+    # Поиск следующей/предыдущей заявки - одно обращение к индексу
+    # (id является rowid и входит в индекс неявно, поэтому порядок по id берется из индекса)
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_channels_status_active
+        ON user_channels(status, is_active)
+    ''')
+
+    # Количество активных заявок по статусам, чтобы не считать COUNT(*) при каждом открытии /apps
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS channel_status_counters (
+            status TEXT PRIMARY KEY NOT NULL,
+            total INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    await db.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_user_channels_counters_insert
+        AFTER INSERT ON user_channels
+        WHEN NEW.is_active = TRUE AND NEW.status IS NOT NULL
+        BEGIN
+            INSERT INTO channel_status_counters (status, total) VALUES (NEW.status, 1)
+            ON CONFLICT(status) DO UPDATE SET total = total + 1;
+        END
+    ''')
+    await db.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_user_channels_counters_delete
+        AFTER DELETE ON user_channels
+        WHEN OLD.is_active = TRUE AND OLD.status IS NOT NULL
+        BEGIN
+            UPDATE channel_status_counters SET total = total - 1 WHERE status = OLD.status;
+        END
+    ''')
+    await db.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_user_channels_counters_update
+        AFTER UPDATE OF status, is_active ON user_channels
+        WHEN OLD.status IS NOT NEW.status OR OLD.is_active IS NOT NEW.is_active
+        BEGIN
+            UPDATE channel_status_counters SET total = total - 1
+            WHERE status = OLD.status AND OLD.is_active = TRUE;
+
+            INSERT INTO channel_status_counters (status, total)
+            SELECT NEW.status, 1 WHERE NEW.is_active = TRUE AND NEW.status IS NOT NULL
+            ON CONFLICT(status) DO UPDATE SET total = total + 1;
+        END
+    ''')
+
+    # Заполняем счетчики по уже существующим заявкам
+    await db.execute('DELETE FROM channel_status_counters')
+    await db.execute('''
+        INSERT INTO channel_status_counters (status, total)
+        SELECT status, COUNT(*)
+        FROM user_channels
+        WHERE is_active = TRUE AND status IS NOT NULL
+        GROUP BY status
+    ''')
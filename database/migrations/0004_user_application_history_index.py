@@ -0,0 +1,10 @@
+"""Индекс для постраничного просмотра истории заявок пользователя"""
+import aiosqlite
+
+
+async def upgrade(db: aiosqlite.Connection):
+    # Соответствует порядку навигации "Мои заявки": поиск следующей заявки без сортировки
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_paid_content_user_status_created
+        ON paid_content_applications(user_id, status, created_at, id)
+    ''')
@@ -0,0 +1,18 @@
+"""Таблица для хранения состояний FSM между перезапусками бота"""
+import aiosqlite
+
+
+async def upgrade(db: aiosqlite.Connection):
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS fsm_storage (
+            key TEXT PRIMARY KEY,      -- bot_id:chat_id:user_id:thread_id:destiny
+            state TEXT,
+            data TEXT,                 -- компактный JSON, NULL для пустых данных
+            updated_at REAL NOT NULL   -- unix-время последнего изменения
+        ) WITHOUT ROWID
+    ''')
+    # Удаление просроченных записей по времени последнего изменения
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_fsm_storage_updated_at
+        ON fsm_storage(updated_at)
+    ''')
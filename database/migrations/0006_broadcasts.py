@@ -0,0 +1,36 @@
+"""Массовые рассылки: отметка пользователей, заблокировавших бота, и прогресс рассылок"""
+import aiosqlite
+
+from . import add_missing_columns
+
+
+async def upgrade(db: aiosqlite.Connection):
+    # Пользователи, заблокировавшие бота, пропускаются следующими рассылками
+    await add_missing_columns(db, 'telegram_users', {
+        'is_blocked': 'INTEGER NOT NULL DEFAULT 0',
+    })
+
+    # Рассылка и ее контрольная точка: last_user_id - последний обработанный telegram_users.id,
+    # после перезапуска рассылка продолжается со следующего пользователя
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS broadcasts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            text TEXT NOT NULL,
+            created_by INTEGER,                 -- Telegram ID администратора
+            status TEXT NOT NULL DEFAULT 'running' CHECK(
+                status IN ('running', 'done', 'cancelled')
+            ),
+            last_user_id INTEGER NOT NULL DEFAULT 0,
+            sent_count INTEGER NOT NULL DEFAULT 0,
+            failed_count INTEGER NOT NULL DEFAULT 0,
+            blocked_count INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    ''')
+    # Незавершенные рассылки ищутся при каждом запуске бота
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_broadcasts_status
+        ON broadcasts(status)
+    ''')
@@ -0,0 +1,87 @@
+"""Счетчики заявок на оплату контента по пользователям для меню платного контента"""
+import aiosqlite
+
+
+async def upgrade(db: aiosqlite.Connection):
+    # Одна строка на пользователя (Telegram ID): меню читает ее по первичному ключу
+    # вместо подсчета всех заявок пользователя
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS user_application_counters (
+            user_id INTEGER PRIMARY KEY NOT NULL,
+            pending_count INTEGER NOT NULL DEFAULT 0,
+            approved_count INTEGER NOT NULL DEFAULT 0,
+            rejected_count INTEGER NOT NULL DEFAULT 0,
+            paid_count INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    # Счетчики поддерживаются триггерами в той же транзакции, что и изменение заявки
+    await db.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_paid_content_counters_insert
+        AFTER INSERT ON paid_content_applications
+        BEGIN
+            INSERT INTO user_application_counters
+                (user_id, pending_count, approved_count, rejected_count, paid_count)
+            VALUES (
+                NEW.user_id,
+                NEW.status IS 'pending', NEW.status IS 'approved',
+                NEW.status IS 'rejected', NEW.status IS 'paid'
+            )
+            ON CONFLICT(user_id) DO UPDATE SET
+                pending_count = pending_count + excluded.pending_count,
+                approved_count = approved_count + excluded.approved_count,
+                rejected_count = rejected_count + excluded.rejected_count,
+                paid_count = paid_count + excluded.paid_count;
+        END
+    ''')
+    await db.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_paid_content_counters_delete
+        AFTER DELETE ON paid_content_applications
+        BEGIN
+            UPDATE user_application_counters SET
+                pending_count = pending_count - (OLD.status IS 'pending'),
+                approved_count = approved_count - (OLD.status IS 'approved'),
+                rejected_count = rejected_count - (OLD.status IS 'rejected'),
+                paid_count = paid_count - (OLD.status IS 'paid')
+            WHERE user_id = OLD.user_id;
+        END
+    ''')
+    await db.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_paid_content_counters_update
+        AFTER UPDATE OF status, user_id ON paid_content_applications
+        WHEN OLD.status IS NOT NEW.status OR OLD.user_id IS NOT NEW.user_id
+        BEGIN
+            UPDATE user_application_counters SET
+                pending_count = pending_count - (OLD.status IS 'pending'),
+                approved_count = approved_count - (OLD.status IS 'approved'),
+                rejected_count = rejected_count - (OLD.status IS 'rejected'),
+                paid_count = paid_count - (OLD.status IS 'paid')
+            WHERE user_id = OLD.user_id;
+
+            INSERT INTO user_application_counters
+                (user_id, pending_count, approved_count, rejected_count, paid_count)
+            VALUES (
+                NEW.user_id,
+                NEW.status IS 'pending', NEW.status IS 'approved',
+                NEW.status IS 'rejected', NEW.status IS 'paid'
+            )
+            ON CONFLICT(user_id) DO UPDATE SET
+                pending_count = pending_count + excluded.pending_count,
+                approved_count = approved_count + excluded.approved_count,
+                rejected_count = rejected_count + excluded.rejected_count,
+                paid_count = paid_count + excluded.paid_count;
+        END
+    ''')
+
+    # Заполняем счетчики по уже существующим заявкам
+    await db.execute('DELETE FROM user_application_counters')
+    await db.execute('''
+        INSERT INTO user_application_counters
+            (user_id, pending_count, approved_count, rejected_count, paid_count)
+        SELECT
+            user_id,
+            SUM(status IS 'pending'), SUM(status IS 'approved'),
+            SUM(status IS 'rejected'), SUM(status IS 'paid')
+        FROM paid_content_applications
+        GROUP BY user_id
+    ''')
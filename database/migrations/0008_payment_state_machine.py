@@ -0,0 +1,17 @@
+"""Выплаты: столбцы, которые process_payment использовал без миграции, и индекс для сверки итогов"""
+import aiosqlite
+
+from . import add_missing_columns
+
+
+async def upgrade(db: aiosqlite.Connection):
+    await add_missing_columns(db, 'payment_requests', {
+        'paid_amount': 'DECIMAL(10,2)',
+        'paid_at': 'TIMESTAMP',
+    })
+
+    # Статистика и сверка итогов канала читают его заявки по channel_id
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_payment_requests_channel_status
+        ON payment_requests(channel_id, status)
+    ''')
@@ -0,0 +1,135 @@
+"""Нормализованные ключи ссылок каналов и публикаций и уникальные индексы для поиска дублей"""
+import logging
+import re
+from typing import Optional
+
+import aiosqlite
+
+from . import add_missing_columns
+
+logger = logging.getLogger('bot_logger')
+
+# Замороженная копия правил utils/link_classifier.py на момент этой миграции: ключи
+# в любой базе, созданной или обновленной этой миграцией, должны получаться одинаковыми.
+# Последующие изменения LINK_RULES применяются к базе командой /rekey_links
+_IMAGE_HOSTS = r'(?:postimg\.cc|ibb\.co|postimages\.org)'
+_YOUTUBE = r'(?:www\.|m\.)?youtube\.com/'
+_TWITCH = r'(?:www\.|m\.)?twitch\.tv/'
+_TIKTOK = r'(?:www\.|m\.|vm\.|vt\.)?tiktok\.com/'
+
+# (платформа, вид, выражение, регистр идентификатора не важен); первое совпавшее правило
+_LINK_RULES = [
+    (platform, kind, re.compile(rf'https?://{host}(?:{path})'), fold_case)
+    for platform, kind, host, path, fold_case in [
+        ('image', 'screenshot', rf'(?:www\.)?{_IMAGE_HOSTS}/', r'(?P<id>\w+)', False),
+        ('image', 'screenshot', rf'(?:www\.)?i\.{_IMAGE_HOSTS}/', r'(?P<id>\w+/[\w-]+\.(?i:jpg|jpeg|png|gif))', False),
+        ('youtube', 'channel', _YOUTUBE, r'(?P<id>@[\w-]{3,})/?$', True),
+        ('youtube', 'channel', _YOUTUBE, r'channel/(?P<id>[\w-]{24})/?$', False),
+        ('youtube', 'video', _YOUTUBE, r'watch\?v=(?P<id>[\w-]+)', False),
+        ('youtube', 'video', _YOUTUBE, r'v/(?P<id>[\w-]+)', False),
+        ('youtube', 'live', _YOUTUBE, r'live/(?P<id>[\w-]+)', False),
+        ('youtube', 'shorts', _YOUTUBE, r'shorts/(?P<id>[\w-]+)', False),
+        ('youtube', 'video', r'youtu\.be/', r'(?P<id>[\w-]+)', False),
+        ('twitch', 'vod', _TWITCH, r'videos/(?P<id>\d+)', False),
+        ('twitch', 'channel', _TWITCH, r'(?P<id>[\w-]{4,})/?$', True),
+        ('tiktok', 'video', _TIKTOK, r'@[\w.]+/video/(?P<id>\d+)', False),
+        ('tiktok', 'video', _TIKTOK, r'v/(?P<id>\d+)', False),
+        ('tiktok', 'live', _TIKTOK, r'@(?P<id>[\w.]+)/live/?', True),
+        ('tiktok', 'profile', _TIKTOK, r'@(?P<id>[\w.]{2,})/?$', True),
+        ('tiktok', 'short_link', _TIKTOK, r'(?P<id>[\w.]+)/?$', False),
+        ('image', 'screenshot', '', r'(?P<id>\S+\.(?i:jpg|jpeg|png|gif))$', False),
+        ('other', 'link', '', r'(?P<id>\S+)', False),
+    ]
+]
+_SCHEME_HOST = re.compile(r'\s*(?:(https?)://)?([^/?#\s]*)', re.IGNORECASE)
+_SAME_KIND = {('youtube', 'live'): 'video', ('youtube', 'shorts'): 'video'}
+_NOT_CONTENT = {('tiktok', 'live')}
+
+
+def _classify(url: str) -> Optional[tuple]:
+    """Платформа, вид и идентификатор нормализованной ссылки"""
+    match = _SCHEME_HOST.match(url)
+    scheme, host = match.groups()
+    if scheme is None and '.' not in host:
+        return None
+    url = f"{(scheme or 'https').lower()}://{host.lower()}{url[match.end():].rstrip()}"
+    for platform, kind, pattern, fold_case in _LINK_RULES:
+        match = pattern.match(url)
+        if match:
+            canonical_id = match.group('id')
+            return platform, kind, canonical_id.lower() if fold_case else canonical_id
+    return None
+
+
+def canonical_key(url: str) -> Optional[str]:
+    """Ключ ссылки "платформа:вид:идентификатор" по правилам этой миграции"""
+    info = _classify(url)
+    if info is None:
+        return None
+    platform, kind, canonical_id = info
+    if platform == 'other':
+        canonical_id = canonical_id.split('#', 1)[0].rstrip('/')
+        if canonical_id.startswith('www.'):
+            canonical_id = canonical_id[4:]
+    return f"{platform}:{_SAME_KIND.get((platform, kind), kind)}:{canonical_id}"
+
+
+def content_key(url: str) -> Optional[str]:
+    """Ключ публикации по правилам этой миграции (None - по ссылке публикацию не отличить)"""
+    info = _classify(url)
+    if info is None or info[:2] in _NOT_CONTENT:
+        return None
+    return canonical_key(url)
+
+
+async def upgrade(db: aiosqlite.Connection):
+    await add_missing_columns(db, 'user_channels', {'channel_key': 'TEXT'})
+    await add_missing_columns(db, 'paid_content_applications', {'link_key': 'TEXT'})
+
+    # Ключи считаются так же, как у новых заявок на момент миграции. Если в базе уже есть дубли,
+    # ключ получает только самая ранняя заявка, остальные остаются без ключа
+    # (их видно в логе, индекс на них не распространяется)
+    cursor = await db.execute('''
+        SELECT id, platform, channel_link, is_active = TRUE AND status != 'rejected'
+        FROM user_channels ORDER BY id
+    ''')
+    seen = set()
+    channel_keys = []
+    for channel_id, platform, link, registered in await cursor.fetchall():
+        key = canonical_key(link) if link else None
+        if key is not None and registered:
+            if (platform, key) in seen:
+                logger.warning(f"Channel {channel_id} duplicates an earlier channel {platform} {key}")
+                key = None
+            seen.add((platform, key))
+        channel_keys.append((key, channel_id))
+    await db.executemany("UPDATE user_channels SET channel_key = ? WHERE id = ?", channel_keys)
+
+    cursor = await db.execute('''
+        SELECT id, link, status != 'rejected'
+        FROM paid_content_applications ORDER BY id
+    ''')
+    seen = set()
+    link_keys = []
+    for application_id, link, submitted in await cursor.fetchall():
+        key = content_key(link) if link else None
+        if key is not None and submitted:
+            if key in seen:
+                logger.warning(f"Paid content application {application_id} duplicates an earlier one: {key}")
+                key = None
+            seen.add(key)
+        link_keys.append((key, application_id))
+    await db.executemany("UPDATE paid_content_applications SET link_key = ? WHERE id = ?", link_keys)
+
+    # Один действующий канал на ключ и платформу (отклоненные заявки не мешают подать заново)
+    await db.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_user_channels_channel_key
+        ON user_channels(platform, channel_key)
+        WHERE is_active = TRUE AND status != 'rejected'
+    ''')
+    # Одна неотклоненная заявка на публикацию
+    await db.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_paid_content_link_key
+        ON paid_content_applications(link_key)
+        WHERE status != 'rejected'
+    ''')
@@ -0,0 +1,27 @@
+"""Составные и покрывающие индексы для частых запросов бота"""
+import aiosqlite
+
+
+async def upgrade(db: aiosqlite.Connection):
+    # is_approved_blogger и подзапрос платформ /pay: все условия по каналам владельца
+    # в одном индексе, без чтения строк таблицы. Заменяет индекс (telegram_user_id, status),
+    # который был его префиксом: без ANALYZE планировщик предпочитал ему (status, is_active)
+    # и перебирал все одобренные каналы
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_channels_owner_status_active
+        ON user_channels(telegram_user_id, status, is_active)
+    ''')
+    await db.execute('DROP INDEX IF EXISTS idx_user_channels_owner_status')
+
+    # Проверка занятости промокода при подаче заявки (владелец берется из индекса)
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_channels_promo
+        ON user_channels(promo_code, is_active, telegram_user_id)
+    ''')
+
+    # Заявки пользователя в ожидании по username (массовые действия /bulk):
+    # id входит в индекс неявно, поэтому порядок по id берется из индекса
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_paid_content_username_status
+        ON paid_content_applications(username, status)
+    ''')
@@ -0,0 +1,146 @@
+"""Полнотекстовый поиск для команды /find (FTS5)"""
+import sqlite3
+
+import aiosqlite
+
+# trigram ищет по любой подстроке от 3 символов (SQLite 3.34+), без него - поиск по префиксам слов
+TOKENIZERS = ("trigram", "unicode61 remove_diacritics 2")
+
+# Поисковая таблица -> индексируемые столбцы
+SEARCH_TABLES = {
+    'search_channels': "username, channel_name, channel_link, promo_code, blogger_nickname, admin_comment",
+    'search_paid_content': "username, user_mention, link, note, admin_comment",
+    'search_users': "username",
+}
+
+# Строка поиска по заявке на сотрудничество (username берется у владельца канала)
+_CHANNEL_ROW = '''
+    SELECT uc.id, tu.username, uc.channel_name, uc.channel_link,
+           uc.promo_code, uc.blogger_nickname, uc.admin_comment
+    FROM user_channels uc
+    LEFT JOIN telegram_users tu ON tu.id = uc.telegram_user_id
+'''
+
+
+def supported_tokenizer() -> str:
+    """Первый токенизатор из TOKENIZERS, который поддерживает SQLite (та же библиотека, что у aiosqlite)"""
+    probe = sqlite3.connect(':memory:')
+    try:
+        for tokenizer in TOKENIZERS[:-1]:
+            try:
+                probe.execute(f"CREATE VIRTUAL TABLE probe USING fts5(text, tokenize = '{tokenizer}')")
+                return tokenizer
+            except sqlite3.OperationalError:
+                continue
+        return TOKENIZERS[-1]
+    finally:
+        probe.close()
+
+
+async def upgrade(db: aiosqlite.Connection):
+    # Поисковые таблицы хранят копию текста, rowid совпадает с id исходной строки.
+    # Триггеры обновляют их в той же транзакции только при изменении текстовых полей,
+    # поэтому смена статуса заявки индекс не трогает
+    tokenizer = supported_tokenizer()
+    for table, columns in SEARCH_TABLES.items():
+        await db.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5({columns}, tokenize = '{tokenizer}')"
+        )
+
+    await db.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_search_channels_insert
+        AFTER INSERT ON user_channels
+        BEGIN
+            INSERT INTO search_channels (rowid, {SEARCH_TABLES['search_channels']})
+            {_CHANNEL_ROW} WHERE uc.id = NEW.id;
+        END
+    ''')
+    await db.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_search_channels_delete
+        AFTER DELETE ON user_channels
+        BEGIN
+            DELETE FROM search_channels WHERE rowid = OLD.id;
+        END
+    ''')
+    await db.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_search_channels_update
+        AFTER UPDATE OF telegram_user_id, channel_name, channel_link, promo_code,
+                        blogger_nickname, admin_comment ON user_channels
+        BEGIN
+            DELETE FROM search_channels WHERE rowid = OLD.id;
+            INSERT INTO search_channels (rowid, {SEARCH_TABLES['search_channels']})
+            {_CHANNEL_ROW} WHERE uc.id = NEW.id;
+        END
+    ''')
+
+    await db.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_search_paid_content_insert
+        AFTER INSERT ON paid_content_applications
+        BEGIN
+            INSERT INTO search_paid_content (rowid, {SEARCH_TABLES['search_paid_content']})
+            VALUES (NEW.id, NEW.username, NEW.user_mention, NEW.link, NEW.note, NEW.admin_comment);
+        END
+    ''')
+    await db.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_search_paid_content_delete
+        AFTER DELETE ON paid_content_applications
+        BEGIN
+            DELETE FROM search_paid_content WHERE rowid = OLD.id;
+        END
+    ''')
+    await db.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_search_paid_content_update
+        AFTER UPDATE OF username, user_mention, link, note, admin_comment ON paid_content_applications
+        BEGIN
+            DELETE FROM search_paid_content WHERE rowid = OLD.id;
+            INSERT INTO search_paid_content (rowid, {SEARCH_TABLES['search_paid_content']})
+            VALUES (NEW.id, NEW.username, NEW.user_mention, NEW.link, NEW.note, NEW.admin_comment);
+        END
+    ''')
+
+    await db.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_search_users_insert
+        AFTER INSERT ON telegram_users
+        BEGIN
+            INSERT INTO search_users (rowid, username) VALUES (NEW.id, NEW.username);
+        END
+    ''')
+    await db.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_search_users_delete
+        AFTER DELETE ON telegram_users
+        BEGIN
+            DELETE FROM search_users WHERE rowid = OLD.id;
+        END
+    ''')
+    # Смена username переиндексирует и заявки на сотрудничество пользователя
+    await db.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_search_users_update
+        AFTER UPDATE OF username ON telegram_users
+        WHEN OLD.username IS NOT NEW.username
+        BEGIN
+            DELETE FROM search_users WHERE rowid = OLD.id;
+            INSERT INTO search_users (rowid, username) VALUES (NEW.id, NEW.username);
+
+            DELETE FROM search_channels
+            WHERE rowid IN (SELECT id FROM user_channels WHERE telegram_user_id = NEW.id);
+            INSERT INTO search_channels (rowid, {SEARCH_TABLES['search_channels']})
+            {_CHANNEL_ROW} WHERE uc.telegram_user_id = NEW.id;
+        END
+    ''')
+
+    # Индексируем уже существующие данные
+    for table in SEARCH_TABLES:
+        await db.execute(f"DELETE FROM {table}")
+    await db.execute(f'''
+        INSERT INTO search_channels (rowid, {SEARCH_TABLES['search_channels']})
+        {_CHANNEL_ROW}
+    ''')
+    await db.execute(f'''
+        INSERT INTO search_paid_content (rowid, {SEARCH_TABLES['search_paid_content']})
+        SELECT id, username, user_mention, link, note, admin_comment
+        FROM paid_content_applications
+    ''')
+    await db.execute('''
+        INSERT INTO search_users (rowid, username)
+        SELECT id, username FROM telegram_users
+    ''')
@@ -0,0 +1,39 @@
+"""Статус failed для рассылок, прерванных ошибкой"""
+import aiosqlite
+
+
+async def upgrade(db: aiosqlite.Connection):
+    # CHECK в SQLite не изменить через ALTER TABLE, поэтому таблица пересоздается
+    # с теми же столбцами (на нее не ссылаются внешние ключи)
+    await db.execute('''
+        CREATE TABLE broadcasts_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            text TEXT NOT NULL,
+            created_by INTEGER,                 -- Telegram ID администратора
+            status TEXT NOT NULL DEFAULT 'running' CHECK(
+                status IN ('running', 'done', 'cancelled', 'failed')
+            ),
+            last_user_id INTEGER NOT NULL DEFAULT 0,
+            sent_count INTEGER NOT NULL DEFAULT 0,
+            failed_count INTEGER NOT NULL DEFAULT 0,
+            blocked_count INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    ''')
+    await db.execute('''
+        INSERT INTO broadcasts_new (
+            id, text, created_by, status, last_user_id, sent_count, failed_count,
+            blocked_count, created_at, updated_at, finished_at
+        )
+        SELECT id, text, created_by, status, last_user_id, sent_count, failed_count,
+               blocked_count, created_at, updated_at, finished_at
+        FROM broadcasts
+    ''')
+    await db.execute('DROP TABLE broadcasts')
+    await db.execute('ALTER TABLE broadcasts_new RENAME TO broadcasts')
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_broadcasts_status
+        ON broadcasts(status)
+    ''')
@@ -0,0 +1,102 @@
+"""
+Версионированные миграции схемы.
+
+Каждая миграция - модуль вида NNNN_description.py с корутиной
+upgrade(db), где NNNN - номер версии схемы. Текущая версия хранится
+в таблице schema_version. При запуске сравнивается одно число, и если
+база уже актуальна, миграции не выполняются. Каждая миграция
+применяется в отдельной транзакции вместе с обновлением версии.
+"""
+import importlib
+import logging
+import pkgutil
+import re
+from types import ModuleType
+from typing import Dict, List, Tuple
+
+import aiosqlite
+
+logger = logging.getLogger('bot_logger')
+
+_MIGRATION_NAME = re.compile(r'^(\d{4})_\w+$')
+
+
+def load_migrations() -> List[Tuple[int, ModuleType]]:
+    """Возвращает модули миграций, отсортированные по номеру версии"""
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        match = _MIGRATION_NAME.match(module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{__name__}.{module_info.name}")
+        migrations.append((int(match.group(1)), module))
+
+    migrations.sort(key=lambda item: item[0])
+    versions = [version for version, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions: {versions}")
+    return migrations
+
+
+async def get_schema_version(db: aiosqlite.Connection) -> int:
+    """Читает текущую версию схемы (0 - база еще не мигрирована)"""
+    try:
+        cursor = await db.execute("SELECT version FROM schema_version")
+    except aiosqlite.OperationalError:
+        # Таблицы schema_version еще нет
+        return 0
+    row = await cursor.fetchone()
+    return row[0] if row else 0
+
+
+async def add_missing_columns(db: aiosqlite.Connection, table: str, columns: Dict[str, str]):
+    """Добавляет в таблицу столбцы, которых в ней нет (для баз, созданных старыми версиями бота)"""
+    cursor = await db.execute(f"PRAGMA table_info({table})")
+    existing = {column[1] for column in await cursor.fetchall()}
+    for name, definition in columns.items():
+        if name not in existing:
+            logger.info(f"Adding missing column {table}.{name}")
+            await db.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+
+async def migrate(pool) -> int:
+    """
+    Применяет недостающие миграции.
+
+    Returns:
+        Количество примененных миграций
+    """
+    migrations = load_migrations()
+    latest = migrations[-1][0] if migrations else 0
+
+    async with pool.read() as db:
+        current = await get_schema_version(db)
+    if current >= latest:
+        return 0
+
+    applied = 0
+    for version, module in migrations:
+        if version <= current:
+            continue
+
+        async with pool.write() as db:
+            await db.execute(
+                "CREATE TABLE IF NOT EXISTS schema_version ("
+                "version INTEGER NOT NULL, "
+                "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+            )
+            # Версию перечитываем внутри транзакции: другой процесс мог успеть мигрировать базу
+            current = await get_schema_version(db)
+            if version <= current:
+                continue
+
+            logger.info(f"Applying migration {module.__name__.rsplit('.', 1)[-1]}")
+            await module.upgrade(db)
+
+            await db.execute("DELETE FROM schema_version")
+            await db.execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
+            current = version
+            applied += 1
+
+    logger.info(f"Database schema migrated to version {current} ({applied} migrations applied)")
+    return applied
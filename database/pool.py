@@ -0,0 +1,329 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+
+import aiosqlite
+
+from .exceptions import ConnectionError, PoolTimeoutError
+
+logger = logging.getLogger('bot_logger')
+
+
+@dataclass
+class StorageProfile:
+    """Настройки SQLite, применяемые к каждому соединению пула"""
+    journal_mode: str = 'WAL'          # WAL: читатели не блокируются писателем
+    synchronous: str = 'NORMAL'        # в режиме WAL NORMAL безопасен при сбое процесса
+    mmap_size: int = 268_435_456       # 256 МБ отображаются в память
+    cache_size: int = -64_000          # отрицательное значение - размер в КиБ (64 МБ)
+    busy_timeout: int = 5_000          # мс ожидания блокировки вместо "database is locked"
+    write_queue_size: int = 1_000      # максимум транзакций в очереди писателя
+
+    def pragmas(self, writer: bool) -> List[str]:
+        """Возвращает PRAGMA-команды для соединения"""
+        pragmas = [
+            f"PRAGMA busy_timeout = {int(self.busy_timeout)}",
+            f"PRAGMA synchronous = {self.synchronous}",
+            f"PRAGMA cache_size = {int(self.cache_size)}",
+            f"PRAGMA mmap_size = {int(self.mmap_size)}",
+        ]
+        if writer:
+            # journal_mode сохраняется в файле базы, достаточно установить его писателем
+            pragmas.insert(0, f"PRAGMA journal_mode = {self.journal_mode}")
+        else:
+            # Читатели не могут случайно начать запись в обход очереди писателя
+            pragmas.append("PRAGMA query_only = 1")
+        return pragmas
+
+
+class _WriteJob:
+    """Транзакция, ожидающая своей очереди у писателя"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.granted = loop.create_future()   # писатель выдал соединение
+        self.finished = loop.create_future()  # вызывающий код завершил работу (True - фиксировать)
+        self.committed = loop.create_future() # писатель зафиксировал или откатил транзакцию
+
+
+class ConnectionPool:
+    """
+    Пул соединений с SQLite.
+
+    SQLite допускает только одного писателя, поэтому пул держит одно
+    соединение на запись и несколько соединений на чтение. Соединением
+    на запись владеет отдельная задача: транзакции выстраиваются в
+    asyncio-очередь и выполняются строго по одной, так что писатели не
+    конкурируют за блокировку файла, а читатели в режиме WAL их не ждут.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        readers: int = 4,
+        acquire_timeout: float = 5.0,
+        write_timeout: float = 60.0,
+        release_timeout: float = 5.0,
+        health_check_interval: float = 30.0,
+        profile: Optional[StorageProfile] = None
+    ):
+        self.db_path = db_path
+        self.readers_count = max(1, readers)
+        self.acquire_timeout = acquire_timeout
+        # Очередь писателя ждет завершения чужих транзакций (массовые обновления, пересчеты),
+        # поэтому ожидание записи дольше ожидания читателя и отсчитывается от постановки в очередь
+        self.write_timeout = write_timeout
+        self.release_timeout = release_timeout
+        self.health_check_interval = health_check_interval
+        self.profile = profile or StorageProfile()
+
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._idle_readers: asyncio.Queue = asyncio.Queue()
+        self._readers: List[aiosqlite.Connection] = []
+        self._last_checked: Dict[int, float] = {}
+
+        self._init_lock = asyncio.Lock()
+        self._opened = False
+        self._closed = False
+
+        # Счетчики для мониторинга
+        self._writer_in_use = False
+        self._waiting_readers = 0
+        self._timeouts = 0
+        self._write_timeouts = 0
+        self._replaced = 0
+
+    async def _connect(self, writer: bool = False) -> aiosqlite.Connection:
+        """Открывает новое соединение с базой данных и применяет профиль хранилища"""
+        try:
+            connection = await aiosqlite.connect(self.db_path)
+            connection.row_factory = aiosqlite.Row
+            for pragma in self.profile.pragmas(writer):
+                await connection.execute(pragma)
+            self._last_checked[id(connection)] = time.monotonic()
+            return connection
+        except Exception as e:
+            logger.error(f"Failed to create database connection: {e}")
+            raise ConnectionError(f"Failed to connect to database: {e}")
+
+    async def _discard(self, connection: aiosqlite.Connection):
+        """Закрывает соединение, не пробрасывая ошибки"""
+        self._last_checked.pop(id(connection), None)
+        try:
+            await connection.close()
+        except Exception as e:
+            logger.warning(f"Error closing pooled connection: {e}")
+
+    async def open(self):
+        """Открывает соединения пула и запускает задачу писателя (повторный вызов ничего не делает)"""
+        if self._opened:
+            return
+        async with self._init_lock:
+            if self._opened:
+                return
+            if self._closed:
+                raise ConnectionError("Connection pool is closed")
+
+            self._writer = await self._connect(writer=True)
+            for _ in range(self.readers_count):
+                reader = await self._connect()
+                self._readers.append(reader)
+                self._idle_readers.put_nowait(reader)
+
+            self._write_queue = asyncio.Queue(maxsize=self.profile.write_queue_size)
+            self._writer_task = asyncio.create_task(self._writer_loop())
+
+            self._opened = True
+            logger.info(
+                f"Database pool opened: 1 writer, {self.readers_count} readers "
+                f"({self.db_path}, journal_mode={self.profile.journal_mode})"
+            )
+
+    async def _open_missing(self):
+        """Восполняет соединения на чтение, потерянные после неудачного переподключения"""
+        while len(self._readers) < self.readers_count:
+            reader = await self._connect()
+            self._readers.append(reader)
+            self._idle_readers.put_nowait(reader)
+
+    async def _ensure_healthy(self, connection: aiosqlite.Connection, writer: bool = False) -> aiosqlite.Connection:
+        """Проверяет соединение, если оно давно не проверялось, и при необходимости пересоздает его"""
+        now = time.monotonic()
+        if now - self._last_checked.get(id(connection), 0) < self.health_check_interval:
+            return connection
+
+        try:
+            await asyncio.wait_for(connection.execute("SELECT 1"), self.acquire_timeout)
+            self._last_checked[id(connection)] = now
+            return connection
+        except Exception as e:
+            logger.warning(f"Pooled connection failed health check, reconnecting: {e}")
+            await self._discard(connection)
+            self._replaced += 1
+            return await self._connect(writer=writer)
+
+    async def _reset(self, connection: aiosqlite.Connection) -> bool:
+        """Откатывает незавершенную транзакцию перед возвратом соединения в пул"""
+        if not connection.in_transaction:
+            return True
+        try:
+            await asyncio.wait_for(connection.rollback(), self.release_timeout)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to release pooled connection: {e}")
+            return False
+
+    @asynccontextmanager
+    async def read(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Выдает соединение для чтения"""
+        await self.open()
+        await self._open_missing()
+
+        self._waiting_readers += 1
+        try:
+            connection = await asyncio.wait_for(self._idle_readers.get(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            raise PoolTimeoutError(
+                f"No reader connection available within {self.acquire_timeout}s"
+            )
+        finally:
+            self._waiting_readers -= 1
+
+        try:
+            replacement = await self._ensure_healthy(connection)
+        except Exception:
+            # Соединение уже закрыто, пул временно уменьшается до следующего open_missing
+            self._readers.remove(connection)
+            raise
+        if replacement is not connection:
+            self._readers[self._readers.index(connection)] = replacement
+            connection = replacement
+
+        try:
+            yield connection
+        finally:
+            if not await self._reset(connection):
+                self._readers.remove(connection)
+                await self._discard(connection)
+                connection = await self._connect()
+                self._readers.append(connection)
+            self._idle_readers.put_nowait(connection)
+
+    async def _writer_loop(self):
+        """Задача писателя: по очереди выполняет транзакции из очереди"""
+        while True:
+            job = await self._write_queue.get()
+            if job is None:
+                break
+            # Вызывающий код не дождался своей очереди
+            if job.granted.done():
+                continue
+
+            try:
+                self._writer = await self._ensure_healthy(self._writer, writer=True)
+                # IMMEDIATE сразу берет блокировку на запись: конфликт обнаруживается
+                # в начале транзакции (с ожиданием busy_timeout), а не на COMMIT
+                await self._writer.execute("BEGIN IMMEDIATE")
+            except Exception as e:
+                if not job.granted.done():
+                    job.granted.set_exception(ConnectionError(f"Failed to begin write transaction: {e}"))
+                continue
+
+            if job.granted.done():
+                await self._reset(self._writer)
+                continue
+
+            self._writer_in_use = True
+            job.granted.set_result(self._writer)
+            try:
+                commit = await job.finished
+                if commit:
+                    await self._writer.commit()
+                job.committed.set_result(None)
+            except Exception as e:
+                if not job.committed.done():
+                    job.committed.set_exception(e)
+            finally:
+                self._writer_in_use = False
+                if not await self._reset(self._writer):
+                    await self._discard(self._writer)
+                    try:
+                        self._writer = await self._connect(writer=True)
+                    except ConnectionError:
+                        # Следующая транзакция повторит попытку через проверку здоровья
+                        pass
+
+    @asynccontextmanager
+    async def write(self) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Выдает соединение для записи, когда до транзакции дойдет очередь писателя.
+
+        При успешном выходе из блока изменения фиксируются,
+        при исключении - откатываются.
+        """
+        await self.open()
+        if self._writer_task.done():
+            raise ConnectionError("Database writer task is not running")
+
+        loop = asyncio.get_running_loop()
+        job = _WriteJob(loop)
+        # Один срок на постановку в очередь и ожидание своей очереди
+        deadline = loop.time() + self.write_timeout
+        try:
+            await asyncio.wait_for(self._write_queue.put(job), self.write_timeout)
+            connection = await asyncio.wait_for(job.granted, max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            if self._writer_task.done():
+                raise ConnectionError("Database writer task stopped while the transaction was queued")
+            self._write_timeouts += 1
+            raise PoolTimeoutError(
+                f"Write transaction not started within {self.write_timeout}s "
+                f"({self._write_queue.qsize()} transactions queued)"
+            )
+
+        try:
+            yield connection
+        except BaseException:
+            job.finished.set_result(False)
+            await asyncio.shield(job.committed)
+            raise
+        job.finished.set_result(True)
+        await asyncio.shield(job.committed)
+
+    async def close(self):
+        """Дожидается завершения очереди записи и закрывает все соединения пула"""
+        async with self._init_lock:
+            self._closed = True
+            if not self._opened:
+                return
+            await self._write_queue.put(None)
+            await self._writer_task
+            if self._writer is not None:
+                await self._discard(self._writer)
+                self._writer = None
+            for reader in self._readers:
+                await self._discard(reader)
+            self._readers.clear()
+            self._idle_readers = asyncio.Queue()
+            self._opened = False
+
+    def stats(self) -> Dict[str, int]:
+        """Возвращает текущую загрузку пула для мониторинга"""
+        idle = self._idle_readers.qsize()
+        return {
+            'readers_total': len(self._readers),
+            'readers_idle': idle,
+            'readers_in_use': len(self._readers) - idle,
+            'writer_in_use': int(self._writer_in_use),
+            'waiting_readers': self._waiting_readers,
+            'write_queue_depth': self._write_queue.qsize() if self._write_queue else 0,
+            'acquire_timeouts': self._timeouts,
+            'write_timeouts': self._write_timeouts,
+            'writer_alive': int(self._writer_task is not None and not self._writer_task.done()),
+            'reconnects': self._replaced
+        }
@@ -0,0 +1,75 @@
+"""
+Проверка планов частых запросов.
+
+Запросы, которые бот выполняет на каждое действие пользователя,
+регистрируются через hot_query при определении класса Database. При
+запуске для каждого из них выполняется EXPLAIN QUERY PLAN: если запрос
+перебирает таблицу или индекс целиком, SQLite строит для него временный
+индекс или сортирует все строки ради LIMIT, значит нужного индекса нет
+(его удалили, миграция не применилась или запрос изменили без индекса).
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import aiosqlite
+
+# Имя запроса -> SQL
+HOT_QUERIES: Dict[str, str] = {}
+
+_SCAN = re.compile(r'^SCAN (\w+)(?: USING (?:COVERING )?INDEX \w+)?(?: LEFT-JOIN)?$')
+_AUTOMATIC_INDEX = re.compile(r'^(?:SEARCH|SCAN) \w+ USING AUTOMATIC')
+_SUBQUERY = re.compile(r'^(?:CO-ROUTINE|MATERIALIZE) (\w+)')
+_LIMIT = re.compile(r'\bLIMIT\b', re.IGNORECASE)
+
+
+def hot_query(name: str, sql: str) -> str:
+    """Регистрирует частый запрос для проверки плана и возвращает его SQL"""
+    if HOT_QUERIES.get(name, sql) != sql:
+        raise ValueError(f"Hot query {name} is already registered with different SQL")
+    HOT_QUERIES[name] = sql
+    return sql
+
+
+def _outer_query(sql: str) -> str:
+    """Текст запроса без подзапросов и других выражений в скобках"""
+    while True:
+        stripped = re.sub(r'\([^()]*\)', '', sql)
+        if stripped == sql:
+            return sql
+        sql = stripped
+
+
+def plan_problems(sql: str, plan: Iterable[Tuple[int, int, int, str]]) -> List[str]:
+    """Шаги плана (строки EXPLAIN QUERY PLAN), которые означают, что подходящего индекса нет"""
+    plan = list(plan)
+    subqueries = {match.group(1) for *_, detail in plan if (match := _SUBQUERY.match(detail))}
+    problems = []
+    for _, parent, _, detail in plan:
+        scan = _SCAN.match(detail)
+        if scan and scan.group(1) not in subqueries:
+            problems.append(detail)
+        elif _AUTOMATIC_INDEX.match(detail):
+            problems.append(detail)
+        elif detail == 'USE TEMP B-TREE FOR ORDER BY' and parent == 0 and _LIMIT.search(_outer_query(sql)):
+            problems.append(f"{detail} (LIMIT)")
+    return problems
+
+
+async def check_query_plans(
+    db: aiosqlite.Connection,
+    queries: Optional[Dict[str, str]] = None
+) -> Dict[str, List[str]]:
+    """
+    Проверяет планы зарегистрированных запросов.
+
+    Returns:
+        Запросы, которые не используют индекс, и проблемные шаги их планов
+    """
+    problems = {}
+    for name, sql in (queries if queries is not None else HOT_QUERIES).items():
+        # План не зависит от значений параметров, поэтому подставляются NULL
+        cursor = await db.execute(f"EXPLAIN QUERY PLAN {sql}", (None,) * sql.count('?'))
+        steps = plan_problems(sql, await cursor.fetchall())
+        if steps:
+            problems[name] = steps
+    return problems
@@ -0,0 +1,39 @@
+"""
+Поиск для админов (/find).
+
+Заявки на сотрудничество, заявки на оплату контента и пользователи
+индексируются в таблицах FTS5 (миграция 0011), которые поддерживаются
+триггерами. Здесь из текста админа собирается выражение MATCH: каждое
+слово ищется как фраза, все слова должны найтись в одной записи.
+"""
+import re
+from typing import Optional
+
+# Токенизатор trigram не находит строки короче трех символов
+MIN_TRIGRAM_TERM = 3
+
+# Границы найденного фрагмента в snippet (управляющие символы не встречаются в тексте заявок)
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+_TERM = re.compile(r'\S+')
+
+
+def match_expression(text: str, trigram: bool) -> Optional[str]:
+    """
+    Собирает выражение MATCH из поискового запроса.
+
+    С trigram каждое слово ищется как подстрока, иначе - как начало слова.
+
+    Returns:
+        None, если в запросе нет слов, по которым можно искать
+    """
+    phrases = []
+    for term in _TERM.findall(text):
+        # Username вводят с @, а в базе он хранится без него
+        term = term.lstrip('@')
+        if len(term) < (MIN_TRIGRAM_TERM if trigram else 1):
+            continue
+        phrase = '"' + term.replace('"', '""') + '"'
+        phrases.append(phrase if trigram else f"{phrase}*")
+    return " AND ".join(phrases) or None
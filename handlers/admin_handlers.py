@@ -1,24 +1,38 @@
-from aiogram import Router, F, types
-from aiogram.filters import Command, BaseFilter
-from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram import Router, types
+from aiogram.filters import Command, CommandObject, BaseFilter
+from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton, FSInputFile
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from database.database import Database, DatabaseError
 from utils.message_utils import safe_send_message, safe_edit_message
+from utils.outbound import get_scheduler
+from utils.broadcast import Broadcaster
+from utils.notifications import notify_in_background
+from utils.callback_router import Callback
+from database.search import HIGHLIGHT_END, HIGHLIGHT_START, MIN_TRIGRAM_TERM
+from utils.export import EXPORT_FORMATS, export_rows
 from .states import AdminStates  # Убираем PaymentStates, так как он нам не нужен здесь
+import html
 import logging
+import os
 import re
+import tempfile
 import aiosqlite
-from datetime import datetime
+from datetime import date, datetime
 
 logger = logging.getLogger('bot_logger')
 
 router = Router()
 router.database = None  # Будет установлено в main.py
+router.broadcaster = None  # Будет установлено в register_admin_handlers
 ADMIN_IDS = []  # Будет установлено при инициализации
 
 APPS_PER_PAGE = 1  # Количество заявок на странице
+PAY_USERS_PER_PAGE = 20  # Количество пользователей на странице /pay
+BULK_PAGE_SIZE = 10  # Количество заявок на странице массовой обработки
+FIND_PAGE_SIZE = 10  # Количество результатов на странице /find
+EXPORT_MAX_FILE_SIZE = 50 * 1024 * 1024  # Лимит Telegram на отправку файла ботом
 
 class ApprovalStates(StatesGroup):
     waiting_for_username = State()
@@ -54,20 +68,14 @@ class IsAdmin(BaseFilter):
     async def __call__(self, message: Message) -> bool:
         return message.from_user.id in ADMIN_IDS
 
-def register_admin_handlers(dp, db: Database, admin_ids: list[int]):
+def register_admin_handlers(dp, db: Database, admin_ids: list[int], broadcaster: Broadcaster = None):
     """Регистрирует обработчики админ-команд"""
     global ADMIN_IDS
     ADMIN_IDS = admin_ids
     router.database = db
+    router.broadcaster = broadcaster or Broadcaster(db)
     dp.include_router(router)
 
-async def safe_send_message(bot, user_id: int, text: str, **kwargs):
-    """Безопасно отправляет сообщение пользователю, игнорируя ошибки блокировки"""
-    try:
-        await bot.send_message(user_id, text, **kwargs)
-    except Exception as e:
-        logging.error(f"Error sending message to user {user_id}: {e}")
-
 async def format_application_text(app: dict) -> str:
     """Форматирует текст заявки для отображения"""
     # Безопасное получение значений с дефолтными значениями
@@ -152,14 +160,14 @@ async def show_applications_menu(message: Message):
     await message.answer(stats_text, reply_markup=keyboard, parse_mode="HTML")
 
 # Обработчик для просмотра заявок определенного статуса
-@router.callback_query(F.data.startswith("show_"))
+@router.callback_query(Callback.prefix("show_"))
 async def show_requests_by_status(callback: CallbackQuery):
     status = callback.data.split("_")[1]  # pending, approved, rejected
     
-    # Получаем заявки с соответствующим статусом
-    requests = await router.database.get_requests_by_status(status)
+    # Получаем первую заявку очереди и количество заявок из счетчика
+    request = await router.database.get_next_request(status)
     
-    if not requests:
+    if not request:
         status_text = {
             "pending": "ожидающих проверки",
             "approved": "одобренных",
@@ -175,7 +183,8 @@ async def show_requests_by_status(callback: CallbackQuery):
         return
     
     # Показываем первую заявку
-    await show_request(callback.message, requests[0], len(requests), 0, status)
+    total = await router.database.get_requests_count(status)
+    await show_request(callback.message, request, total, 0, status)
 
 async def show_request(message: Message, request: dict, total: int, current_index: int, status: str):
     """Показывает одну заявку с кнопками управления"""
@@ -201,12 +210,16 @@ async def show_request(message: Message, request: dict, total: int, current_inde
     # Создаем кнопки навигации и управления
     keyboard = []
     
-    # Кнопки навигации
+    # Кнопки навигации хранят курсор - id текущей заявки
     nav_buttons = []
     if current_index > 0:
-        nav_buttons.append(InlineKeyboardButton(text="◀️", callback_data=f"nav_request_{status}_{current_index-1}"))
+        nav_buttons.append(InlineKeyboardButton(
+            text="◀️", callback_data=f"nav_request_{status}_prev_{request['id']}_{current_index-1}"
+        ))
     if current_index < total - 1:
-        nav_buttons.append(InlineKeyboardButton(text="▶️", callback_data=f"nav_request_{status}_{current_index+1}"))
+        nav_buttons.append(InlineKeyboardButton(
+            text="▶️", callback_data=f"nav_request_{status}_next_{request['id']}_{current_index+1}"
+        ))
     if nav_buttons:
         keyboard.append(nav_buttons)
     
@@ -230,23 +243,33 @@ async def show_request(message: Message, request: dict, total: int, current_inde
     )
 
 # Обработчик навигации по заявкам
-@router.callback_query(F.data.startswith("nav_request_"))
+@router.callback_query(Callback.prefix("nav_request_"))
 async def navigate_requests(callback: CallbackQuery):
-    # Формат callback_data: "nav_request_status_index"
+    # Формат callback_data: "nav_request_status_direction_cursorid_index"
     parts = callback.data.split("_")
-    if len(parts) < 4:
+    if len(parts) < 6:
         logger.error(f"Invalid callback data format: {callback.data}")
         return
 
     status = parts[2]
-    index = int(parts[3])
+    direction = parts[3]
+    cursor_id = int(parts[4])
+    index = int(parts[5])
+    
+    if direction == "next":
+        request = await router.database.get_next_request(status, after_id=cursor_id)
+    else:
+        request = await router.database.get_prev_request(status, before_id=cursor_id)
     
-    requests = await router.database.get_requests_by_status(status)
-    if 0 <= index < len(requests):
-        await show_request(callback.message, requests[index], len(requests), index, status)
+    if not request:
+        await callback.answer("Заявок больше нет")
+        return
+    
+    total = await router.database.get_requests_count(status)
+    await show_request(callback.message, request, total, max(0, min(index, total - 1)), status)
 
 # Обработчик одобрения заявки
-@router.callback_query(F.data.startswith("approve_request_"))
+@router.callback_query(Callback.prefix("approve_request_"))
 async def approve_request(callback: CallbackQuery, state: FSMContext):
     request_id = int(callback.data.split("_")[2])
     await state.update_data(request_id=request_id, action_type='approve')
@@ -291,7 +314,7 @@ async def process_admin_comment(message: Message, state: FSMContext):
     await show_applications_menu(message)
 
 # Обработчик отклонения заявки
-@router.callback_query(F.data.startswith("reject_request_"))
+@router.callback_query(Callback.prefix("reject_request_"))
 async def start_reject_request(callback: CallbackQuery, state: FSMContext):
     request_id = int(callback.data.split("_")[2])
     await state.update_data(request_id=request_id, action_type='reject')
@@ -305,63 +328,64 @@ async def start_reject_request(callback: CallbackQuery, state: FSMContext):
     )
 
 # Обработчик отмены действия админа
-@router.callback_query(F.data == "cancel_admin_action")
+@router.callback_query(Callback("cancel_admin_action"))
 async def cancel_admin_action(callback: CallbackQuery, state: FSMContext):
     await state.clear()
     await show_applications_menu(callback.message)
 
 # Обработчик возврата в админ-меню
-@router.callback_query(F.data == "back_to_admin_menu")
+@router.callback_query(Callback("back_to_admin_menu"))
 async def back_to_admin_menu(callback: CallbackQuery):
     await show_applications_menu(callback.message)
 
-# Команда для просмотра пользователей с ожидающими заявками
-@router.message(Command("pay"), IsAdmin())
-async def show_users_with_pending_apps(message: Message):
-    """Показывает список пользователей с заявками в ожидании оплаты"""
-    logger.info("Processing /pay command")
-    
-    users = await router.database.get_users_with_pending_applications()
-    logger.info(f"Found {len(users)} users with pending applications")
-    
-    if not users:
-        logger.warning("No users with pending applications found")
-        await message.answer("📝 Нет заявок, ожидающих оплаты")
-        return
-    
-    # Формируем общую статистику
-    total_pending = sum(user['pending_count'] for user in users)
-    logger.info(f"Total pending applications: {total_pending}")
-    
+PLATFORM_ICONS = {
+    'youtube': '📺',
+    'tiktok': '📱',
+    'shorts': '📱',
+    'twitch': '🎮',
+    'other': '🎯'
+}
+
+async def build_pay_list(after_user_id: int = None, before_user_id: int = None):
+    """Формирует текст и клавиатуру страницы списка пользователей с ожидающими заявками"""
+    summary = await router.database.get_pending_payments_summary()
+    if not summary['total_pending']:
+        return None, None
+
+    # Запрашиваем на одного пользователя больше, чтобы понять, есть ли следующая страница
+    users = await router.database.get_users_with_pending_applications(
+        after_user_id=after_user_id,
+        before_user_id=before_user_id,
+        limit=PAY_USERS_PER_PAGE + 1
+    )
+    if before_user_id is not None:
+        has_prev = len(users) > PAY_USERS_PER_PAGE
+        users = users[-PAY_USERS_PER_PAGE:]
+        has_next = True
+    else:
+        has_next = len(users) > PAY_USERS_PER_PAGE
+        users = users[:PAY_USERS_PER_PAGE]
+        has_prev = after_user_id is not None
+
     text = [
         "📊 <b>Статистика заявок на оплату</b>",
-        f"• Всего заявок в ожидании: {total_pending}",
-        f"• Количество пользователей: {len(users)}",
+        f"• Всего заявок в ожидании: {summary['total_pending']}",
+        f"• Количество пользователей: {summary['users_count']}",
         "\n👥 <b>Список пользователей с заявками:</b>"
     ]
-    
+
     keyboard = []
     for user in users:
         username = user['username'] or f"id{user['telegram_id']}"
-        platforms_str = " ".join([
-            {
-                'youtube': '📺',
-                'tiktok': '📱',
-                'shorts': '📱',
-                'twitch': '🎮',
-                'other': '🎯'
-            }.get(platform, '🔗') for platform in user['platforms']
-        ])
-        
-        logger.info(f"Processing user @{username} with {user['pending_count']} pending applications")
-        
+        platforms_str = " ".join(PLATFORM_ICONS.get(platform, '🔗') for platform in user['platforms'])
+
         # Добавляем информацию о пользователе в текст
         text.append(
             f"\n@{username}"
             f"\n└ Заявок: 🕒 {user['pending_count']}"
             f"\n└ Платформы: {platforms_str}"
         )
-        
+
         # Добавляем кнопку для пользователя
         keyboard.append([
             InlineKeyboardButton(
@@ -369,27 +393,61 @@ async def show_users_with_pending_apps(message: Message):
                 callback_data=f"show_user_{user['telegram_id']}"
             )
         ])
-    
+
+    # Кнопки навигации хранят курсор - Telegram ID крайнего пользователя страницы
+    nav_buttons = []
+    if users and has_prev:
+        nav_buttons.append(
+            InlineKeyboardButton(text="◀️", callback_data=f"pay_page:prev:{users[0]['telegram_id']}")
+        )
+    if users and has_next:
+        nav_buttons.append(
+            InlineKeyboardButton(text="▶️", callback_data=f"pay_page:next:{users[-1]['telegram_id']}")
+        )
+    if nav_buttons:
+        keyboard.append(nav_buttons)
+
     # Добавляем кнопку обновления списка
     keyboard.append([
         InlineKeyboardButton(text="🔄 Обновить список", callback_data="refresh_pay_list")
     ])
-    
-    logger.info("Sending response message")
-    await message.answer(
-        "\n".join(text),
-        reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard),
-        parse_mode="HTML"
-    )
+
+    return "\n".join(text), InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+# Команда для просмотра пользователей с ожидающими заявками
+@router.message(Command("pay"), IsAdmin())
+async def show_users_with_pending_apps(message: Message):
+    """Показывает первую страницу пользователей с заявками в ожидании оплаты"""
+    text, keyboard = await build_pay_list()
+    if text is None:
+        await message.answer("📝 Нет заявок, ожидающих оплаты")
+        return
+
+    await message.answer(text, reply_markup=keyboard, parse_mode="HTML")
+
+@router.callback_query(Callback.prefix("pay_page:"))
+async def pay_list_page(callback: CallbackQuery):
+    """Переключает страницу списка пользователей с ожидающими заявками"""
+    _, direction, cursor = callback.data.split(":")
+    if direction == "next":
+        text, keyboard = await build_pay_list(after_user_id=int(cursor))
+    else:
+        text, keyboard = await build_pay_list(before_user_id=int(cursor))
+
+    if text is None:
+        await callback.message.edit_text("📝 Нет заявок, ожидающих оплаты")
+    else:
+        await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
+    await callback.answer()
 
 # Добавляем обработчик для кнопки обновления
-@router.callback_query(F.data == "refresh_pay_list")
+@router.callback_query(Callback("refresh_pay_list"))
 async def refresh_pay_list(callback: CallbackQuery):
     """Обновляет список пользователей с заявками"""
     await show_users_with_pending_apps(callback.message)
     await callback.answer("Список обновлен")
 
-@router.callback_query(F.data.startswith("show_user_"))
+@router.callback_query(Callback.prefix("show_user_"))
 async def show_user_menu(callback: CallbackQuery):
     """Показывает меню действий для конкретного пользователя"""
     user_id = int(callback.data.split("_")[2])
@@ -416,9 +474,704 @@ async def show_user_menu(callback: CallbackQuery):
         reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
     )
 
-@router.callback_query(F.data == "back_to_pay_menu")
+@router.callback_query(Callback("back_to_pay_menu"))
 async def back_to_pay_menu(callback: CallbackQuery):
     """Возвращает к списку пользователей с ожидающими заявками"""
     await show_users_with_pending_apps(callback.message)
 
-# ... остальные обработчики для админки 
\ No newline at end of file
+# Команда для просмотра загрузки бота
+@router.message(Command("status"), IsAdmin())
+async def show_status(message: Message):
+    """Показывает загрузку пула соединений, очереди исходящих сообщений и кэша"""
+    pool = router.database.pool_stats()
+    cache = router.database.approval_cache.stats()
+    scheduler = get_scheduler(message.bot)
+    outbound = scheduler.stats() if scheduler else {}
+
+    text = (
+        "⚙️ <b>Состояние бота</b>\n\n"
+        "🗄 <b>База данных</b>\n"
+        f"• Читатели: {pool['readers_in_use']}/{pool['readers_total']} заняты, ждут: {pool['waiting_readers']}\n"
+        f"• Очередь записи: {pool['write_queue_depth']}"
+        f"{'' if pool['writer_alive'] else ' (⚠️ писатель остановлен)'}\n"
+        f"• Таймауты чтения: {pool['acquire_timeouts']}, записи: {pool['write_timeouts']}, "
+        f"переподключения: {pool['reconnects']}\n\n"
+        "📤 <b>Исходящие сообщения</b>\n"
+        f"• Ждут лимита чата: {outbound.get('waiting_chat', 0)}\n"
+        f"• Ждут общего лимита: {outbound.get('waiting_global', 0)}\n"
+        f"• Повторы после 429: {outbound.get('retries', 0)}, потеряно: {outbound.get('failed', 0)}\n\n"
+        "🧠 <b>Кэш одобренных блогеров</b>\n"
+        f"• Записей: {cache['size']}, попаданий: {cache['hits']}, промахов: {cache['misses']}"
+    )
+    await message.answer(text, parse_mode="HTML")
+
+# Команда для рассылки сообщения всем пользователям
+@router.message(Command("broadcast"), IsAdmin(), NoActiveState())
+async def start_broadcast(message: Message, state: FSMContext):
+    """Запрашивает текст рассылки"""
+    recipients = await router.database.count_broadcast_recipients()
+    await state.set_state(AdminStates.waiting_for_broadcast_text)
+    await message.answer(
+        "📣 <b>Рассылка</b>\n\n"
+        f"Получателей: {recipients}\n"
+        "Отправьте текст сообщения (форматирование сохранится):",
+        parse_mode="HTML",
+        reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="❌ Отменить", callback_data="broadcast:cancel")]
+        ])
+    )
+
+@router.message(AdminStates.waiting_for_broadcast_text)
+async def process_broadcast_text(message: Message, state: FSMContext):
+    """Показывает рассылку перед отправкой"""
+    if not message.text:
+        await message.answer("❌ Отправьте текстовое сообщение")
+        return
+
+    await state.update_data(broadcast_text=message.html_text)
+    await message.answer(
+        f"Так сообщение увидят пользователи:\n\n{message.html_text}",
+        parse_mode="HTML",
+        disable_web_page_preview=True,
+        reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+            [
+                InlineKeyboardButton(text="✅ Отправить", callback_data="broadcast:confirm"),
+                InlineKeyboardButton(text="❌ Отменить", callback_data="broadcast:cancel")
+            ]
+        ])
+    )
+
+@router.callback_query(Callback("broadcast:cancel"))
+async def cancel_broadcast(callback: CallbackQuery, state: FSMContext):
+    await state.clear()
+    await callback.message.edit_text("❌ Рассылка отменена")
+    await callback.answer()
+
+@router.callback_query(Callback("broadcast:confirm"))
+async def confirm_broadcast(callback: CallbackQuery, state: FSMContext):
+    """Запускает рассылку"""
+    data = await state.get_data()
+    text = data.get('broadcast_text')
+    await state.clear()
+    if not text:
+        await callback.answer("❌ Текст рассылки не найден", show_alert=True)
+        return
+
+    try:
+        broadcast_id = await router.broadcaster.start(callback.bot, text, callback.from_user.id)
+    except DatabaseError as e:
+        logger.error(f"Failed to start broadcast: {e}")
+        await callback.answer("❌ Не удалось запустить рассылку", show_alert=True)
+        return
+
+    await show_broadcast_progress(callback.message, broadcast_id)
+    await callback.answer("📣 Рассылка запущена")
+
+async def show_broadcast_progress(message: Message, broadcast_id: int):
+    """Показывает прогресс рассылки"""
+    broadcast = await router.database.get_broadcast(broadcast_id)
+    if not broadcast:
+        await message.edit_text("❌ Рассылка не найдена")
+        return
+
+    status_display = {
+        'running': '⏳ Отправляется',
+        'done': '✅ Завершена',
+        'cancelled': '⏹ Остановлена',
+        'failed': '⚠️ Прервана ошибкой'
+    }.get(broadcast['status'], broadcast['status'])
+    text = (
+        f"📣 <b>Рассылка #{broadcast_id}</b>\n\n"
+        f"Статус: {status_display}\n"
+        f"✅ Доставлено: {broadcast['sent_count']}\n"
+        f"🚫 Заблокировали бота: {broadcast['blocked_count']}\n"
+        f"❌ Ошибок: {broadcast['failed_count']}"
+    )
+    keyboard = []
+    if broadcast['status'] == 'running':
+        keyboard.append([
+            InlineKeyboardButton(text="🔄 Обновить", callback_data=f"broadcast:progress:{broadcast_id}"),
+            InlineKeyboardButton(text="⏹ Остановить", callback_data=f"broadcast:stop:{broadcast_id}")
+        ])
+
+    try:
+        await message.edit_text(
+            text,
+            parse_mode="HTML",
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+        )
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e):
+            raise
+
+@router.callback_query(Callback.prefix("broadcast:progress:"))
+async def refresh_broadcast_progress(callback: CallbackQuery):
+    broadcast_id = int(callback.data.split(":")[2])
+    await show_broadcast_progress(callback.message, broadcast_id)
+    await callback.answer()
+
+@router.callback_query(Callback.prefix("broadcast:stop:"))
+async def stop_broadcast(callback: CallbackQuery):
+    broadcast_id = int(callback.data.split(":")[2])
+    if await router.broadcaster.cancel(broadcast_id):
+        await callback.answer("⏹ Рассылка остановлена")
+    else:
+        await callback.answer("Рассылка уже завершена")
+    await show_broadcast_progress(callback.message, broadcast_id)
+
+# Команда для пересчета счетчиков заявок пользователей
+@router.message(Command("rebuild_counters"), IsAdmin())
+async def rebuild_counters(message: Message):
+    """Пересчитывает счетчики заявок на оплату контента с нуля"""
+    try:
+        users = await router.database.rebuild_user_application_counters()
+    except DatabaseError:
+        await message.answer("❌ Не удалось пересчитать счетчики заявок")
+        return
+    await message.answer(f"✅ Счетчики заявок пересчитаны для {users} пользователей")
+
+# Команда для пересчета ключей ссылок после изменения правил классификации
+@router.message(Command("rekey_links"), IsAdmin())
+async def rekey_links(message: Message):
+    """Пересчитывает ключи поиска дублей каналов и публикаций"""
+    try:
+        changed = await router.database.rekey_links()
+    except DatabaseError:
+        await message.answer("❌ Не удалось пересчитать ключи ссылок")
+        return
+    await message.answer(f"✅ Ключи ссылок пересчитаны, изменено у {changed} заявок")
+
+# Команда для сверки итогов каналов с заявками на выплату
+@router.message(Command("reconcile"), IsAdmin())
+async def reconcile_totals(message: Message):
+    """Пересчитывает итоги каналов по заявкам на выплату"""
+    try:
+        fixed = await router.database.reconcile_channel_totals()
+    except DatabaseError:
+        await message.answer("❌ Не удалось сверить итоги каналов")
+        return
+
+    if fixed:
+        await message.answer(f"⚠️ Итоги исправлены у {fixed} каналов")
+    else:
+        await message.answer("✅ Итоги всех каналов совпадают с заявками")
+
+# Виды заявок для массовой обработки: заголовок и доступные действия (статус -> кнопка)
+BULK_KINDS = {
+    'apps': ("🤝 Заявки на сотрудничество", {'approved': "✅ Одобрить", 'rejected': "❌ Отклонить"}),
+    'clips': ("💰 Заявки на оплату контента", {'paid': "💰 Оплачено", 'rejected': "❌ Отклонить"})
+}
+
+BULK_EXPIRED_TEXT = "❌ Выбор заявок устарел, откройте /bulk заново"
+
+async def get_bulk_kind(callback: CallbackQuery, state: FSMContext) -> str | None:
+    """Вид открытой массовой обработки; если выбор устарел (закрыт, применен, истек), убирает кнопки"""
+    kind = (await state.get_data()).get('bulk_kind')
+    if kind in BULK_KINDS:
+        return kind
+    await callback.answer(BULK_EXPIRED_TEXT, show_alert=True)
+    try:
+        await callback.message.edit_reply_markup(reply_markup=None)
+    except TelegramBadRequest:
+        pass
+    return None
+
+async def remove_bulk_prompt_keyboard(message: Message, prompt_id: int | None):
+    """Убирает кнопки с сообщения-запроса суммы или комментария после ответа админа текстом"""
+    if prompt_id is None:
+        return
+    try:
+        await message.bot.edit_message_reply_markup(chat_id=message.chat.id, message_id=prompt_id, reply_markup=None)
+    except TelegramBadRequest:
+        pass
+
+async def get_bulk_items(kind: str, after_id: int) -> list[tuple[int, str]]:
+    """Получает заявки страницы массовой обработки (на одну больше размера страницы)"""
+    if kind == 'apps':
+        channels = await router.database.get_pending_channels_page(after_id, BULK_PAGE_SIZE + 1)
+        return [
+            (
+                channel['id'],
+                f"{PLATFORM_ICONS.get(channel['platform'], '🔗')} @{channel['username']} "
+                f"{channel['channel_name'] or channel['channel_link']}"
+            )
+            for channel in channels
+        ]
+
+    apps = await router.database.get_pending_paid_content_page(after_id, BULK_PAGE_SIZE + 1)
+    return [
+        (app['id'], f"{app['user_mention']} {app['content_type']} 👁 {app['views_count'] or 0:,}")
+        for app in apps
+    ]
+
+async def show_bulk_page(message: Message, state: FSMContext, edit: bool = True):
+    """Показывает страницу заявок с отметками выбранных"""
+    data = await state.get_data()
+    kind = data.get('bulk_kind')
+    if kind not in BULK_KINDS:
+        await message.answer(BULK_EXPIRED_TEXT)
+        return
+    selected = set(data.get('bulk_selected', []))
+    after_id = data.get('bulk_after', 0)
+    title, actions = BULK_KINDS[kind]
+
+    items = await get_bulk_items(kind, after_id)
+    has_next = len(items) > BULK_PAGE_SIZE
+    items = items[:BULK_PAGE_SIZE]
+
+    text = (
+        f"<b>{title}</b>\n\n"
+        f"Выбрано заявок: {len(selected)}\n"
+        "Отметьте заявки и выберите действие."
+    )
+    if not items:
+        text += "\n\n📝 Заявок в ожидании больше нет"
+
+    keyboard = [
+        [InlineKeyboardButton(
+            text=f"{'☑️' if item_id in selected else '⬜️'} #{item_id} {label}"[:64],
+            callback_data=f"bulk:toggle:{item_id}"
+        )]
+        for item_id, label in items
+    ]
+    keyboard.append([
+        InlineKeyboardButton(text="☑️ Выбрать страницу", callback_data="bulk:select_page"),
+        InlineKeyboardButton(text="✖️ Снять выбор", callback_data="bulk:clear")
+    ])
+
+    # Страницы листаются по курсору - id последней заявки страницы
+    nav_buttons = []
+    if after_id:
+        nav_buttons.append(InlineKeyboardButton(text="⏮ В начало", callback_data="bulk:page:0"))
+    if has_next:
+        nav_buttons.append(InlineKeyboardButton(text="▶️", callback_data=f"bulk:page:{items[-1][0]}"))
+    if nav_buttons:
+        keyboard.append(nav_buttons)
+
+    if selected:
+        keyboard.append([
+            InlineKeyboardButton(text=f"{label} ({len(selected)})", callback_data=f"bulk:do:{status}")
+            for status, label in actions.items()
+        ])
+    keyboard.append([InlineKeyboardButton(text="❌ Закрыть", callback_data="bulk:cancel")])
+
+    markup = InlineKeyboardMarkup(inline_keyboard=keyboard)
+    if not edit:
+        await message.answer(text, reply_markup=markup, parse_mode="HTML")
+        return
+    try:
+        await message.edit_text(text, reply_markup=markup, parse_mode="HTML")
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e):
+            raise
+
+# Команда для массовой обработки заявок
+@router.message(Command("bulk"), IsAdmin(), NoActiveState())
+async def start_bulk_review(message: Message, state: FSMContext, command: CommandObject):
+    """Открывает массовую обработку; /bulk <Telegram ID или @username> выбирает все заявки на оплату пользователя"""
+    if command.args:
+        user = command.args.strip()
+        pending_ids = await router.database.get_pending_paid_content_ids(
+            int(user) if user.isdigit() else user
+        )
+        if not pending_ids:
+            await message.answer(f"📝 У пользователя {user} нет заявок, ожидающих оплаты")
+            return
+        await state.update_data(bulk_kind='clips', bulk_selected=pending_ids, bulk_after=0)
+        await show_bulk_page(message, state, edit=False)
+        return
+
+    await message.answer(
+        "📦 <b>Массовая обработка</b>\n\nВыберите заявки для обработки:",
+        parse_mode="HTML",
+        reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text=title, callback_data=f"bulk:open:{kind}")]
+            for kind, (title, _) in BULK_KINDS.items()
+        ])
+    )
+
+@router.callback_query(Callback.prefix("bulk:open:"))
+async def open_bulk_review(callback: CallbackQuery, state: FSMContext):
+    kind = callback.data.split(":")[2]
+    if kind not in BULK_KINDS:
+        await callback.answer()
+        return
+    await state.update_data(bulk_kind=kind, bulk_selected=[], bulk_after=0)
+    await show_bulk_page(callback.message, state)
+    await callback.answer()
+
+@router.callback_query(Callback.prefix("bulk:toggle:"))
+async def toggle_bulk_item(callback: CallbackQuery, state: FSMContext):
+    if await get_bulk_kind(callback, state) is None:
+        return
+    item_id = int(callback.data.split(":")[2])
+    selected = (await state.get_data()).get('bulk_selected', [])
+    if item_id in selected:
+        selected.remove(item_id)
+    else:
+        selected.append(item_id)
+    await state.update_data(bulk_selected=selected)
+    await show_bulk_page(callback.message, state)
+    await callback.answer()
+
+@router.callback_query(Callback("bulk:select_page"))
+async def select_bulk_page(callback: CallbackQuery, state: FSMContext):
+    kind = await get_bulk_kind(callback, state)
+    if kind is None:
+        return
+    data = await state.get_data()
+    items = await get_bulk_items(kind, data.get('bulk_after', 0))
+    selected = data.get('bulk_selected', [])
+    selected.extend(item_id for item_id, _ in items[:BULK_PAGE_SIZE] if item_id not in selected)
+    await state.update_data(bulk_selected=selected)
+    await show_bulk_page(callback.message, state)
+    await callback.answer()
+
+@router.callback_query(Callback("bulk:clear"))
+async def clear_bulk_selection(callback: CallbackQuery, state: FSMContext):
+    if await get_bulk_kind(callback, state) is None:
+        return
+    await state.update_data(bulk_selected=[])
+    await show_bulk_page(callback.message, state)
+    await callback.answer()
+
+@router.callback_query(Callback.prefix("bulk:page:"))
+async def bulk_review_page(callback: CallbackQuery, state: FSMContext):
+    if await get_bulk_kind(callback, state) is None:
+        return
+    await state.update_data(bulk_after=int(callback.data.split(":")[2]))
+    await show_bulk_page(callback.message, state)
+    await callback.answer()
+
+@router.callback_query(Callback("bulk:cancel"))
+async def close_bulk_review(callback: CallbackQuery, state: FSMContext):
+    await state.clear()
+    await callback.message.edit_text("📦 Массовая обработка закрыта")
+
+@router.callback_query(Callback("bulk:back"))
+async def back_to_bulk_selection(callback: CallbackQuery, state: FSMContext):
+    if await get_bulk_kind(callback, state) is None:
+        return
+    # Выбор сохраняется в данных FSM, сбрасываем только ожидание суммы или комментария
+    await state.set_state(None)
+    await state.update_data(bulk_amount=None, bulk_prompt_id=None)
+    await show_bulk_page(callback.message, state)
+    await callback.answer()
+
+BULK_COMMENT_KEYBOARD = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="➡️ Без комментария", callback_data="bulk:nocomment")],
+    [InlineKeyboardButton(text="◀️ К выбору", callback_data="bulk:back")]
+])
+
+@router.callback_query(Callback.prefix("bulk:do:"))
+async def ask_bulk_comment(callback: CallbackQuery, state: FSMContext):
+    """Запрашивает комментарий к выбранным заявкам"""
+    kind = await get_bulk_kind(callback, state)
+    if kind is None:
+        return
+    status = callback.data.split(":")[2]
+    data = await state.get_data()
+    actions = BULK_KINDS[kind][1]
+    if status not in actions or not data.get('bulk_selected'):
+        await callback.answer("Сначала выберите заявки")
+        return
+
+    await state.update_data(bulk_action=status, bulk_amount=None, bulk_prompt_id=callback.message.message_id)
+    if kind == 'clips' and status == 'paid':
+        # Без суммы оплаченные заявки попали бы в выгрузку /export для бухгалтерии пустыми
+        await state.set_state(AdminStates.waiting_for_bulk_amount)
+        await callback.message.edit_text(
+            f"{actions[status]}: {len(data['bulk_selected'])} заявок\n\n"
+            "✍️ Укажите сумму выплаты за одну заявку в рублях (одна для всех выбранных).\n"
+            "Конечными просмотрами станут просмотры, указанные в заявках. "
+            "Если суммы разные, обработайте заявки отдельными группами.",
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="◀️ К выбору", callback_data="bulk:back")]
+            ])
+        )
+        await callback.answer()
+        return
+
+    await state.set_state(AdminStates.waiting_for_bulk_comment)
+    await callback.message.edit_text(
+        f"{actions[status]}: {len(data['bulk_selected'])} заявок\n\n"
+        "✍️ Укажите комментарий (его получат авторы заявок):",
+        reply_markup=BULK_COMMENT_KEYBOARD
+    )
+    await callback.answer()
+
+@router.message(AdminStates.waiting_for_bulk_amount)
+async def process_bulk_amount(message: Message, state: FSMContext):
+    """Принимает сумму выплаты за заявку и запрашивает комментарий"""
+    try:
+        amount = round(float((message.text or "").replace(" ", "").replace(",", ".")), 2)
+    except ValueError:
+        amount = 0
+    if not 0 < amount < float('inf'):
+        await message.answer("❌ Введите сумму числом больше нуля, например 1500 или 1500.50")
+        return
+
+    data = await state.get_data()
+    await remove_bulk_prompt_keyboard(message, data.get('bulk_prompt_id'))
+    await state.set_state(AdminStates.waiting_for_bulk_comment)
+    prompt = await message.answer(
+        f"💰 Сумма за заявку: {amount:,.2f} ₽, заявок: {len(data.get('bulk_selected', []))}\n\n"
+        "✍️ Укажите комментарий (его получат авторы заявок):",
+        reply_markup=BULK_COMMENT_KEYBOARD
+    )
+    await state.update_data(bulk_amount=amount, bulk_prompt_id=prompt.message_id)
+
+def build_review_notifications(kind: str, status: str, items: list[dict], comment: str = None) -> dict[int, str]:
+    """Собирает по одному уведомлению на автора со списком его обработанных заявок"""
+    headers = {
+        ('apps', 'approved'): "✅ Ваши заявки на сотрудничество одобрены:",
+        ('apps', 'rejected'): "❌ Ваши заявки на сотрудничество отклонены:",
+        ('clips', 'paid'): "💰 Ваши заявки на оплату контента оплачены:",
+        ('clips', 'rejected'): "❌ Ваши заявки на оплату контента отклонены:"
+    }
+
+    lines_by_user = {}
+    for item in items:
+        if kind == 'apps':
+            user_id = item['telegram_id']
+            line = f"• {item['platform']}: {item['channel_name'] or item['channel_link']}"
+        else:
+            user_id = item['user_id']
+            line = f"• {item['link']}"
+            if item.get('payment_amount') is not None:
+                line += f" - {item['payment_amount']:,.2f} ₽"
+        lines_by_user.setdefault(user_id, []).append(line)
+
+    footer = f"\n\n💬 Комментарий: {comment}" if comment else ""
+    return {
+        user_id: headers[(kind, status)] + "\n" + "\n".join(lines) + footer
+        for user_id, lines in lines_by_user.items()
+    }
+
+async def apply_bulk_action(message: Message, state: FSMContext, comment: str = None):
+    """Применяет выбранное действие ко всем отмеченным заявкам одной транзакцией"""
+    data = await state.get_data()
+    kind = data.get('bulk_kind')
+    status = data.get('bulk_action')
+    selected = data.get('bulk_selected', [])
+    amount = data.get('bulk_amount')
+    await state.clear()
+    if kind not in BULK_KINDS or status not in BULK_KINDS[kind][1] or not selected:
+        await message.answer(BULK_EXPIRED_TEXT)
+        return
+    if kind == 'clips' and status == 'paid' and amount is None:
+        await message.answer(BULK_EXPIRED_TEXT)
+        return
+
+    try:
+        if kind == 'apps':
+            items = await router.database.bulk_update_channel_status(selected, status, comment)
+        else:
+            items = await router.database.bulk_update_paid_content_status(
+                selected, status, comment, payment_amount=amount if status == 'paid' else None
+            )
+    except DatabaseError:
+        await message.answer("❌ Ошибка при обработке заявок, изменения не сохранены")
+        return
+
+    # Уведомления уходят в фоне через планировщик исходящих сообщений
+    notifications = build_review_notifications(kind, status, items, comment)
+    notify_in_background(message.bot, notifications)
+
+    skipped = len(selected) - len(items)
+    text = (
+        f"{BULK_KINDS[kind][1][status]}: обработано заявок {len(items)}\n"
+        f"📨 Уведомлений авторам: {len(notifications)}"
+    )
+    if skipped:
+        text += f"\n⚠️ Пропущено {skipped} (уже обработаны ранее)"
+    await message.answer(text)
+
+@router.message(AdminStates.waiting_for_bulk_comment)
+async def process_bulk_comment(message: Message, state: FSMContext):
+    prompt_id = (await state.get_data()).get('bulk_prompt_id')
+    await apply_bulk_action(message, state, message.text)
+    await remove_bulk_prompt_keyboard(message, prompt_id)
+
+@router.callback_query(Callback("bulk:nocomment"))
+async def process_bulk_without_comment(callback: CallbackQuery, state: FSMContext):
+    if await get_bulk_kind(callback, state) is None:
+        return
+    await callback.message.edit_reply_markup(reply_markup=None)
+    await apply_bulk_action(callback.message, state)
+    await callback.answer()
+
+# ... остальные обработчики для админки 
+# Виды результатов поиска /find
+FIND_KINDS = {
+    'channel': "🤝 Сотрудничество",
+    'paid_content': "💰 Оплата",
+    'user': "👤 Пользователь"
+}
+
+def format_snippet(snippet: str) -> str:
+    """Экранирует найденный фрагмент для HTML и выделяет совпадения жирным"""
+    return (
+        html.escape(snippet or "")
+        .replace(HIGHLIGHT_START, "<b>")
+        .replace(HIGHLIGHT_END, "</b>")
+    )
+
+async def show_find_page(message: Message, state: FSMContext, offset: int = 0, edit: bool = True):
+    """Показывает страницу результатов поиска"""
+    text = (await state.get_data()).get('find_query')
+    if not text:
+        await message.answer("❌ Поиск устарел, повторите /find")
+        return
+
+    # Запрашиваем на один результат больше, чтобы понять, есть ли следующая страница
+    try:
+        results = await router.database.search(text, offset, FIND_PAGE_SIZE + 1)
+    except DatabaseError:
+        await message.answer("❌ Ошибка при поиске, попробуйте позже")
+        return
+    if results is None:
+        await message.answer(f"❌ Слишком короткий запрос: нужно слово хотя бы из {MIN_TRIGRAM_TERM} символов")
+        return
+
+    has_next = len(results) > FIND_PAGE_SIZE
+    results = results[:FIND_PAGE_SIZE]
+
+    lines = [f"🔎 <b>Поиск:</b> {html.escape(text)}"]
+    if not results:
+        lines.append("\n📝 Ничего не найдено")
+    for number, result in enumerate(results, start=offset + 1):
+        username = result['username'] or f"id{result['telegram_id']}"
+        details = " · ".join(
+            html.escape(str(value)) for value in (result['platform'], result['status']) if value
+        )
+        lines.append(
+            f"\n{number}. {FIND_KINDS[result['kind']]} #{result['id']} @{html.escape(username)}"
+            + (f" · {details}" if details else "")
+            + f"\n└ {format_snippet(result['snippet'])}"
+        )
+
+    nav_buttons = []
+    if offset:
+        nav_buttons.append(InlineKeyboardButton(
+            text="◀️", callback_data=f"find:page:{max(0, offset - FIND_PAGE_SIZE)}"
+        ))
+    if has_next:
+        nav_buttons.append(InlineKeyboardButton(
+            text="▶️", callback_data=f"find:page:{offset + FIND_PAGE_SIZE}"
+        ))
+    markup = InlineKeyboardMarkup(inline_keyboard=[nav_buttons]) if nav_buttons else None
+
+    page = "\n".join(lines)
+    if not edit:
+        await message.answer(page, reply_markup=markup, parse_mode="HTML", disable_web_page_preview=True)
+        return
+    try:
+        await message.edit_text(page, reply_markup=markup, parse_mode="HTML", disable_web_page_preview=True)
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e):
+            raise
+
+# Команда для поиска заявок и пользователей
+@router.message(Command("find"), IsAdmin(), NoActiveState())
+async def find(message: Message, state: FSMContext, command: CommandObject):
+    """Ищет заявки и пользователей по части username, промокода, ссылки или комментария: /find <текст>"""
+    if not command.args or not command.args.strip():
+        await message.answer(
+            "🔎 Использование: /find <текст>\n"
+            "Ищет по username, промокоду, ссылке, названию канала, примечанию и комментарию"
+        )
+        return
+    # Запрос хранится в данных FSM: в callback_data он может не поместиться
+    await state.update_data(find_query=command.args.strip())
+    await show_find_page(message, state, edit=False)
+
+@router.callback_query(Callback.prefix("find:page:"))
+async def find_page(callback: CallbackQuery, state: FSMContext):
+    await show_find_page(callback.message, state, int(callback.data.split(":")[2]))
+    await callback.answer()
+
+# Виды выгрузок /export
+EXPORT_KINDS = {
+    'clips': "заявки на оплату контента",
+    'payments': "выплаты по каналам"
+}
+EXPORT_STATUSES = ('pending', 'approved', 'rejected', 'paid')
+EXPORT_USAGE = (
+    "📤 Использование: /export clips|payments [csv|xlsx] [статус] [ДД.ММ.ГГГГ-ДД.ММ.ГГГГ]\n\n"
+    "• clips - заявки на оплату контента, payments - выплаты по каналам\n"
+    f"• статус: {', '.join(EXPORT_STATUSES)}\n"
+    "• период по дате создания, можно указать один день\n\n"
+    "Пример: /export clips xlsx paid 01.05.2024-31.05.2024"
+)
+
+_EXPORT_PERIOD = re.compile(r'^(\d{2}\.\d{2}\.\d{4})(?:-(\d{2}\.\d{2}\.\d{4}))?$')
+
+def parse_export_args(args: str) -> dict:
+    """Разбирает аргументы /export (порядок после вида выгрузки любой); ValueError - неверные аргументы"""
+    words = args.lower().split()
+    if not words or words[0] not in EXPORT_KINDS:
+        raise ValueError("укажите вид выгрузки: clips или payments")
+
+    options = {'kind': words[0], 'file_format': 'csv', 'status': None, 'date_from': None, 'date_to': None}
+    for word in words[1:]:
+        period = _EXPORT_PERIOD.match(word)
+        if word in EXPORT_FORMATS:
+            options['file_format'] = word
+        elif word in EXPORT_STATUSES:
+            options['status'] = word
+        elif period:
+            try:
+                options['date_from'] = datetime.strptime(period.group(1), '%d.%m.%Y').date()
+                options['date_to'] = datetime.strptime(period.group(2) or period.group(1), '%d.%m.%Y').date()
+            except ValueError:
+                raise ValueError(f"неверная дата: {word}")
+            if options['date_from'] > options['date_to']:
+                raise ValueError("начало периода позже конца")
+        else:
+            raise ValueError(f"непонятный параметр: {word}")
+    return options
+
+# Команда для выгрузки заявок и выплат в файл
+@router.message(Command("export"), IsAdmin(), NoActiveState())
+async def export_data(message: Message, command: CommandObject):
+    """Выгружает заявки на оплату или выплаты в CSV/XLSX и отправляет файл"""
+    try:
+        options = parse_export_args(command.args or "")
+    except ValueError as e:
+        await message.answer(f"❌ Ошибка: {e}\n\n{EXPORT_USAGE}")
+        return
+
+    kind, file_format = options['kind'], options['file_format']
+    await message.answer(f"⏳ Готовлю выгрузку: {EXPORT_KINDS[kind]}...")
+
+    fd, path = tempfile.mkstemp(prefix=f"export_{kind}_", suffix=f".{file_format}")
+    os.close(fd)
+    try:
+        count = await export_rows(path, file_format, router.database.iter_export_rows(
+            kind, options['status'], options['date_from'], options['date_to']
+        ))
+        if not count:
+            await message.answer("📝 Нет данных для выгрузки с такими условиями")
+            return
+
+        size = os.path.getsize(path)
+        if size > EXPORT_MAX_FILE_SIZE:
+            await message.answer(
+                f"❌ Файл слишком большой для Telegram ({size / 1024 / 1024:.0f} МБ): "
+                "сузьте период или выберите формат xlsx (он сжат)"
+            )
+            return
+
+        period = ""
+        if options['date_from']:
+            period = f"_{options['date_from']:%Y%m%d}-{options['date_to']:%Y%m%d}"
+        await message.answer_document(
+            FSInputFile(path, filename=f"{kind}{period}_{date.today():%Y%m%d}.{file_format}"),
+            caption=f"📤 {EXPORT_KINDS[kind].capitalize()}: {count:,} строк"
+        )
+        logger.info(f"Admin {message.from_user.id} exported {count} rows of {kind} ({file_format})")
+    except DatabaseError:
+        await message.answer("❌ Ошибка при выгрузке, попробуйте позже")
+    finally:
+        os.remove(path)
@@ -4,6 +4,7 @@ from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeybo
 from aiogram.fsm.context import FSMContext
 from database.database import Database
 from keyboards.keyboards import get_main_keyboard
+from keyboards.screens import show_screen
 from config.messages import (
     START_MESSAGE,
     ABOUT_BOT_MESSAGE,
@@ -15,6 +16,8 @@ from aiogram.fsm.state import State, StatesGroup
 from .paid_content_handlers import show_paid_content_menu, back_to_start_callback
 import re
 from database.database import DatabaseError
+from utils.link_classifier import classify
+from utils.callback_router import Callback
 import logging
 
 logger = logging.getLogger(__name__)
@@ -72,8 +75,7 @@ router.database = None  # Будет установлено в main.py
 async def cmd_start(message: types.Message):
     # Проверяем, является ли пользователь одобренным блогером
     user_id = message.from_user.id
-    username = message.from_user.username or str(user_id)
-    is_approved = await router.database.is_approved_blogger(username)
+    is_approved = await router.database.is_approved_blogger(user_id)
     
     # Создаем обычную клавиатуру
     keyboard_buttons = [
@@ -185,12 +187,11 @@ async def test_all_emoji(message: types.Message):
 
 @router.message(F.text == "Контент на оплату")
 async def paid_content_text(message: types.Message):
-    # Получаем ID и username пользователя
+    # Получаем ID пользователя
     user_id = message.from_user.id
-    username = message.from_user.username or str(user_id)
     
     # Проверяем, является ли пользователь одобренным блогером
-    is_approved = await router.database.is_approved_blogger(username)
+    is_approved = await router.database.is_approved_blogger(user_id)
     
     if not is_approved:
         # Если пользователь не одобрен, показываем сообщение о необходимости подать заявку
@@ -240,51 +241,24 @@ async def paid_content_text(message: types.Message):
     
     await message.answer(text, reply_markup=keyboard, parse_mode="HTML", disable_web_page_preview=True)
 
+# Виды ссылок на канал, которые принимаются для каждой платформы ("other" - любая ссылка)
+PLATFORM_CHANNEL_LINKS = {
+    "youtube": {("youtube", "channel")},
+    "shorts": {("youtube", "channel")},
+    "tiktok": {("tiktok", "profile")},
+    "twitch": {("twitch", "channel")},
+}
+
 def is_valid_platform_link(platform: str, link: str) -> bool:
     """Проверяет валидность ссылки в зависимости от платформы."""
-    patterns = {
-        "youtube": (
-            # Поддерживаем форматы:
-            # https://youtube.com/@username
-            # https://youtube.com/channel/ID
-            # С www. или без, с http:// или https://
-            r'https?://(?:www\.)?youtube\.com/'
-            r'(?:'
-            r'@[\w-]{3,}/?$|'  # username формат (минимум 3 символа)
-            r'channel/[\w-]{24}/?$'  # channel ID формат (24 символа)
-            r')'
-        ),
-        "shorts": (
-            # Такой же паттерн как для YouTube
-            r'https?://(?:www\.)?youtube\.com/'
-            r'(?:'
-            r'@[\w-]{3,}/?$|'
-            r'channel/[\w-]{24}/?$'
-            r')'
-        ),
-        "tiktok": (
-            # Поддерживаем формат:
-            # https://tiktok.com/@username
-            # С www. или без, с http:// или https://
-            r'https?://(?:www\.)?tiktok\.com/@[\w.]{2,}/?$'
-        ),
-        "twitch": (
-            # Поддерживаем формат:
-            # https://twitch.tv/username
-            # С www. или без, с http:// или https://
-            r'https?://(?:www\.)?twitch\.tv/[\w-]{4,}/?$'
-        ),
-        "other": (
-            # Любой валидный URL
-            r'https?://\S+'
-        )
-    }
-    
-    pattern = patterns.get(platform.lower(), patterns["other"])
-    return bool(re.match(pattern, link))
+    info = classify(link)
+    if info is None:
+        return False
+    accepted = PLATFORM_CHANNEL_LINKS.get(platform.lower())
+    return accepted is None or (info.platform, info.kind) in accepted
 
 # Обработчики для кнопок
-@router.callback_query(F.data == "apply_collab")
+@router.callback_query(Callback("apply_collab"))
 async def start_collaboration(callback: types.CallbackQuery, state: FSMContext):
     # Используем edit_text для первого сообщения
     await state.set_state(CollaborationStates.waiting_for_platform)
@@ -303,7 +277,7 @@ async def start_collaboration(callback: types.CallbackQuery, state: FSMContext):
         reply_markup=keyboard
     )
 
-@router.callback_query(F.data.startswith("platform_"))
+@router.callback_query(Callback.prefix("platform_"))
 async def process_platform(callback: types.CallbackQuery, state: FSMContext):
     # Удаляем предыдущее сообщение с выбором платформы
     await callback.message.delete()
@@ -655,120 +629,23 @@ async def process_promo(message: types.Message, state: FSMContext):
         )
 
 # Добавляем новые обработчики для инлайн-кнопок
-@router.callback_query(lambda c: c.data == "about")
+@router.callback_query(Callback("about"))
 async def about_bot_callback(callback: types.CallbackQuery):
-    # Проверяем, является ли пользователь одобренным блогером
-    user_id = callback.from_user.id
-    username = callback.from_user.username or str(user_id)
-    is_approved = await router.database.is_approved_blogger(username)
-    
-    # Создаем кнопки в зависимости от статуса пользователя
-    buttons = [[InlineKeyboardButton(text="🤝 Сотрудничество", callback_data="collaboration")]]
-    
-    # Добавляем кнопку "Назад"
-    buttons.append([InlineKeyboardButton(text="◀️ Назад", callback_data="back_to_start")])
-    
-    keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
-    
-    await callback.message.edit_text(
-        ABOUT_BOT_MESSAGE,
-        reply_markup=keyboard,
-        parse_mode="HTML",
-        disable_web_page_preview=True
-    )
+    await show_screen(callback.message, 'about')
 
-@router.callback_query(lambda c: c.data == "collaboration")
+@router.callback_query(Callback("collaboration"))
 async def collaboration_callback(callback: types.CallbackQuery):
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [
-            InlineKeyboardButton(text="📝 Подать заявку", callback_data="apply_collab"),
-            InlineKeyboardButton(text="📋 Требования", callback_data="collab_requirements")
-        ],
-        [
-            InlineKeyboardButton(text="❓ FAQ", callback_data="collab_faq"),
-            InlineKeyboardButton(text="◀️ Назад", callback_data="back_to_start")
-        ]
-    ])
-    
-    await callback.message.edit_text(
-        "💎 Информация о сотрудничестве:\n\n"
-        "- Условия сотрудничества\n"
-        "- Требования к контенту\n"
-        "- Контактные данные\n\n"
-        "Для получения дополнительной информации, пожалуйста,\n"
-        "свяжитесь с администратором.",
-        reply_markup=keyboard,
-        parse_mode="HTML"
-    )
+    await show_screen(callback.message, 'collaboration')
 
-@router.callback_query(lambda c: c.data == "collab_requirements")
+@router.callback_query(Callback("collab_requirements"))
 async def show_requirements(callback: types.CallbackQuery):
-    requirements_text = (
-        "📋 <b>Требования для сотрудничества:</b>\n\n"
-        "🎥 <b>YouTube:</b>\n"
-        "• От 1000 просмотров в среднем на Rust-контенте\n"
-        "• Регулярные выпуски видео\n"
-        "• Качественный монтаж и звук\n\n"
-        "📱 <b>Shorts/TikTok:</b>\n"
-        "• От 3000 просмотров на видео по Rust\n"
-        "• Активная публикация контента\n"
-        "• Креативный подход к съемке\n\n"
-        "🎮 <b>Twitch:</b>\n"
-        "• Стабильно 20+ зрителей на стриме\n"
-        "• Регулярные стримы по Rust\n"
-        "• Взаимодействие с аудиторией\n\n"
-        "🌐 <b>Другие площадки:</b>\n"
-        "• Обсуждаются индивидуально\n"
-        "• Важен охват и вовлеченность аудитории"
-    )
-    
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="📝 Подать заявку", callback_data="apply_collab")],
-        [InlineKeyboardButton(text="◀️ Назад", callback_data="collaboration")]
-    ])
-    
-    await callback.message.edit_text(
-        requirements_text,
-        reply_markup=keyboard,
-        parse_mode="HTML",
-        disable_web_page_preview=True
-    )
+    await show_screen(callback.message, 'collab_requirements')
 
-@router.callback_query(lambda c: c.data == "collab_faq")
+@router.callback_query(Callback("collab_faq"))
 async def show_faq(callback: types.CallbackQuery):
-    faq_text = (
-        "❓ <b>Часто задаваемые вопросы:</b>\n\n"
-        "1️⃣ <b>Как часто нужно выпускать контент?</b>\n"
-        "• Минимум 2-3 видео/стрима в месяц\n"
-        "• Для Shorts/TikTok желательно 2-3 видео в неделю\n\n"
-        "2️⃣ <b>Какие требования к баннеру/интеграции?</b>\n"
-        "• Баннер должен быть хорошо виден\n"
-        "• Не должен перекрываться интерфейсом\n"
-        "• Минимальное время показа - 8 секунд\n\n"
-        "3️⃣ <b>Как происходит оплата?</b>\n"
-        "• Индивидуальные условия\n"
-        "• Зависит от охвата и качества контента\n"
-        "• Обсуждается после одобрения заявки\n\n"
-        "4️⃣ <b>Можно ли совмещать с другими проектами?</b>\n"
-        "• Да, если это не конкурирующие проекты\n"
-        "• Обсуждается индивидуально"
-    )
-    
-    keyboard = InlineKeyboardButton(text="📝 Подать заявку", callback_data="apply_collab")
-    inline_buttons = [
-        [InlineKeyboardButton(text="◀️ Назад", callback_data="collaboration")],
-        [keyboard]
-    ]
-    keyboard = InlineKeyboardMarkup(inline_keyboard=inline_buttons)
-    
-    await callback.message.edit_text(
-        faq_text,
-        reply_markup=keyboard,
-        parse_mode="HTML",
-        disable_web_page_preview=True
-    )
+    await show_screen(callback.message, 'collab_faq')
 
-@router.callback_query(F.data == "cancel_application")
+@router.callback_query(Callback("cancel_application"))
 async def cancel_application(callback: types.CallbackQuery, state: FSMContext):
     # Очищаем состояние пользователя
     await state.clear()
@@ -790,7 +667,7 @@ async def cancel_application(callback: types.CallbackQuery, state: FSMContext):
         disable_web_page_preview=True
     )
 
-@router.callback_query(F.data == "platform_twitch")
+@router.callback_query(Callback("platform_twitch"))
 async def process_twitch_platform(callback: types.CallbackQuery, state: FSMContext):
     await state.update_data(platform="twitch")
     await state.set_state(CollaborationStates.waiting_for_link)
@@ -872,7 +749,7 @@ async def process_twitch_viewers(message: types.Message, state: FSMContext):
             ])
         )
 
-@router.callback_query(F.data == "finish_application")
+@router.callback_query(Callback("finish_application"))
 async def finish_application(callback: types.CallbackQuery, state: FSMContext):
     """Обработчик для завершения подачи заявки"""
     data = await state.get_data()
@@ -895,6 +772,25 @@ async def finish_application(callback: types.CallbackQuery, state: FSMContext):
             promo_code=data['promo_code']
         )
         
+        if channel_id is None:
+            # Канал успели зарегистрировать после проверки ссылки
+            await state.clear()
+            await callback.message.edit_text(
+                "❌ Этот канал уже зарегистрирован!\n\n"
+                "Если вы считаете, что произошла ошибка,\n"
+                "пожалуйста, обратитесь к администратору.",
+                reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+                    [InlineKeyboardButton(text="◀️ В меню", callback_data="back_to_start")]
+                ]),
+                disable_web_page_preview=True
+            )
+            await callback.answer()
+            return
+
+        if not channel_id:
+            await callback.answer("❌ Ошибка при сохранении заявки", show_alert=True)
+            return
+
         # Если это Twitch, сохраняем также количество зрителей
         if data['platform'].lower() == 'twitch' and 'current_viewers' in data:
             await router.database.update_channel_viewers(
@@ -902,10 +798,6 @@ async def finish_application(callback: types.CallbackQuery, state: FSMContext):
                 viewers_count=int(data['current_viewers'])
             )
         
-        if not channel_id:
-            await callback.answer("❌ Ошибка при сохранении заявки", show_alert=True)
-            return
-        
         # Очищаем состояние
         await state.clear()
         
@@ -5,7 +5,9 @@ from aiogram.fsm.context import FSMContext
 from datetime import datetime, timedelta
 from .states import PaidContentStates
 from config.messages import START_MESSAGE, PAID_CONTENT_MESSAGE
-import re
+from keyboards.screens import show_screen
+from utils.link_classifier import classify
+from utils.callback_router import Callback
 
 # Константы
 MIN_VIEWS = 1000  # Минимальное количество просмотров для подачи заявки
@@ -17,14 +19,13 @@ router = Router()
 router.database = None  # Будет установлено в main.py
 
 # Обработчик для кнопки "Контент на оплату"
-@router.callback_query(F.data == "paid_content")
+@router.callback_query(Callback("paid_content"))
 async def show_paid_content_menu(callback: CallbackQuery):
-    # Получаем ID и username пользователя
+    # Получаем ID пользователя
     user_id = callback.from_user.id
-    username = callback.from_user.username or str(user_id)
     
     # Проверяем, является ли пользователь одобренным блогером
-    is_approved = await router.database.is_approved_blogger(username)
+    is_approved = await router.database.is_approved_blogger(user_id)
     
     if not is_approved:
         # Создаем базовые кнопки для неавторизованного пользователя
@@ -46,84 +47,33 @@ async def show_paid_content_menu(callback: CallbackQuery):
     
     # Если пользователь авторизован, показываем меню контента на оплату
     stats = await router.database.get_user_applications_stats(user_id)
-    
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="📤 Подать заявку", callback_data="submit_paid_content")],
-        [InlineKeyboardButton(
-            text=f"📋 Мои заявки (💰 {stats['paid']} | ⏳ {stats['unpaid']})", 
-            callback_data="my_paid_content"
-        )],
-        [
-            InlineKeyboardButton(text="ℹ️ Для нарезчиков", callback_data="info_for_cutters"),
-            InlineKeyboardButton(text="📌 О функционале", callback_data="info_functionality")
-        ],
-        [
-            InlineKeyboardButton(text="🔍 Проверить баннер", callback_data="check_banner"),
-            InlineKeyboardButton(text="◀️ Назад", callback_data="back_to_start")
-        ]
-    ])
-    
-    text = (
-        "💰 <b>Раздел контента на оплату</b>\n\n"
-        "Здесь вы можете:\n"
-        "• Подать заявку на оплату контента\n"
-        "• Просмотреть статус ваших заявок\n"
-        "• Проверить баннер на соответствие требованиям\n"
-        "• Ознакомиться с правилами и условиями"
-    )
-    
-    await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML", disable_web_page_preview=True)
+    await show_screen(callback.message, 'paid_content', **stats)
 
 # Заглушки для кнопок (потом заменим на реальный функционал)
-@router.callback_query(F.data == "submit_paid_content")
+@router.callback_query(Callback("submit_paid_content"))
 async def submit_paid_content(callback: CallbackQuery):
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="YouTube", callback_data="submit_youtube")],
-        [InlineKeyboardButton(text="Shorts", callback_data="submit_shorts")],
-        [InlineKeyboardButton(text="TikTok", callback_data="submit_tiktok")],
-        [InlineKeyboardButton(text="Twitch", callback_data="submit_twitch")],
-        [InlineKeyboardButton(text="Другое", callback_data="submit_other")],
-        [InlineKeyboardButton(text="◀️ Назад", callback_data="paid_content")]
-    ])
-    
-    text = (
-        "📤 <b>Подача заявки на оплату контента</b>\n\n"
-        "Выберите платформу, на которой размещен контент:"
-    )
-    
-    await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML", disable_web_page_preview=True)
+    await show_screen(callback.message, 'submit_paid_content')
 
-@router.callback_query(F.data == "my_paid_content")
+@router.callback_query(Callback("my_paid_content"))
 async def my_paid_content(callback: CallbackQuery):
     """Показывает меню выбора категории заявок"""
     stats = await router.database.get_user_applications_stats(callback.from_user.id)
-    
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text=f"💰 Оплаченные ({stats['paid']})", callback_data="show_paid_apps")],
-        [InlineKeyboardButton(text=f"⏳ Ожидают оплаты ({stats['unpaid']})", callback_data="show_unpaid_apps")],
-        [InlineKeyboardButton(text="◀️ В меню", callback_data="paid_content")]
-    ])
-    
-    await callback.message.edit_text(
-        "📋 <b>Мои заявки</b>\n\n"
-        "Выберите категорию для просмотра:",
-        reply_markup=keyboard,
-        parse_mode="HTML",
-        disable_web_page_preview=True
-    )
+    await show_screen(callback.message, 'my_paid_content', **stats)
 
-@router.callback_query(F.data.in_(["show_paid_apps", "show_unpaid_apps"]))
+@router.callback_query(Callback("show_paid_apps", "show_unpaid_apps"))
 async def show_applications_by_status(callback: CallbackQuery, state: FSMContext):
     is_paid = callback.data == "show_paid_apps"
     status = "paid" if is_paid else "pending"
     
-    # Получаем заявки с фильтром по статусу
-    applications, total = await router.database.get_user_applications_by_status(
+    # Получаем самую новую заявку с фильтром по статусу
+    total = await router.database.count_user_applications(callback.from_user.id, status)
+    application = await router.database.get_user_application_by_cursor(
         user_id=callback.from_user.id,
-        status=status
-    )
+        status=status,
+        action="first"
+    ) if total else None
     
-    if not applications:
+    if not application:
         text = "💰 У вас пока нет оплаченных заявок." if is_paid else "⏳ У вас пока нет заявок в ожидании."
         await callback.message.edit_text(
             text,
@@ -137,7 +87,7 @@ async def show_applications_by_status(callback: CallbackQuery, state: FSMContext
 
     # Показываем первую заявку
     await state.update_data(current_index=0, status=status)
-    await show_application(callback.message, applications[0], 0, total, status)
+    await show_application(callback.message, application, 0, total, status)
 
 async def show_application(message: Message, app: dict, current_index: int, total: int, status: str):
     """Показывает одну заявку с расширенными кнопками навигации"""
@@ -173,24 +123,26 @@ async def show_application(message: Message, app: dict, current_index: int, tota
     )
     
     # Создаем расширенные кнопки навигации
+    # Формат callback_data: "show_app:действие:статус:id текущей заявки:новый индекс:всего"
+    cursor = f"{status}:{app['id']}"
     keyboard = []
     nav_row = []
     
     # Кнопка в начало списка
     if current_index > 0:
-        nav_row.append(InlineKeyboardButton(text="⏮", callback_data=f"show_app:0:{status}"))
+        nav_row.append(InlineKeyboardButton(text="⏮", callback_data=f"show_app:first:{cursor}:0:{total}"))
     
     # Кнопка назад
     if current_index > 0:
-        nav_row.append(InlineKeyboardButton(text="◀️", callback_data=f"show_app:{current_index-1}:{status}"))
+        nav_row.append(InlineKeyboardButton(text="◀️", callback_data=f"show_app:prev:{cursor}:{current_index-1}:{total}"))
     
     # Кнопка вперед
     if current_index < total - 1:
-        nav_row.append(InlineKeyboardButton(text="▶️", callback_data=f"show_app:{current_index+1}:{status}"))
+        nav_row.append(InlineKeyboardButton(text="▶️", callback_data=f"show_app:next:{cursor}:{current_index+1}:{total}"))
     
     # Кнопка в конец списка
     if current_index < total - 1:
-        nav_row.append(InlineKeyboardButton(text="⏭", callback_data=f"show_app:{total-1}:{status}"))
+        nav_row.append(InlineKeyboardButton(text="⏭", callback_data=f"show_app:last:{cursor}:{total-1}:{total}"))
     
     if nav_row:
         keyboard.append(nav_row)
@@ -207,30 +159,45 @@ async def show_application(message: Message, app: dict, current_index: int, tota
         disable_web_page_preview=True
     )
 
-@router.callback_query(F.data.startswith("show_app:"))
+@router.callback_query(Callback.prefix("show_app:"))
 async def handle_application_navigation(callback: CallbackQuery, state: FSMContext):
-    _, new_index, status = callback.data.split(":")
-    new_index = int(new_index)
+    # В чатах остаются кнопки старого формата "show_app:индекс:статус"
+    parts = callback.data.split(":")
+    if (
+        len(parts) != 6
+        or parts[1] not in ('first', 'prev', 'next', 'last')
+        or not all(part.isdigit() for part in parts[3:])
+    ):
+        await callback.answer("Список устарел, откройте его заново")
+        return
+    _, action, status, cursor_id, new_index, total = parts
+    new_index, total = int(new_index), int(total)
     
-    applications, total = await router.database.get_user_applications_by_status(
+    # Одна выборка по индексу относительно текущей заявки, без OFFSET и COUNT(*)
+    application = await router.database.get_user_application_by_cursor(
         user_id=callback.from_user.id,
-        status=status
+        status=status,
+        action=action,
+        cursor_id=int(cursor_id)
     )
     
-    if 0 <= new_index < total:
-        await state.update_data(current_index=new_index)
-        await show_application(callback.message, applications[new_index], new_index, total, status)
+    if not application:
+        await callback.answer("Заявка не найдена")
+        return
+    
+    await state.update_data(current_index=new_index)
+    await show_application(callback.message, application, new_index, total, status)
+    await callback.answer()
 
-@router.callback_query(F.data == "check_banner")
+@router.callback_query(Callback("check_banner"))
 async def check_banner(callback: CallbackQuery):
     await callback.answer("В разработке: Проверка баннера")
 
-@router.callback_query(F.data == "back_to_start")
+@router.callback_query(Callback("back_to_start"))
 async def back_to_start_callback(callback: CallbackQuery):
     # Проверяем, является ли пользователь одобренным блогером
     user_id = callback.from_user.id
-    username = callback.from_user.username or str(user_id)
-    is_approved = await router.database.is_approved_blogger(username)
+    is_approved = await router.database.is_approved_blogger(user_id)
     
     # Создаем список кнопок в зависимости от статуса пользователя
     inline_buttons = [
@@ -260,58 +227,13 @@ async def back_to_start_callback(callback: CallbackQuery):
             disable_web_page_preview=True
         )
 
-@router.callback_query(F.data == "info_for_cutters")
+@router.callback_query(Callback("info_for_cutters"))
 async def show_info_for_cutters(callback: CallbackQuery):
-    info_text = (
-        "📋 <b>Правила и условия оплаты контента</b>\n\n"
-        "⚠️ <b>ВАЖНО:</b> Расчеты за 16:9 ролики и стримы в индивидуальном порядке\n\n"
-        "🎬 <b>Технические требования к ролику:</b>\n"
-        "• Баннер должен быть размещен по центру, сверху или снизу\n"
-        "• Баннер не должен перекрываться интерфейсом приложения\n"
-        "• Минимальная длительность ролика: 8 секунд\n"
-        "• Запрещено удалять ролики в течение 3 месяцев\n\n"
-        "💰 <b>Система выплат:</b>\n"
-        "• Выплаты производятся при накоплении 500 000 просмотров\n"
-        "• Просмотры фиксируются на 14-й день после публикации\n"
-        "• Минимальное количество просмотров для подачи: 1000\n\n"
-        "📈 <b>Пример расчета просмотров:</b>\n"
-        "Дата публикации: 10.02.2025\n"
-        "Дата фиксации просмотров: 24.02.2025\n"
-        "<i>Просмотры после даты фиксации не учитываются</i>\n\n"
-        "⭐️ <b>Возможности увеличения CPM:</b>\n"
-        "• Мотивируйте зрителей использовать ВАШ промокод\n"
-        "• Мы отслеживаем статистику введенных промокодов\n"
-        "• CPM повышается для авторов с высокой конверсией промокодов"
-    )
-    
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="📤 Подать заявку", callback_data="submit_paid_content")],
-        [InlineKeyboardButton(text="◀️ Назад", callback_data="paid_content")]
-    ])
-    
-    await callback.message.edit_text(info_text, reply_markup=keyboard, parse_mode="HTML", disable_web_page_preview=True)
+    await show_screen(callback.message, 'info_for_cutters')
 
-@router.callback_query(F.data == "info_functionality")
+@router.callback_query(Callback("info_functionality"))
 async def show_functionality_info(callback: CallbackQuery):
-    functionality_text = (
-        "📌 <b>О функционале кнопок</b>\n\n"
-        "📤 <b>Подать заявку:</b>\n"
-        "• Прикрепление ссылки на шортс/видео/стрим\n"
-        "• Указание количества просмотров/прикрепление статистики\n"
-        "• Указание даты публикации\n\n"
-        "📋 <b>Мои заявки:</b>\n"
-        "• Просмотр списка ваших заявок\n"
-        "• Просмотр статуса заявки (оплачено/в ожидании)\n\n"
-        "🔍 <b>Проверить баннер:</b>\n"
-        "• Ссылка на ваш актуальный баннер\n"
-        "• По приходу рассылки о новом баннере, необходимо скачать баннер по ссылке"
-    )
-    
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="◀️ Назад", callback_data="paid_content")]
-    ])
-    
-    await callback.message.edit_text(functionality_text, reply_markup=keyboard, parse_mode="HTML", disable_web_page_preview=True)
+    await show_screen(callback.message, 'info_functionality')
 
 # Добавим общий обработчик отмены для всех состояний
 @router.message(Command("cancel"))
@@ -332,7 +254,7 @@ async def cancel_handler(message: Message, state: FSMContext):
     )
 
 # Обновим все обработчики состояний, добавив информацию о возможности отмены
-@router.callback_query(F.data == "submit_shorts")
+@router.callback_query(Callback("submit_shorts"))
 async def submit_shorts_content(callback: CallbackQuery, state: FSMContext):
     await state.set_state(PaidContentStates.waiting_for_link)
     await state.update_data(content_type='shorts')
@@ -352,7 +274,7 @@ async def submit_shorts_content(callback: CallbackQuery, state: FSMContext):
         disable_web_page_preview=True
     )
 
-@router.callback_query(F.data == "submit_tiktok")
+@router.callback_query(Callback("submit_tiktok"))
 async def submit_tiktok_content(callback: CallbackQuery, state: FSMContext):
     await state.set_state(PaidContentStates.waiting_for_link)
     await state.update_data(content_type='tiktok')
@@ -372,7 +294,7 @@ async def submit_tiktok_content(callback: CallbackQuery, state: FSMContext):
         disable_web_page_preview=True
     )
 
-@router.callback_query(F.data == "submit_twitch")
+@router.callback_query(Callback("submit_twitch"))
 async def submit_twitch_content(callback: CallbackQuery, state: FSMContext):
     await state.set_state(PaidContentStates.waiting_for_link)
     await state.update_data(content_type='stream')
@@ -392,7 +314,7 @@ async def submit_twitch_content(callback: CallbackQuery, state: FSMContext):
         disable_web_page_preview=True
     )
 
-@router.callback_query(F.data == "submit_other")
+@router.callback_query(Callback("submit_other"))
 async def submit_other_content(callback: CallbackQuery, state: FSMContext):
     await state.set_state(PaidContentStates.waiting_for_link)
     await state.update_data(content_type='other')
@@ -414,61 +336,39 @@ async def submit_other_content(callback: CallbackQuery, state: FSMContext):
         disable_web_page_preview=True
     )
 
+def is_link_of(link: str, *accepted: tuple[str, str]) -> bool:
+    """Проверяет, что ссылка относится к одному из видов (платформа, вид)"""
+    info = classify(link)
+    return info is not None and (info.platform, info.kind) in accepted
+
 def is_valid_link(link: str) -> bool:
     """Проверяет валидность ссылки на TikTok/YouTube Shorts."""
-    tiktok_pattern = r'https?://(?:www\.)?(?:vt\.)?tiktok\.com/\S+'
-    youtube_pattern = r'https?://(?:www\.)?youtube\.com/shorts/\S+'
-    
-    return bool(re.match(tiktok_pattern, link) or re.match(youtube_pattern, link))
+    return is_link_of(
+        link,
+        ("tiktok", "video"), ("tiktok", "live"), ("tiktok", "profile"), ("tiktok", "short_link"),
+        ("youtube", "shorts")
+    )
 
 def is_valid_twitch_link(link: str) -> bool:
     """Проверяет, является ли ссылка корректной ссылкой на Twitch."""
-    twitch_patterns = [
-        r'https?://(?:www\.)?twitch\.tv/[\w-]+/?',  # Для каналов
-        r'https?://(?:www\.)?twitch\.tv/videos/\d+/?'  # Для видео
-    ]
-    return any(bool(re.match(pattern, link)) for pattern in twitch_patterns)
+    return is_link_of(link, ("twitch", "channel"), ("twitch", "vod"))
 
 def is_valid_stream_link(link: str) -> bool:
     """Проверяет, является ли ссылка корректной ссылкой на стрим."""
-    patterns = [
-        # Twitch паттерны (только VOD)
-        r'https?://(?:www\.)?twitch\.tv/videos/\d+/?',       # Только записи стримов
-        # YouTube паттерны
-        r'https?://(?:www\.)?youtube\.com/watch\?v=[\w-]+',  # Обычные видео
-        r'https?://youtu\.be/[\w-]+',                        # Короткие ссылки
-        r'https?://(?:www\.)?youtube\.com/live/[\w-]+',      # Прямые ссылки на стрим
-        # TikTok паттерны
-        r'https?://(?:www\.|vm\.|vt\.)?tiktok\.com/@[\w.]+/live/?',  # Ссылки на live
-        r'https?://(?:www\.|vm\.|vt\.)?tiktok\.com/@[\w.]+/video/\d+' # Записи стримов
-    ]
-    return any(bool(re.match(pattern, link)) for pattern in patterns)
+    return is_link_of(
+        link,
+        ("twitch", "vod"),                              # Только записи стримов
+        ("youtube", "video"), ("youtube", "live"),      # Видео и прямые ссылки на стрим
+        ("tiktok", "live"), ("tiktok", "video")         # Эфиры и записи стримов
+    )
 
 def is_valid_youtube_video_link(link: str) -> bool:
     """Проверяет, является ли ссылка корректной ссылкой на YouTube видео."""
-    patterns = [
-        r'https?://(?:www\.)?youtube\.com/watch\?v=[\w-]+',  # Стандартная ссылка
-        r'https?://youtu\.be/[\w-]+',                        # Короткая ссылка
-        r'https?://(?:www\.)?youtube\.com/v/[\w-]+',         # Альтернативный формат
-    ]
-    return any(bool(re.match(pattern, link)) for pattern in patterns)
+    return is_link_of(link, ("youtube", "video"))
 
 def is_valid_screenshot_link(link: str) -> bool:
     """Проверяет, является ли ссылка корректной ссылкой на скриншот."""
-    image_hosting_patterns = [
-        # PostImage
-        r'https?://(?:www\.)?postimg\.cc/\w+',
-        r'https?://(?:www\.)?i\.postimg\.cc/\w+/[\w-]+\.(?:jpg|jpeg|png|gif)',
-        # ImgBB
-        r'https?://(?:www\.)?ibb\.co/\w+',
-        r'https?://(?:www\.)?i\.ibb\.co/\w+/[\w-]+\.(?:jpg|jpeg|png|gif)',
-        # PostImages
-        r'https?://(?:www\.)?postimages\.org/\w+',
-        r'https?://(?:www\.)?i\.postimages\.org/\w+/[\w-]+\.(?:jpg|jpeg|png|gif)',
-        # Прямые ссылки на изображения
-        r'https?://\S+\.(?:jpg|jpeg|png|gif)$'
-    ]
-    return any(bool(re.match(pattern, link, re.IGNORECASE)) for pattern in image_hosting_patterns)
+    return is_link_of(link, ("image", "screenshot"))
 
 @router.message(PaidContentStates.waiting_for_link)
 async def process_link(message: Message, state: FSMContext):
@@ -497,6 +397,21 @@ async def process_link(message: Message, state: FSMContext):
         )
         return
 
+    # Одну публикацию нельзя подать на оплату дважды (в любом написании ссылки)
+    if await router.database.find_paid_content_duplicate(message.text):
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="📋 Мои заявки", callback_data="my_paid_content")],
+            [InlineKeyboardButton(text="❌ Отменить", callback_data="cancel_application")]
+        ])
+        
+        await message.answer(
+            "❌ На эту публикацию уже подана заявка\n\n"
+            "❗️ Отправьте ссылку на другую публикацию",
+            reply_markup=keyboard,
+            disable_web_page_preview=True
+        )
+        return
+
     # Для стримов проверяем ссылки на все поддерживаемые платформы
     if content_type == 'stream':
         if not is_valid_stream_link(message.text):
@@ -547,14 +462,8 @@ async def process_link(message: Message, state: FSMContext):
             disable_web_page_preview=True
         )
     elif content_type == 'shorts':
-        # Проверяем, не является ли это ссылкой на профиль TikTok
-        tiktok_profile_patterns = [
-            r'https?://(?:www\.|vm\.|vt\.)?tiktok\.com/@[\w.]+/?$',  # Формат @username
-            r'https?://(?:www\.|vm\.|vt\.)?tiktok\.com/[\w.]+/?$',   # Короткий формат
-        ]
-        
-        # Если это ссылка на профиль - отклоняем
-        if any(bool(re.match(pattern, message.text)) for pattern in tiktok_profile_patterns):
+        # Если это ссылка на профиль TikTok (@username или короткий формат) - отклоняем
+        if is_link_of(message.text, ("tiktok", "profile"), ("tiktok", "short_link")):
             keyboard = InlineKeyboardMarkup(inline_keyboard=[
                 [InlineKeyboardButton(text="◀️ Назад", callback_data=f"submit_{content_type}")],
                 [InlineKeyboardButton(text="❌ Отменить", callback_data="cancel_application")]
@@ -571,14 +480,8 @@ async def process_link(message: Message, state: FSMContext):
             )
             return
         
-        # Проверяем, является ли это корректной ссылкой на видео
-        tiktok_video_patterns = [
-            r'https?://(?:www\.|vm\.|vt\.)?tiktok\.com/@[\w.]+/video/\d+',  # Полный формат видео
-            r'https?://(?:www\.|vm\.|vt\.)?tiktok\.com/v/\d+',              # Короткий формат видео
-            r'https?://(?:www\.)?youtube\.com/shorts/[\w-]+'                 # YouTube Shorts
-        ]
-        
-        if not any(bool(re.match(pattern, message.text)) for pattern in tiktok_video_patterns):
+        # Проверяем, является ли это корректной ссылкой на видео TikTok или YouTube Shorts
+        if not is_link_of(message.text, ("tiktok", "video"), ("youtube", "shorts")):
             keyboard = InlineKeyboardMarkup(inline_keyboard=[
                 [InlineKeyboardButton(text="❌ Отменить", callback_data="cancel_application")]
             ])
@@ -918,7 +821,7 @@ async def process_video_note(message: Message, state: FSMContext):
     await state.set_state(PaidContentStates.waiting_for_confirmation)
     await message.answer(confirmation_text, reply_markup=keyboard, parse_mode="HTML", disable_web_page_preview=True)
 
-@router.callback_query(F.data == "confirm_paid_content")
+@router.callback_query(Callback("confirm_paid_content"))
 async def confirm_paid_content(callback: CallbackQuery, state: FSMContext):
     data = await state.get_data()
     
@@ -934,6 +837,19 @@ async def confirm_paid_content(callback: CallbackQuery, state: FSMContext):
     )
     
     await state.clear()
+    if application_id is None:
+        await callback.message.edit_text(
+            "❌ <b>На эту публикацию уже подана заявка</b>\n\n"
+            "Статус заявки можно посмотреть в разделе «Мои заявки»",
+            parse_mode="HTML",
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="📋 Мои заявки", callback_data="my_paid_content")],
+                [InlineKeyboardButton(text="◀️ В меню", callback_data="paid_content")]
+            ]),
+            disable_web_page_preview=True
+        )
+        return
+    
     await callback.message.edit_text(
         "✅ <b>Ваша заявка успешно отправлена!</b>\n\n"
         "Вы можете отслеживать статус в разделе «Мои заявки»",
@@ -945,7 +861,7 @@ async def confirm_paid_content(callback: CallbackQuery, state: FSMContext):
         disable_web_page_preview=True
     )
 
-@router.callback_query(F.data == "edit_paid_content")
+@router.callback_query(Callback("edit_paid_content"))
 async def edit_paid_content(callback: CallbackQuery, state: FSMContext):
     await state.set_state(PaidContentStates.waiting_for_link)
     await callback.message.edit_text(
@@ -955,7 +871,7 @@ async def edit_paid_content(callback: CallbackQuery, state: FSMContext):
         disable_web_page_preview=True
     )
 
-@router.callback_query(F.data == "submit_stream")
+@router.callback_query(Callback("submit_stream"))
 async def submit_stream_content(callback: CallbackQuery, state: FSMContext):
     await state.set_state(PaidContentStates.waiting_for_link)
     await state.update_data(content_type='stream')
@@ -973,7 +889,7 @@ async def submit_stream_content(callback: CallbackQuery, state: FSMContext):
         disable_web_page_preview=True
     )
 
-@router.callback_query(F.data == "submit_video")
+@router.callback_query(Callback("submit_video"))
 async def submit_video_content(callback: CallbackQuery, state: FSMContext):
     await state.set_state(PaidContentStates.waiting_for_link)
     await state.update_data(content_type='video')
@@ -991,7 +907,7 @@ async def submit_video_content(callback: CallbackQuery, state: FSMContext):
     )
 
 # Добавляем обработчик отмены через inline кнопку
-@router.callback_query(F.data == "cancel_application")
+@router.callback_query(Callback("cancel_application"))
 async def cancel_application(callback: CallbackQuery, state: FSMContext):
     await state.clear()
     await callback.message.edit_text(
@@ -1059,14 +975,14 @@ async def process_stream_screenshot(message: Message, state: FSMContext):
     )
 
 # Добавим обработчики пагинации
-@router.callback_query(F.data.in_(["next_page", "prev_page"]))
+@router.callback_query(Callback("next_page", "prev_page"))
 async def handle_pagination(callback: CallbackQuery, state: FSMContext):
     # Здесь будет логика пагинации
     # Нужно хранить текущую страницу в state
     await callback.answer("В разработке: пагинация списка заявок")
 
 # Обработчики для кнопок "Назад"
-@router.callback_query(F.data.startswith("submit_"))
+@router.callback_query(Callback.prefix("submit_"))
 async def handle_back_button(callback: CallbackQuery, state: FSMContext):
     # Получаем текущее состояние
     current_state = await state.get_state()
@@ -1116,7 +1032,7 @@ async def handle_back_button(callback: CallbackQuery, state: FSMContext):
             await state.set_state(PaidContentStates.waiting_for_link)
             await state.update_data(content_type='video')
 
-@router.callback_query(F.data == "submit_youtube")
+@router.callback_query(Callback("submit_youtube"))
 async def submit_youtube_content(callback: CallbackQuery, state: FSMContext):
     await state.set_state(PaidContentStates.waiting_for_link)
     await state.update_data(content_type='video')
@@ -1137,7 +1053,7 @@ async def submit_youtube_content(callback: CallbackQuery, state: FSMContext):
         disable_web_page_preview=True
     )
 
-@router.callback_query(F.data == "submit_shorts")
+@router.callback_query(Callback("submit_shorts"))
 async def submit_shorts_content(callback: CallbackQuery, state: FSMContext):
     await state.set_state(PaidContentStates.waiting_for_link)
     await state.update_data(content_type='shorts')
@@ -1157,7 +1073,7 @@ async def submit_shorts_content(callback: CallbackQuery, state: FSMContext):
         disable_web_page_preview=True
     )
 
-@router.callback_query(F.data == "submit_tiktok")
+@router.callback_query(Callback("submit_tiktok"))
 async def submit_tiktok_content(callback: CallbackQuery, state: FSMContext):
     await state.set_state(PaidContentStates.waiting_for_link)
     await state.update_data(content_type='tiktok')
@@ -1177,7 +1093,7 @@ async def submit_tiktok_content(callback: CallbackQuery, state: FSMContext):
         disable_web_page_preview=True
     )
 
-@router.callback_query(F.data == "submit_twitch")
+@router.callback_query(Callback("submit_twitch"))
 async def submit_twitch_content(callback: CallbackQuery, state: FSMContext):
     await state.set_state(PaidContentStates.waiting_for_link)
     await state.update_data(content_type='stream')
@@ -1197,7 +1113,7 @@ async def submit_twitch_content(callback: CallbackQuery, state: FSMContext):
         disable_web_page_preview=True
     )
 
-@router.callback_query(F.data == "submit_other")
+@router.callback_query(Callback("submit_other"))
 async def submit_other_content(callback: CallbackQuery, state: FSMContext):
     await state.set_state(PaidContentStates.waiting_for_link)
     await state.update_data(content_type='other')
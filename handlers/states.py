@@ -32,4 +32,7 @@ class AdminStates(StatesGroup):
     waiting_for_views = State()
     waiting_for_amount = State()
     waiting_for_comment = State()
-    waiting_for_confirmation = State() 
\ No newline at end of file
+    waiting_for_confirmation = State()
+    waiting_for_broadcast_text = State()
+    waiting_for_bulk_amount = State()
+    waiting_for_bulk_comment = State()
@@ -0,0 +1,128 @@
+"""
+Статические экраны меню.
+
+Текст и клавиатура каждого экрана собираются один раз при импорте, а
+клавиатура сразу сериализуется в JSON. Обработчик отправляет готовую
+строку в editMessageText без сборки InlineKeyboardMarkup и повторной
+сериализации на каждое нажатие. Если в кнопке меняется только счетчик,
+в тексте кнопки стоит подстановка {name}, и при показе в готовый JSON
+подставляются только значения.
+"""
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+from aiogram.methods import EditMessageText
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message
+
+from config.messages import (
+    ABOUT_BOT_MESSAGE,
+    COLLABORATION_INFO_MESSAGE,
+    FAQ_MESSAGE,
+    FUNCTIONALITY_MESSAGE,
+    INFO_FOR_CUTTERS_MESSAGE,
+    MY_PAID_CONTENT_MESSAGE,
+    PAID_CONTENT_MENU_MESSAGE,
+    REQUIREMENTS_MESSAGE,
+    SUBMIT_PAID_CONTENT_MESSAGE,
+)
+
+_FIELD = re.compile(r'\{(\w+)\}')
+
+
+def _prune(value: Any) -> Any:
+    """Убирает незаполненные поля, как это делает aiogram перед отправкой запроса"""
+    if isinstance(value, dict):
+        return {key: _prune(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [_prune(item) for item in value if item is not None]
+    return value
+
+
+class Screen:
+    """Экран: текст и клавиатура, сериализованная в JSON один раз"""
+
+    def __init__(self, text: str, rows: List[List[Tuple[str, str]]], parse_mode: str = "HTML"):
+        self.text = text
+        self.parse_mode = parse_mode
+        # Объект клавиатуры - для отправки экрана новым сообщением (message.answer)
+        self.keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text=button_text, callback_data=data) for button_text, data in row]
+            for row in rows
+        ])
+        markup_json = json.dumps(_prune(self.keyboard.model_dump(warnings=False)))
+        # Четные элементы - готовые куски JSON, нечетные - имена подстановок
+        self._parts = _FIELD.split(markup_json)
+        self.fields = frozenset(self._parts[1::2])
+
+    def markup(self, **values: Any) -> str:
+        """Возвращает JSON клавиатуры с подставленными значениями счетчиков"""
+        if not self.fields:
+            return self._parts[0]
+        parts = self._parts.copy()
+        for index in range(1, len(parts), 2):
+            # Значение вставляется внутрь строки JSON, поэтому экранируется так же
+            parts[index] = json.dumps(str(values[parts[index]]))[1:-1]
+        return ''.join(parts)
+
+
+SCREENS: Dict[str, Screen] = {
+    'about': Screen(ABOUT_BOT_MESSAGE, [
+        [("🤝 Сотрудничество", "collaboration")],
+        [("◀️ Назад", "back_to_start")],
+    ]),
+    'collaboration': Screen(COLLABORATION_INFO_MESSAGE, [
+        [("📝 Подать заявку", "apply_collab"), ("📋 Требования", "collab_requirements")],
+        [("❓ FAQ", "collab_faq"), ("◀️ Назад", "back_to_start")],
+    ]),
+    'collab_requirements': Screen(REQUIREMENTS_MESSAGE, [
+        [("📝 Подать заявку", "apply_collab")],
+        [("◀️ Назад", "collaboration")],
+    ]),
+    'collab_faq': Screen(FAQ_MESSAGE, [
+        [("◀️ Назад", "collaboration")],
+        [("📝 Подать заявку", "apply_collab")],
+    ]),
+    'paid_content': Screen(PAID_CONTENT_MENU_MESSAGE, [
+        [("📤 Подать заявку", "submit_paid_content")],
+        [("📋 Мои заявки (💰 {paid} | ⏳ {unpaid})", "my_paid_content")],
+        [("ℹ️ Для нарезчиков", "info_for_cutters"), ("📌 О функционале", "info_functionality")],
+        [("🔍 Проверить баннер", "check_banner"), ("◀️ Назад", "back_to_start")],
+    ]),
+    'submit_paid_content': Screen(SUBMIT_PAID_CONTENT_MESSAGE, [
+        [("YouTube", "submit_youtube")],
+        [("Shorts", "submit_shorts")],
+        [("TikTok", "submit_tiktok")],
+        [("Twitch", "submit_twitch")],
+        [("Другое", "submit_other")],
+        [("◀️ Назад", "paid_content")],
+    ]),
+    'my_paid_content': Screen(MY_PAID_CONTENT_MESSAGE, [
+        [("💰 Оплаченные ({paid})", "show_paid_apps")],
+        [("⏳ Ожидают оплаты ({unpaid})", "show_unpaid_apps")],
+        [("◀️ В меню", "paid_content")],
+    ]),
+    'info_for_cutters': Screen(INFO_FOR_CUTTERS_MESSAGE, [
+        [("📤 Подать заявку", "submit_paid_content")],
+        [("◀️ Назад", "paid_content")],
+    ]),
+    'info_functionality': Screen(FUNCTIONALITY_MESSAGE, [
+        [("◀️ Назад", "paid_content")],
+    ]),
+}
+
+
+async def show_screen(message: Message, name: str, **values: Any):
+    """Показывает экран на месте сообщения (как message.edit_text, но с готовым JSON клавиатуры)"""
+    screen = SCREENS[name]
+    # model_construct не проверяет поля, поэтому reply_markup можно передать готовой строкой:
+    # сессия aiogram отправляет строки как есть
+    method = EditMessageText.model_construct(
+        chat_id=message.chat.id,
+        message_id=message.message_id,
+        text=screen.text,
+        parse_mode=screen.parse_mode,
+        disable_web_page_preview=True,
+        reply_markup=screen.markup(**values)
+    )
+    return await message.bot(method)
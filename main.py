@@ -2,18 +2,13 @@ import asyncio
 import logging
 import os
 from dotenv import load_dotenv
-from aiogram import Bot, Dispatcher
-from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.exceptions import TelegramAPIError, TelegramNetworkError
-from config.config import load_config
+from bootstrap import create_bot, create_database, build_dispatcher
+from config.config import load_config, load_logging_config
 from config.logger import setup_logger
-from database.database import Database, DatabaseError
-from handlers.media_handlers import register_media_handlers
-from handlers.admin_handlers import register_admin_handlers
-from handlers.paid_content_handlers import router as paid_content_router
-
-# Создаем базу данных глобально
-db = Database()
+from database.database import DatabaseError
+from utils.sharding import run_sharded
+from utils.webhook import run_webhook
 
 async def main():
     try:
@@ -21,7 +16,7 @@ async def main():
         load_dotenv()
         
         # Настраиваем логгер
-        logger = setup_logger()
+        logger = setup_logger(config=load_logging_config())
         logger.info("Starting bot...")
         
         # Загружаем конфигурацию
@@ -31,32 +26,35 @@ async def main():
             logger.error(f"Failed to load configuration: {e}")
             return
         
+        # Создаем базу данных с пулом соединений и профилем хранилища из конфигурации
+        db = create_database(config)
+        
         # Инициализируем бота и диспетчер
         try:
-            bot = Bot(token=config.bot.token)
-            dp = Dispatcher()
-            
-            # Добавляем базу данных в storage диспетчера
-            dp.storage.database = db
+            bot = create_bot(config)
+            dp = build_dispatcher(config, db)
             
             # Инициализируем базу данных
             try:
-                await db.create_tables()
-                await db.add_username_column()
-                await db.add_user_mention_column()
+                await db.migrate()
                 logger.info("Database initialized successfully")
             except DatabaseError as e:
                 logger.error(f"Database initialization failed: {e}")
                 return
             
-            # Регистрируем хендлеры
-            paid_content_router.database = db
-            dp.include_router(paid_content_router)
+            # Проверяем, что частые запросы выполняются по индексам
+            await db.verify_query_plans()
             
-            register_media_handlers(dp, db)
+            if config.sharding.processes > 1:
+                # Этот процесс только принимает обновления, обработка - в рабочих процессах
+                logger.info(f"Starting {config.sharding.processes} worker processes...")
+                await run_sharded(config, bot, dp)
+                return
             
-            # Регистрируем админ-хендлеры с передачей списка админов
-            register_admin_handlers(dp, db, config.bot.admin_ids)
+            if config.bot.mode == 'webhook':
+                logger.info("Starting webhook server...")
+                await run_webhook(dp, bot, config.webhook)
+                return
             
             logger.info("Starting polling...")
             
@@ -82,6 +80,9 @@ async def main():
             if 'bot' in locals():
                 await bot.session.close()
                 logger.info("Bot session closed")
+            if 'dp' in locals():
+                # Сбрасываем в базу несохраненные состояния FSM
+                await dp.storage.close()
             await db.close()
             logger.info("Database connection closed")
     
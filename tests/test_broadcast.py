@@ -0,0 +1,56 @@
+"""Тесты завершения рассылки при ошибках (utils/broadcast.py)"""
+import asyncio
+
+from database.exceptions import DatabaseError
+from utils.broadcast import Broadcaster
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+class FakeDatabase:
+    """Одна пачка получателей; запись контрольной точки возвращает progress_result или выбрасывает его"""
+
+    def __init__(self, progress_result):
+        self.progress_result = progress_result
+        self.finished = []
+
+    async def get_broadcast_recipients(self, after_user_id, limit):
+        return [(1, 100), (2, 200)] if after_user_id == 0 else []
+
+    async def save_broadcast_progress(self, broadcast_id, last_user_id, sent, failed, blocked_ids):
+        if isinstance(self.progress_result, Exception):
+            raise self.progress_result
+        return self.progress_result
+
+    async def finish_broadcast(self, broadcast_id, status='done'):
+        self.finished.append(status)
+        return True
+
+
+def run_broadcast(db):
+    bot = FakeBot()
+    broadcast = {'id': 7, 'last_user_id': 0, 'text': "hi", 'created_by': 42}
+    asyncio.run(Broadcaster(db)._run(bot, broadcast))
+    return bot
+
+
+def test_failed_progress_write_marks_broadcast_failed():
+    db = FakeDatabase(DatabaseError("database is locked"))
+    bot = run_broadcast(db)
+    assert db.finished == ['failed']
+    # Автор рассылки узнает о сбое
+    assert bot.sent[-1][0] == 42
+    assert "#7" in bot.sent[-1][1]
+
+
+def test_stopped_broadcast_is_not_marked_failed():
+    db = FakeDatabase(False)
+    bot = run_broadcast(db)
+    assert db.finished == []
+    assert [chat_id for chat_id, _ in bot.sent] == [100, 200]
@@ -0,0 +1,60 @@
+"""Тесты выбора обработчика нажатия по индексу callback_data (utils/callback_router.py)"""
+from aiogram import Dispatcher, F, Router
+
+from utils.callback_router import Callback, CallbackIndex
+
+
+def build_index(*filters):
+    """Регистрирует по обработчику на каждый фильтр в порядке аргументов и строит индекс"""
+    dp = Dispatcher()
+    router = Router()
+    handlers = []
+    for event_filter in filters:
+        async def handler(callback):
+            pass
+        router.callback_query(event_filter)(handler)
+        handlers.append(handler)
+    dp.include_router(router)
+    return CallbackIndex.build(dp), handlers
+
+
+def matched(index, data):
+    route = index.match(data)
+    return None if route is None else route[2].callback
+
+
+def test_earlier_short_prefix_wins_over_later_long_prefix():
+    index, (show, show_user) = build_index(Callback.prefix("show_"), Callback.prefix("show_user_"))
+    assert matched(index, "show_user_42") is show
+    assert matched(index, "show_app_1") is show
+
+
+def test_earlier_long_prefix_wins_where_it_matches():
+    index, (show_user, show) = build_index(Callback.prefix("show_user_"), Callback.prefix("show_"))
+    assert matched(index, "show_user_42") is show_user
+    assert matched(index, "show_app_1") is show
+
+
+def test_earlier_prefix_wins_over_later_exact_value():
+    index, (submit, submit_shorts) = build_index(Callback.prefix("submit_"), Callback("submit_shorts"))
+    assert matched(index, "submit_shorts") is submit
+
+
+def test_earlier_exact_value_wins_over_later_prefix():
+    index, (submit_shorts, submit) = build_index(Callback("submit_shorts"), Callback.prefix("submit_"))
+    assert matched(index, "submit_shorts") is submit_shorts
+    assert matched(index, "submit_stream") is submit
+
+
+def test_repeated_value_goes_to_first_handler():
+    index, (first, second) = build_index(Callback("about", "menu"), Callback("about"))
+    assert matched(index, "about") is first
+    assert matched(index, "menu") is first
+    assert matched(index, "unknown") is None
+
+
+def test_unindexed_handler_falls_back_to_linear_dispatch():
+    # Обработчик с другим фильтром может перехватить нажатие раньше индексированных
+    index, (show, _, _) = build_index(Callback.prefix("show_"), F.data == "about", Callback("about"))
+    assert matched(index, "show_user_42") is show
+    assert index.match("about") is None
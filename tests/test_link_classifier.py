@@ -0,0 +1,79 @@
+"""Тесты классификации ссылок и ключей для поиска дублей (utils/link_classifier.py)"""
+import pytest
+
+from utils.link_classifier import LINK_RULES, LinkInfo, canonical_key, classify, content_key, normalize_url
+
+# Ссылка -> (платформа, вид, идентификатор, канонический ключ); по примеру на каждое правило LINK_RULES
+LINKS = [
+    ("https://postimg.cc/AbC123", ('image', 'screenshot', 'AbC123', 'image:screenshot:AbC123')),
+    ("https://i.ibb.co/abc/img-1.PNG", ('image', 'screenshot', 'abc/img-1.PNG', 'image:screenshot:abc/img-1.PNG')),
+    ("https://www.youtube.com/@SomeUser", ('youtube', 'channel', '@someuser', 'youtube:channel:@someuser')),
+    ("https://youtube.com/channel/UC1234567890123456789012",
+     ('youtube', 'channel', 'UC1234567890123456789012', 'youtube:channel:UC1234567890123456789012')),
+    ("https://m.youtube.com/watch?v=dQw4w9WgXcQ&t=1", ('youtube', 'video', 'dQw4w9WgXcQ', 'youtube:video:dQw4w9WgXcQ')),
+    ("https://youtube.com/v/dQw4w9WgXcQ", ('youtube', 'video', 'dQw4w9WgXcQ', 'youtube:video:dQw4w9WgXcQ')),
+    ("https://youtube.com/live/abcDEF", ('youtube', 'live', 'abcDEF', 'youtube:video:abcDEF')),
+    ("https://youtube.com/shorts/abcDEF", ('youtube', 'shorts', 'abcDEF', 'youtube:video:abcDEF')),
+    ("https://youtu.be/dQw4w9WgXcQ?si=x", ('youtube', 'video', 'dQw4w9WgXcQ', 'youtube:video:dQw4w9WgXcQ')),
+    ("https://twitch.tv/videos/123456", ('twitch', 'vod', '123456', 'twitch:vod:123456')),
+    ("https://www.twitch.tv/SomeStreamer/", ('twitch', 'channel', 'somestreamer', 'twitch:channel:somestreamer')),
+    ("https://www.tiktok.com/@user.name/video/7312345", ('tiktok', 'video', '7312345', 'tiktok:video:7312345')),
+    ("https://vt.tiktok.com/v/7312345", ('tiktok', 'video', '7312345', 'tiktok:video:7312345')),
+    ("https://tiktok.com/@User.Name/live", ('tiktok', 'live', 'user.name', 'tiktok:live:user.name')),
+    ("https://tiktok.com/@User.Name", ('tiktok', 'profile', 'user.name', 'tiktok:profile:user.name')),
+    ("https://vm.tiktok.com/ZMabc12/", ('tiktok', 'short_link', 'ZMabc12', 'tiktok:short_link:ZMabc12')),
+    ("https://example.com/pic.JPG", ('image', 'screenshot', 'example.com/pic.JPG', 'image:screenshot:example.com/pic.JPG')),
+    ("https://www.Example.com/page/#top", ('other', 'link', 'www.example.com/page/#top', 'other:link:example.com/page')),
+]
+
+
+def test_examples_cover_every_rule():
+    rules = {(platform, kind) for platform, kind, *_ in LINK_RULES}
+    assert rules == {(platform, kind) for _, (platform, kind, _, _) in LINKS}
+
+
+@pytest.mark.parametrize("url, expected", LINKS)
+def test_classify(url, expected):
+    platform, kind, canonical_id, _ = expected
+    assert classify(normalize_url(url)) == LinkInfo(platform, kind, canonical_id)
+
+
+@pytest.mark.parametrize("url, expected", LINKS)
+def test_canonical_key(url, expected):
+    assert canonical_key(url) == expected[3]
+
+
+@pytest.mark.parametrize("first, second", [
+    ("https://www.youtube.com/watch?v=dQw4w9WgXcQ", "youtu.be/dQw4w9WgXcQ"),
+    ("https://youtube.com/shorts/dQw4w9WgXcQ", "HTTP://M.YOUTUBE.COM/watch?v=dQw4w9WgXcQ&feature=share"),
+    ("https://www.twitch.tv/Streamer", "twitch.tv/streamer/"),
+    ("https://www.tiktok.com/@a.b/video/123", "https://m.tiktok.com/@other/video/123"),
+    ("https://example.com/page/", "www.example.com/page#comments"),
+])
+def test_same_content_has_same_key(first, second):
+    assert canonical_key(first) == canonical_key(second)
+
+
+def test_different_case_of_case_sensitive_id_is_different_content():
+    assert canonical_key("https://youtu.be/abcDEF") != canonical_key("https://youtu.be/abcdef")
+
+
+def test_tiktok_live_is_not_content():
+    assert canonical_key("https://tiktok.com/@user/live") == "tiktok:live:user"
+    assert content_key("https://tiktok.com/@user/live") is None
+
+
+@pytest.mark.parametrize("text", ["not a link", "", "hello"])
+def test_text_is_not_a_link(text):
+    assert classify(normalize_url(text)) is None
+    assert canonical_key(text) is None
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("YouTube.com/@X", "https://youtube.com/@X"),
+    ("HTTPS://WWW.YOUTUBE.COM/Watch?v=AbC ", "https://www.youtube.com/Watch?v=AbC"),
+    ("http://Ex.com/A", "http://ex.com/A"),
+    ("hello", "hello"),
+])
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
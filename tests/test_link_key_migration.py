@@ -0,0 +1,27 @@
+"""Тесты замороженных ключей ссылок миграции 0009: они не должны меняться вместе с LINK_RULES"""
+import importlib
+
+import pytest
+
+migration = importlib.import_module('database.migrations.0009_canonical_link_keys')
+
+
+@pytest.mark.parametrize("url, channel_key, link_key", [
+    ("https://www.youtube.com/@SomeUser", "youtube:channel:@someuser", "youtube:channel:@someuser"),
+    ("youtu.be/dQw4w9WgXcQ?si=x", "youtube:video:dQw4w9WgXcQ", "youtube:video:dQw4w9WgXcQ"),
+    ("https://youtube.com/shorts/abcDEF", "youtube:video:abcDEF", "youtube:video:abcDEF"),
+    ("HTTPS://WWW.TWITCH.TV/SomeStreamer/", "twitch:channel:somestreamer", "twitch:channel:somestreamer"),
+    ("https://www.tiktok.com/@user.name/video/7312345", "tiktok:video:7312345", "tiktok:video:7312345"),
+    ("https://tiktok.com/@User.Name/live", "tiktok:live:user.name", None),
+    ("https://i.ibb.co/abc/img-1.PNG", "image:screenshot:abc/img-1.PNG", "image:screenshot:abc/img-1.PNG"),
+    ("https://www.Example.com/page/#top", "other:link:example.com/page", "other:link:example.com/page"),
+    ("not a link", None, None),
+])
+def test_frozen_keys(url, channel_key, link_key):
+    assert migration.canonical_key(url) == channel_key
+    assert migration.content_key(url) == link_key
+
+
+def test_migration_does_not_import_live_classifier():
+    assert not hasattr(migration, 'classify')
+    assert 'utils.link_classifier' not in open(migration.__file__, encoding='utf-8').read()
@@ -0,0 +1,79 @@
+"""Тесты повторов после ответа 429 в планировщике исходящих запросов (utils/outbound.py)"""
+import asyncio
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import GetUpdates, SendMessage
+
+from utils.outbound import OutboundScheduler
+
+
+def make_request(failures: int, retry_after: int = 0):
+    """Запрос к Bot API, который первые failures раз отвечает 429"""
+    calls = []
+
+    async def request(bot, method):
+        calls.append(method)
+        if len(calls) <= failures:
+            raise TelegramRetryAfter(method, "Flood control exceeded", retry_after)
+        return "ok"
+
+    return request, calls
+
+
+def test_request_is_retried_after_429():
+    scheduler = OutboundScheduler(chat_rate=100, burst=10)
+    request, calls = make_request(failures=2)
+    result = asyncio.run(scheduler(request, None, SendMessage(chat_id=1, text="hi")))
+    assert result == "ok"
+    assert len(calls) == 3
+    assert scheduler.stats()['retries'] == 2
+    assert scheduler.stats()['failed'] == 0
+
+
+def test_error_is_raised_after_max_retries():
+    scheduler = OutboundScheduler(chat_rate=100, burst=10, max_retries=1)
+    request, calls = make_request(failures=5)
+    with pytest.raises(TelegramRetryAfter):
+        asyncio.run(scheduler(request, None, SendMessage(chat_id=1, text="hi")))
+    assert len(calls) == 2
+    assert scheduler.stats()['failed'] == 1
+
+
+def test_service_requests_are_not_limited():
+    scheduler = OutboundScheduler()
+    request, calls = make_request(failures=1)
+    with pytest.raises(TelegramRetryAfter):
+        asyncio.run(scheduler(request, None, GetUpdates()))
+    assert scheduler.stats()['retries'] == 0
+
+
+def test_429_in_one_chat_pauses_only_that_chat():
+    scheduler = OutboundScheduler(flood_chats=3)
+    scheduler._on_retry_after(1, 5)
+    scheduler._on_retry_after(1, 5)
+    assert scheduler._chat_bucket(1).delay() > 4
+    assert scheduler._chat_bucket(2).delay() == 0
+    assert scheduler._global.delay() == 0
+    assert scheduler.stats()['global_pauses'] == 0
+
+
+def test_429_in_several_chats_pauses_the_whole_bot():
+    scheduler = OutboundScheduler(flood_chats=3)
+    for chat_id in (1, 2, 3):
+        scheduler._on_retry_after(chat_id, 5)
+    assert scheduler._global.delay() > 4
+    assert scheduler.stats()['global_pauses'] == 1
+
+    # Повторные 429 во время паузы не продлевают ее и не считаются новой паузой
+    scheduler._on_retry_after(4, 1)
+    assert scheduler._global.delay() > 4
+    assert scheduler.stats()['global_pauses'] == 1
+
+
+def test_old_429_are_not_counted_towards_bot_pause():
+    scheduler = OutboundScheduler(flood_chats=2, flood_window=1.0)
+    scheduler._on_retry_after(1, 5)
+    scheduler._flooded_chats[1] -= 2
+    scheduler._on_retry_after(2, 5)
+    assert scheduler._global.delay() == 0
@@ -0,0 +1,61 @@
+"""Тесты сборки выражения MATCH для /find (database/search.py)"""
+import importlib
+import sqlite3
+
+import pytest
+
+from database.search import MIN_TRIGRAM_TERM, match_expression
+
+supported_tokenizer = importlib.import_module('database.migrations.0011_admin_search').supported_tokenizer
+
+
+@pytest.mark.parametrize("text, trigram, expected", [
+    ("rust", True, '"rust"'),
+    ("rust", False, '"rust"*'),
+    ("rust  media", True, '"rust" AND "media"'),
+    ("rust media", False, '"rust"* AND "media"*'),
+    ("@blogger", True, '"blogger"'),
+    ("@blogger", False, '"blogger"*'),
+])
+def test_terms(text, trigram, expected):
+    assert match_expression(text, trigram) == expected
+
+
+def test_short_terms_are_skipped_for_trigram():
+    short = "a" * (MIN_TRIGRAM_TERM - 1)
+    assert match_expression(f"{short} rust", True) == '"rust"'
+    assert match_expression(f"{short} rust", False) == f'"{short}"* AND "rust"*'
+
+
+@pytest.mark.parametrize("text", ["", "   ", "@", "ab", "@ab x"])
+def test_no_usable_terms(text):
+    assert match_expression(text, True) is None
+
+
+def test_only_at_sign_has_no_terms_without_trigram():
+    assert match_expression("@ @@", False) is None
+
+
+@pytest.mark.parametrize("text, trigram, expected", [
+    ('say"hi', True, '"say""hi"'),
+    ('"quoted"', False, '"""quoted"""*'),
+    ("NEAR(a b) OR x*", False, '"NEAR(a"* AND "b)"* AND "OR"* AND "x*"*'),
+])
+def test_quotes_and_operators_are_literal(text, trigram, expected):
+    assert match_expression(text, trigram) == expected
+
+
+@pytest.mark.parametrize("text", ['say"hi', '"quoted"', "NEAR(a b) OR x*", "col:value", "-minus ^start", "@user"])
+def test_expression_is_valid_fts5_query(text):
+    # Пользовательский ввод не должен ломать синтаксис MATCH
+    tokenizer = supported_tokenizer()
+    trigram = tokenizer == 'trigram'
+    db = sqlite3.connect(':memory:')
+    try:
+        db.execute(f"CREATE VIRTUAL TABLE search USING fts5(text, tokenize = '{tokenizer}')")
+        db.execute("INSERT INTO search (text) VALUES (?)", (f"prefix {text.lstrip('@')} suffix",))
+        expression = match_expression(text, trigram)
+        rows = db.execute("SELECT rowid FROM search WHERE search MATCH ?", (expression,)).fetchall()
+    finally:
+        db.close()
+    assert rows == [(1,)]
@@ -0,0 +1,166 @@
+"""
+Массовые рассылки всем зарегистрированным пользователям.
+
+Получатели читаются из telegram_users пачками по первичному ключу, каждая
+пачка отправляется параллельно (не больше concurrency запросов сразу) с
+приоритетом PRIORITY_BULK, а скорость ограничивает OutboundScheduler.
+После каждой пачки в broadcasts сохраняется контрольная точка, поэтому
+после перезапуска рассылка продолжается со следующей пачки (пачка,
+прерванная на середине, отправляется повторно). Пользователи, которые
+заблокировали бота, отмечаются и пропускаются следующими рассылками.
+"""
+import asyncio
+import logging
+from typing import Dict, List, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest, TelegramForbiddenError
+
+from database.database import Database
+from .message_utils import safe_send_message
+from .outbound import PRIORITY_BULK, send_priority
+
+logger = logging.getLogger('bot_logger')
+
+# Результаты отправки одному получателю
+SENT = 'sent'
+BLOCKED = 'blocked'
+FAILED = 'failed'
+
+
+class Broadcaster:
+    """Запускает, продолжает после перезапуска и останавливает рассылки"""
+
+    def __init__(self, db: Database, chunk_size: int = 500, concurrency: int = 10):
+        self.db = db
+        self.chunk_size = max(1, chunk_size)
+        self.concurrency = max(1, concurrency)
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    async def start(self, bot: Bot, text: str, created_by: int) -> int:
+        """Создает рассылку и запускает ее в фоне"""
+        broadcast_id = await self.db.create_broadcast(text, created_by)
+        broadcast = await self.db.get_broadcast(broadcast_id)
+        self._spawn(bot, broadcast)
+        return broadcast_id
+
+    async def resume(self, bot: Bot):
+        """Продолжает рассылки, прерванные остановкой бота"""
+        for broadcast in await self.db.get_running_broadcasts():
+            if broadcast['id'] not in self._tasks:
+                logger.info(f"Resuming broadcast {broadcast['id']} after user {broadcast['last_user_id']}")
+                self._spawn(bot, broadcast)
+
+    async def cancel(self, broadcast_id: int) -> bool:
+        """Останавливает рассылку; уже отправленные сообщения остаются у получателей"""
+        cancelled = await self.db.finish_broadcast(broadcast_id, 'cancelled')
+        task = self._tasks.pop(broadcast_id, None)
+        if task is not None:
+            task.cancel()
+        return cancelled
+
+    async def stop(self):
+        """Прерывает рассылки при остановке бота (они продолжатся после запуска)"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def _spawn(self, bot: Bot, broadcast: Dict):
+        task = asyncio.create_task(self._run(bot, broadcast))
+        self._tasks[broadcast['id']] = task
+        task.add_done_callback(lambda _: self._tasks.pop(broadcast['id'], None))
+
+    async def _send(self, bot: Bot, semaphore: asyncio.Semaphore, telegram_id: int, text: str) -> str:
+        """Отправляет сообщение одному получателю"""
+        async with semaphore:
+            try:
+                await bot.send_message(telegram_id, text, parse_mode="HTML", disable_web_page_preview=True)
+                return SENT
+            except TelegramForbiddenError:
+                # Бот заблокирован или аккаунт удален
+                return BLOCKED
+            except TelegramBadRequest as e:
+                if "chat not found" in str(e).lower():
+                    return BLOCKED
+                logger.error(f"Broadcast message to {telegram_id} rejected: {e}")
+                return FAILED
+            except TelegramAPIError as e:
+                logger.error(f"Telegram API error while broadcasting to {telegram_id}: {e}")
+                return FAILED
+
+    async def _send_chunk(self, bot: Bot, recipients: List[Tuple[int, int]], text: str) -> List[str]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(*(
+            self._send(bot, semaphore, telegram_id, text) for _, telegram_id in recipients
+        ))
+
+    async def _fail(self, bot: Bot, broadcast: Dict, last_user_id: int):
+        """Отмечает рассылку прерванной ошибкой и сообщает об этом ее автору"""
+        broadcast_id = broadcast['id']
+        if not await self.db.finish_broadcast(broadcast_id, 'failed'):
+            return
+        if broadcast['created_by']:
+            await safe_send_message(
+                bot,
+                broadcast['created_by'],
+                f"⚠️ Рассылка #{broadcast_id} прервана ошибкой после пользователя {last_user_id}, "
+                f"подробности в логе бота"
+            )
+
+    async def _run(self, bot: Bot, broadcast: Dict):
+        """Отправляет рассылку пачками, сохраняя прогресс после каждой"""
+        broadcast_id = broadcast['id']
+        last_user_id = broadcast['last_user_id']
+        try:
+            with send_priority(PRIORITY_BULK):
+                while True:
+                    recipients = await self.db.get_broadcast_recipients(last_user_id, self.chunk_size)
+                    if not recipients:
+                        break
+
+                    results = await self._send_chunk(bot, recipients, broadcast['text'])
+                    blocked_ids = [
+                        telegram_id
+                        for (_, telegram_id), result in zip(recipients, results)
+                        if result == BLOCKED
+                    ]
+                    running = await self.db.save_broadcast_progress(
+                        broadcast_id,
+                        recipients[-1][0],
+                        sent=results.count(SENT),
+                        failed=results.count(FAILED),
+                        blocked_ids=blocked_ids
+                    )
+                    # Контрольная точка сохранена: при ошибке в лог попадет последний записанный пользователь
+                    last_user_id = recipients[-1][0]
+                    if not running:
+                        # Рассылку остановили (возможно, из другого рабочего процесса)
+                        logger.info(f"Broadcast {broadcast_id} cancelled after user {last_user_id}")
+                        return
+
+            if not await self.db.finish_broadcast(broadcast_id):
+                # Рассылку отменили, пока отправлялась последняя пачка
+                return
+        except Exception as e:
+            # Задача рассылки работает в фоне: без этого ошибка пропала бы вместе с задачей,
+            # а рассылка осталась бы в статусе running до перезапуска бота
+            logger.error(f"Broadcast {broadcast_id} failed after user {last_user_id}: {e}", exc_info=True)
+            await self._fail(bot, broadcast, last_user_id)
+            return
+
+        result = await self.db.get_broadcast(broadcast_id)
+        logger.info(
+            f"Broadcast {broadcast_id} finished: sent {result['sent_count']}, "
+            f"failed {result['failed_count']}, blocked {result['blocked_count']}"
+        )
+        if result['created_by']:
+            await safe_send_message(
+                bot,
+                result['created_by'],
+                f"📣 Рассылка #{broadcast_id} завершена\n\n"
+                f"✅ Доставлено: {result['sent_count']}\n"
+                f"🚫 Заблокировали бота: {result['blocked_count']}\n"
+                f"❌ Ошибок: {result['failed_count']}"
+            )
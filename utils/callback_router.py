@@ -0,0 +1,166 @@
+"""
+Диспетчеризация нажатий инлайн-кнопок по индексу callback_data.
+
+Обычно aiogram проверяет фильтры всех обработчиков callback_query по
+порядку, пока какой-нибудь не подойдет. Обработчики с фильтром Callback
+(точные значения или префикс callback_data) индексируются при запуске:
+точные значения - словарь, префиксы - префиксное дерево. Middleware
+CallbackDispatcher находит обработчик одним обращением к словарю или
+проходом по дереву длиной в callback_data и вызывает его так же, как
+это сделал бы aiogram (с middleware роутера). Из нескольких подходящих
+обработчиков выбирается зарегистрированный первым, как и при обычном
+переборе, поэтому пересекающиеся фильтры (show_ и show_user_, submit_ и
+submit_shorts) работают так же, как раньше.
+
+Обработчики с другими фильтрами не индексируются: если такой обработчик
+зарегистрирован раньше найденного, нажатие обрабатывается обычным
+перебором. Индексированные обработчики не должны выбрасывать SkipHandler.
+"""
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from aiogram import BaseMiddleware, Dispatcher, Router
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.filters import BaseFilter
+from aiogram.types import CallbackQuery
+
+logger = logging.getLogger('bot_logger')
+
+# (порядок регистрации, роутер, обработчик)
+Route = Tuple[int, Router, HandlerObject]
+
+
+class Callback(BaseFilter):
+    """Фильтр нажатия по точному значению callback_data или по его префиксу"""
+
+    def __init__(self, *values: str, prefix: bool = False):
+        if not values:
+            raise ValueError("Callback filter needs at least one value")
+        self.values = frozenset(values)
+        self.is_prefix = prefix
+
+    @classmethod
+    def prefix(cls, value: str) -> "Callback":
+        """Фильтр по началу callback_data"""
+        return cls(value, prefix=True)
+
+    async def __call__(self, callback: CallbackQuery) -> bool:
+        data = callback.data
+        if data is None:
+            return False
+        if self.is_prefix:
+            return data.startswith(tuple(self.values))
+        return data in self.values
+
+
+class CallbackIndex:
+    """Индекс обработчиков: точные значения в словаре, префиксы в префиксном дереве"""
+
+    def __init__(self):
+        self._exact: Dict[str, Route] = {}
+        # Узел дерева: {символ: узел}, обработчик префикса хранится под ключом None
+        self._trie: Dict[Any, Any] = {}
+        # Порядок первого обработчика, который нельзя проиндексировать
+        self.barrier: Optional[int] = None
+
+    @classmethod
+    def build(cls, dp: Dispatcher) -> "CallbackIndex":
+        """Индексирует обработчики callback_query всех роутеров в порядке их проверки aiogram"""
+        index = cls()
+        order = 0
+        for router in dp.chain_tail:
+            observer = router.callback_query
+            if index.barrier is None and (
+                observer._handler.filters or (router is not dp and len(observer.outer_middleware))
+            ):
+                # Общие фильтры и внешние middleware роутера проверяются до его обработчиков,
+                # а вызов по индексу их обошел бы
+                index.barrier = order
+            for handler in observer.handlers:
+                event_filter = handler.filters[0].callback if handler.filters and len(handler.filters) == 1 else None
+                if isinstance(event_filter, Callback):
+                    for value in event_filter.values:
+                        index._add((order, router, handler), value, event_filter.is_prefix)
+                elif index.barrier is None:
+                    index.barrier = order
+                order += 1
+
+        # Для точных значений победителя с учетом префиксов можно выбрать заранее
+        for value, route in index._exact.items():
+            index._exact[value] = index._match_prefix(value, route)
+        return index
+
+    def _add(self, route: Route, value: str, is_prefix: bool):
+        if not is_prefix:
+            # При повторной регистрации того же значения срабатывает первый обработчик
+            self._exact.setdefault(value, route)
+            return
+        node = self._trie
+        for char in value:
+            node = node.setdefault(char, {})
+        node.setdefault(None, route)
+
+    def _match_prefix(self, data: str, best: Optional[Route] = None) -> Optional[Route]:
+        """Ищет самый ранний обработчик, префикс которого совпадает с началом data"""
+        node = self._trie
+        for char in data:
+            node = node.get(char)
+            if node is None:
+                break
+            route = node.get(None)
+            if route is not None and (best is None or route[0] < best[0]):
+                best = route
+        return best
+
+    def match(self, data: str) -> Optional[Route]:
+        """Обработчик, который выбрал бы aiogram (None - нужен обычный перебор)"""
+        route = self._exact.get(data)
+        if route is None:
+            route = self._match_prefix(data)
+        if route is None or (self.barrier is not None and route[0] >= self.barrier):
+            return None
+        return route
+
+    def __len__(self) -> int:
+        return len(self._exact) + self._count(self._trie)
+
+    def _count(self, node: Dict[Any, Any]) -> int:
+        return sum(1 if key is None else self._count(child) for key, child in node.items())
+
+
+class CallbackDispatcher(BaseMiddleware):
+    """Внешний middleware callback_query диспетчера, вызывающий обработчик по индексу"""
+
+    def __init__(self, index: CallbackIndex):
+        self.index = index
+
+    async def __call__(
+        self,
+        handler: Callable[[CallbackQuery, Dict[str, Any]], Awaitable[Any]],
+        event: CallbackQuery,
+        data: Dict[str, Any]
+    ) -> Any:
+        route = self.index.match(event.data) if event.data is not None else None
+        if route is None:
+            return await handler(event, data)
+
+        _, router, handler_object = route
+        observer = router.callback_query
+        data.update(event_router=router, handler=handler_object)
+        # Тот же вызов, что в TelegramEventObserver.trigger: с middleware роутера и родителей
+        wrapped = observer.outer_middleware.wrap_middlewares(
+            observer._resolve_middlewares(),
+            handler_object.call
+        )
+        return await wrapped(event, data)
+
+
+def install_callback_dispatcher(dp: Dispatcher) -> CallbackIndex:
+    """Индексирует зарегистрированные обработчики нажатий и подключает диспетчеризацию по индексу"""
+    index = CallbackIndex.build(dp)
+    dp.callback_query.outer_middleware(CallbackDispatcher(index))
+    logger.info(
+        f"Callback index built: {len(index)} routes"
+        + (f", linear scan after handler #{index.barrier}" if index.barrier is not None else "")
+    )
+    return index
@@ -0,0 +1,139 @@
+"""
+Выгрузка заявок и выплат в CSV и XLSX для бухгалтерии (/export).
+
+Строки приходят из базы пачками (Database.iter_export_rows) и сразу
+дописываются в файл, поэтому память не зависит от размера выгрузки.
+Запись в файл выполняется в отдельном потоке, чтобы не блокировать
+цикл событий. XLSX пишется без сторонних библиотек: это zip-архив,
+лист в котором выводится потоком построчно (строки inlineStr, без
+таблицы общих строк, которую пришлось бы держать в памяти).
+"""
+import asyncio
+import csv
+import re
+import zipfile
+from contextlib import aclosing
+from typing import AsyncGenerator, List, Sequence
+from xml.sax.saxutils import escape
+
+import aiosqlite
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+
+# Символы, недопустимые в XML 1.0 (встречаются в тексте из Telegram)
+_XML_INVALID = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{sheet}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+_XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_XLSX_SHEET_END = '</sheetData></worksheet>'
+
+
+class CsvWriter:
+    """CSV для Excel: UTF-8 с BOM и разделитель ';', как ожидает русская локаль"""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'w', encoding='utf-8-sig', newline='')
+        self._writer = csv.writer(self._file, delimiter=';')
+
+    def write_rows(self, rows: Sequence[Sequence]):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class XlsxWriter:
+    """Книга XLSX с одним листом, который пишется потоком"""
+
+    def __init__(self, path: str, sheet: str = 'export'):
+        self._zip = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED)
+        self._zip.writestr('[Content_Types].xml', _XLSX_CONTENT_TYPES)
+        self._zip.writestr('_rels/.rels', _XLSX_ROOT_RELS)
+        self._zip.writestr('xl/workbook.xml', _XLSX_WORKBOOK.format(sheet=escape(sheet)))
+        self._zip.writestr('xl/_rels/workbook.xml.rels', _XLSX_WORKBOOK_RELS)
+        # Лист - последний файл архива: пока он открыт на запись, другие добавлять нельзя
+        self._sheet = self._zip.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True)
+        self._sheet.write(_XLSX_SHEET_START.encode())
+
+    @staticmethod
+    def _cell(value) -> str:
+        if value is None:
+            return '<c/>'
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return f'<c><v>{value}</v></c>'
+        text = escape(_XML_INVALID.sub('', str(value)))
+        return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+    def write_rows(self, rows: Sequence[Sequence]):
+        self._sheet.write(''.join(
+            '<row>' + ''.join(self._cell(value) for value in row) + '</row>'
+            for row in rows
+        ).encode())
+
+    def close(self):
+        self._sheet.write(_XLSX_SHEET_END.encode())
+        self._sheet.close()
+        self._zip.close()
+
+
+async def export_rows(path: str, file_format: str, chunks: AsyncGenerator[List[aiosqlite.Row], None]) -> int:
+    """
+    Записывает пачки строк в файл: первая строка файла - названия столбцов.
+
+    Returns:
+        Количество выгруженных строк (0 - файл не создан)
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {file_format}")
+
+    writer = None
+    count = 0
+    # aclosing сразу освобождает соединение базы, если запись в файл прервалась
+    try:
+        async with aclosing(chunks):
+            async for rows in chunks:
+                if writer is None:
+                    writer = await asyncio.to_thread(CsvWriter if file_format == 'csv' else XlsxWriter, path)
+                    await asyncio.to_thread(writer.write_rows, [rows[0].keys()])
+                await asyncio.to_thread(writer.write_rows, rows)
+                count += len(rows)
+    finally:
+        if writer is not None:
+            await asyncio.to_thread(writer.close)
+    return count
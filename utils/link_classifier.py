@@ -0,0 +1,152 @@
+"""
+Классификация ссылок, которые присылают пользователи.
+
+Все известные форматы ссылок собраны в одно регулярное выражение с
+альтернативами, которое компилируется один раз при импорте. Один проход
+re.match определяет платформу, вид ссылки и канонический идентификатор
+(ID видео, имя канала и т.д.), а повторные проверки той же ссылки берутся
+из LRU-кэша. Новый формат добавляется строкой в LINK_RULES; после
+изменения правил ключи уже сохраненных ссылок пересчитываются командой
+/rekey_links (миграция 0009 использует свою копию правил).
+
+canonical_key и content_key строят из ссылки нормализованный ключ
+"платформа:вид:идентификатор", по которому база находит дубли каналов и
+публикаций независимо от написания ссылки (www./m., регистр, протокол,
+завершающий слеш, параметры).
+"""
+import re
+from functools import lru_cache
+from itertools import groupby
+from typing import Dict, NamedTuple, Optional, Tuple
+
+
+class LinkInfo(NamedTuple):
+    platform: str       # youtube, tiktok, twitch, image, other
+    kind: str           # channel, video, shorts, live, vod, profile, short_link, screenshot, link
+    canonical_id: str   # идентификатор внутри платформы (для сравнения ссылок между собой)
+
+
+# (платформа, вид, хост, путь, регистр идентификатора не важен)
+# Путь содержит одну группу (?P<id>...) с каноническим идентификатором, остальные группы - (?:...).
+# Правила проверяются по порядку: первое совпавшее определяет результат. Подряд идущие
+# правила с одинаковым хостом объединяются, чтобы хост сравнивался один раз.
+_IMAGE_HOSTS = r'(?:postimg\.cc|ibb\.co|postimages\.org)'
+_YOUTUBE = r'(?:www\.|m\.)?youtube\.com/'
+_TWITCH = r'(?:www\.|m\.)?twitch\.tv/'
+_TIKTOK = r'(?:www\.|m\.|vm\.|vt\.)?tiktok\.com/'
+
+LINK_RULES = [
+    # Скриншоты на фотохостингах
+    ('image', 'screenshot', rf'(?:www\.)?{_IMAGE_HOSTS}/', r'(?P<id>\w+)', False),
+    ('image', 'screenshot', rf'(?:www\.)?i\.{_IMAGE_HOSTS}/', r'(?P<id>\w+/[\w-]+\.(?i:jpg|jpeg|png|gif))', False),
+
+    # YouTube: каналы (@username или channel/ID из 24 символов), видео, эфиры и shorts
+    ('youtube', 'channel', _YOUTUBE, r'(?P<id>@[\w-]{3,})/?$', True),
+    ('youtube', 'channel', _YOUTUBE, r'channel/(?P<id>[\w-]{24})/?$', False),
+    ('youtube', 'video', _YOUTUBE, r'watch\?v=(?P<id>[\w-]+)', False),
+    ('youtube', 'video', _YOUTUBE, r'v/(?P<id>[\w-]+)', False),
+    ('youtube', 'live', _YOUTUBE, r'live/(?P<id>[\w-]+)', False),
+    ('youtube', 'shorts', _YOUTUBE, r'shorts/(?P<id>[\w-]+)', False),
+    ('youtube', 'video', r'youtu\.be/', r'(?P<id>[\w-]+)', False),
+
+    # Twitch: записи стримов и каналы
+    ('twitch', 'vod', _TWITCH, r'videos/(?P<id>\d+)', False),
+    ('twitch', 'channel', _TWITCH, r'(?P<id>[\w-]{4,})/?$', True),
+
+    # TikTok: видео, эфиры, профили и короткие ссылки
+    ('tiktok', 'video', _TIKTOK, r'@[\w.]+/video/(?P<id>\d+)', False),
+    ('tiktok', 'video', _TIKTOK, r'v/(?P<id>\d+)', False),
+    ('tiktok', 'live', _TIKTOK, r'@(?P<id>[\w.]+)/live/?', True),
+    ('tiktok', 'profile', _TIKTOK, r'@(?P<id>[\w.]{2,})/?$', True),
+    ('tiktok', 'short_link', _TIKTOK, r'(?P<id>[\w.]+)/?$', False),
+
+    # Прямые ссылки на изображения на любых других сайтах и любые другие ссылки
+    ('image', 'screenshot', '', r'(?P<id>\S+\.(?i:jpg|jpeg|png|gif))$', False),
+    ('other', 'link', '', r'(?P<id>\S+)', False),
+]
+
+
+def _compile(rules) -> Tuple[re.Pattern, Dict[int, int]]:
+    """
+    Собирает правила в одно выражение.
+
+    Каждое правило - нумерованная группа, сразу за ней идет группа
+    идентификатора. Возвращает выражение и соответствие номера группы
+    правила его индексу в rules.
+    """
+    parts = []
+    rule_groups = {}
+    group = 0
+    for host, items in groupby(enumerate(rules), key=lambda item: item[1][2]):
+        alternatives = []
+        for index, (_, _, _, path, _) in items:
+            if path.count('(?P<id>') != 1:
+                raise ValueError(f"Link rule {index} must have exactly one (?P<id>...) group")
+            rule_groups[group + 1] = index
+            alternatives.append(f"({path.replace('(?P<id>', '(')})")
+            group += 2
+        parts.append(f"{host}(?:{'|'.join(alternatives)})")
+    return re.compile(r'https?://(?:' + '|'.join(parts) + ')'), rule_groups
+
+
+_PATTERN, _RULE_GROUPS = _compile(LINK_RULES)
+
+
+@lru_cache(maxsize=4096)
+def classify(url: str) -> Optional[LinkInfo]:
+    """Определяет платформу, вид и идентификатор ссылки (None - это не ссылка)"""
+    match = _PATTERN.match(url)
+    if match is None:
+        return None
+
+    # Группа правила закрывается позже вложенной группы идентификатора,
+    # поэтому lastindex - номер группы совпавшего правила
+    group = match.lastindex
+    platform, kind, _, _, fold_case = LINK_RULES[_RULE_GROUPS[group]]
+    canonical_id = match.group(group + 1)
+    return LinkInfo(platform, kind, canonical_id.lower() if fold_case else canonical_id)
+
+
+# Протокол и хост ссылки (протокол пользователи часто не указывают)
+_SCHEME_HOST = re.compile(r'\s*(?:(https?)://)?([^/?#\s]*)', re.IGNORECASE)
+
+# Виды ссылок YouTube на одно и то же видео (у эфиров и shorts тот же ID, что у видео)
+_SAME_KIND = {('youtube', 'live'): 'video', ('youtube', 'shorts'): 'video'}
+
+# Ссылки, которые не указывают на конкретную публикацию (эфир TikTok всегда @user/live)
+_NOT_CONTENT = {('tiktok', 'live')}
+
+
+def normalize_url(url: str) -> str:
+    """Приводит протокол и хост ссылки к нижнему регистру и добавляет https://, если протокола нет"""
+    match = _SCHEME_HOST.match(url)
+    scheme, host = match.groups()
+    if scheme is None and '.' not in host:
+        # Без протокола и без домена это не ссылка, а просто текст
+        return url
+    return f"{(scheme or 'https').lower()}://{host.lower()}{url[match.end():].rstrip()}"
+
+
+@lru_cache(maxsize=4096)
+def canonical_key(url: str) -> Optional[str]:
+    """Ключ ссылки для поиска дублей: "платформа:вид:идентификатор" (None - это не ссылка)"""
+    info = classify(normalize_url(url))
+    if info is None:
+        return None
+
+    canonical_id = info.canonical_id
+    if info.platform == 'other':
+        # Для прочих сайтов идентификатор - адрес без www., якоря и завершающего слеша
+        canonical_id = canonical_id.split('#', 1)[0].rstrip('/')
+        if canonical_id.startswith('www.'):
+            canonical_id = canonical_id[4:]
+    kind = _SAME_KIND.get((info.platform, info.kind), info.kind)
+    return f"{info.platform}:{kind}:{canonical_id}"
+
+
+def content_key(url: str) -> Optional[str]:
+    """Ключ публикации для поиска повторных заявок (None - по ссылке публикацию не отличить)"""
+    info = classify(normalize_url(url))
+    if info is None or (info.platform, info.kind) in _NOT_CONTENT:
+        return None
+    return canonical_key(url)
@@ -0,0 +1,44 @@
+import asyncio
+import logging
+from typing import Dict, Set
+
+from aiogram import Bot
+
+from .message_utils import safe_send_message
+from .outbound import PRIORITY_BULK, send_priority
+
+logger = logging.getLogger('bot_logger')
+
+# Фоновые рассылки уведомлений (ссылки нужны, чтобы задачи не удалил сборщик мусора)
+_background: Set[asyncio.Task] = set()
+
+
+async def send_notifications(bot: Bot, messages: Dict[int, str], concurrency: int = 10) -> int:
+    """
+    Отправляет пользователям уведомления с приоритетом массовых сообщений.
+
+    Args:
+        messages: Текст уведомления для каждого Telegram ID
+
+    Returns:
+        Количество доставленных уведомлений
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def send(user_id: int, text: str) -> bool:
+        async with semaphore:
+            return await safe_send_message(bot, user_id, text, disable_web_page_preview=True)
+
+    with send_priority(PRIORITY_BULK):
+        results = await asyncio.gather(*(send(user_id, text) for user_id, text in messages.items()))
+    delivered = sum(results)
+    logger.info(f"Notifications delivered: {delivered} of {len(messages)}")
+    return delivered
+
+
+def notify_in_background(bot: Bot, messages: Dict[int, str], concurrency: int = 10) -> asyncio.Task:
+    """Запускает отправку уведомлений, не дожидаясь ее окончания"""
+    task = asyncio.create_task(send_notifications(bot, messages, concurrency))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+    return task
@@ -0,0 +1,235 @@
+"""
+Планировщик исходящих запросов к Bot API.
+
+Все отправки и редактирования сообщений проходят через middleware сессии
+бота. Перед запросом ожидается токен из корзины чата (Telegram допускает
+около одного сообщения в секунду в личный чат и 20 в минуту в группу) и
+из общей корзины бота (около 30 сообщений в секунду). Общие токены
+выдаются по приоритету: ответы администраторам, затем обычные ответы
+пользователям, затем массовые рассылки. При ответе 429 запрос повторяется
+после retry_after, а чат на это время приостанавливается. Если 429 почти
+одновременно получили несколько разных чатов, это лимит всего бота (волна
+одобрений или рассылка), и на retry_after приостанавливается общая
+корзина, чтобы остальные запросы не получали 429 один за другим.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+logger = logging.getLogger('bot_logger')
+
+# Классы приоритета: меньше - важнее
+PRIORITY_ADMIN = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+
+_priority: ContextVar[int] = ContextVar('outbound_priority', default=PRIORITY_NORMAL)
+
+
+@contextmanager
+def send_priority(priority: int) -> Iterator[None]:
+    """Задает приоритет всех запросов к Bot API внутри блока"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """Корзина токенов: rate токенов в секунду, не более capacity подряд"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+
+    def delay(self) -> float:
+        """Сколько секунд ждать до появления токена (0 - токен есть)"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def block(self, seconds: float):
+        """Приостанавливает выдачу токенов (после ответа 429)"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+
+class OutboundScheduler(BaseRequestMiddleware):
+    """Middleware сессии бота, ограничивающее частоту исходящих сообщений"""
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        group_rate: float = 20 / 60,
+        burst: int = 3,
+        max_retries: int = 3,
+        admin_ids: Iterable[int] = (),
+        max_tracked_chats: int = 10_000,
+        flood_chats: int = 3,
+        flood_window: float = 1.0
+    ):
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.burst = burst
+        self.max_retries = max_retries
+        # Сколько разных чатов должны получить 429 за flood_window секунд, чтобы остановить весь бот
+        self.flood_chats = max(1, flood_chats)
+        self.flood_window = flood_window
+        self.admin_ids = set(admin_ids)
+        self.max_tracked_chats = max_tracked_chats
+
+        self._global = TokenBucket(global_rate, max(1, burst))
+        self._chats: "OrderedDict[int, TokenBucket]" = OrderedDict()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._pump_task: Optional[asyncio.Task] = None
+        # Чат -> время последнего ответа 429 (только за последние flood_window секунд)
+        self._flooded_chats: Dict[int, float] = {}
+
+        # Счетчики для мониторинга
+        self._waiting_chat = 0
+        self._retries = 0
+        self._failed = 0
+        self._global_pauses = 0
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # Отрицательные ID - группы и каналы, у них лимит жестче
+            rate = self.group_rate if chat_id < 0 else self.chat_rate
+            bucket = TokenBucket(rate, self.burst)
+            self._chats[chat_id] = bucket
+            while len(self._chats) > self.max_tracked_chats:
+                self._chats.popitem(last=False)
+        else:
+            self._chats.move_to_end(chat_id)
+        return bucket
+
+    async def _acquire_chat(self, chat_id: int):
+        """Ожидает токен корзины чата"""
+        bucket = self._chat_bucket(chat_id)
+        self._waiting_chat += 1
+        try:
+            while (delay := bucket.delay()) > 0:
+                await asyncio.sleep(delay)
+            bucket.take()
+        finally:
+            self._waiting_chat -= 1
+
+    async def _acquire_global(self, priority: int):
+        """Ожидает токен общей корзины в порядке приоритета"""
+        if not self._waiters and self._global.delay() == 0:
+            self._global.take()
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+        await future
+
+    async def _pump(self):
+        """Выдает общие токены ожидающим запросам, начиная с самых приоритетных"""
+        while self._waiters:
+            # Отмененные ожидания не должны тратить токены
+            if self._waiters[0][2].done():
+                heapq.heappop(self._waiters)
+                continue
+            delay = self._global.delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            self._global.take()
+            _, _, future = heapq.heappop(self._waiters)
+            future.set_result(None)
+
+    def _on_retry_after(self, chat_id: int, retry_after: float):
+        """Приостанавливает чат после ответа 429, а при 429 в нескольких чатах сразу - весь бот"""
+        self._chat_bucket(chat_id).block(retry_after)
+
+        now = time.monotonic()
+        self._flooded_chats[chat_id] = now
+        for flooded_id, flooded_at in list(self._flooded_chats.items()):
+            if now - flooded_at > self.flood_window:
+                del self._flooded_chats[flooded_id]
+        if len(self._flooded_chats) < self.flood_chats:
+            return
+
+        if self._global.blocked_until < now + retry_after:
+            self._global_pauses += 1
+            logger.warning(
+                f"Flood control in {len(self._flooded_chats)} chats at once, "
+                f"pausing all outgoing messages for {retry_after}s"
+            )
+        self._global.block(retry_after)
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, 'chat_id', None)
+        if not isinstance(chat_id, int):
+            # Служебные запросы (getUpdates, answerCallbackQuery и т.д.) не ограничиваем
+            return await make_request(bot, method)
+
+        priority = PRIORITY_ADMIN if chat_id in self.admin_ids else _priority.get()
+        for attempt in range(self.max_retries + 1):
+            await self._acquire_chat(chat_id)
+            await self._acquire_global(priority)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt == self.max_retries:
+                    self._failed += 1
+                    raise
+                self._retries += 1
+                logger.warning(
+                    f"Flood control on {type(method).__name__} to chat {chat_id}, "
+                    f"retrying in {e.retry_after}s"
+                )
+                self._on_retry_after(chat_id, e.retry_after)
+
+    def stats(self) -> Dict[str, int]:
+        """Возвращает глубину очередей для мониторинга"""
+        return {
+            'waiting_chat': self._waiting_chat,
+            'waiting_global': sum(1 for _, _, future in self._waiters if not future.done()),
+            'retries': self._retries,
+            'failed': self._failed,
+            'global_pauses': self._global_pauses,
+            'tracked_chats': len(self._chats)
+        }
+
+
+def get_scheduler(bot) -> Optional[OutboundScheduler]:
+    """Возвращает планировщик, подключенный к сессии бота"""
+    for middleware in bot.session.middleware:
+        if isinstance(middleware, OutboundScheduler):
+            return middleware
+    return None
@@ -0,0 +1,220 @@
+"""
+Горизонтальное масштабирование обработки обновлений.
+
+Один процесс-приемник получает обновления (long polling или webhook) и
+раскладывает их по рабочим процессам по ID пользователя. Каждый рабочий
+процесс поднимает свой бот, пул соединений и диспетчер со всеми
+роутерами. Все обновления пользователя попадают в один процесс и там -
+в одну полосу UpdateLanes, поэтому шаги FSM-сценариев не перемешиваются,
+а тяжелые обработчики одного пользователя не останавливают остальных.
+"""
+import asyncio
+import logging
+import multiprocessing
+import queue
+import signal
+from typing import Any, Dict, List, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.exceptions import TelegramAPIError, TelegramNetworkError
+
+from bootstrap import create_bot, create_database, build_dispatcher
+from config.config import Config
+from config.logger import setup_logger, shutdown_logger
+from .update_lanes import UpdateLanes, get_update_user_id
+from .webhook import WebhookServer
+
+logger = logging.getLogger('bot_logger')
+
+# Сколько ждать места в очереди рабочего процесса, прежде чем снова проверить, что он жив (секунды)
+PUT_TIMEOUT = 5.0
+
+
+async def _run_worker(index: int, updates: multiprocessing.Queue, config: Config):
+    """Обрабатывает обновления, присланные процессом-приемником"""
+    db = create_database(config)
+    bot = create_bot(config)
+    # Прерванные рассылки продолжает только первый процесс, иначе они уйдут несколько раз
+    dp = build_dispatcher(config, db, resume_broadcasts=index == 0)
+    lanes = UpdateLanes(dp, bot, lanes=config.sharding.lanes, queue_size=config.sharding.queue_size)
+
+    await dp.emit_startup(bot=bot)
+    lanes.start()
+    logger.info(f"Worker {index} started")
+
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            update = await loop.run_in_executor(None, updates.get)
+            if update is None:
+                break
+            await lanes.put(update)
+    finally:
+        await lanes.stop()
+        await dp.emit_shutdown(bot=bot)
+        await bot.session.close()
+        await db.close()
+        logger.info(f"Worker {index} stopped")
+
+
+def _worker_main(index: int, updates: multiprocessing.Queue, config: Config):
+    """Точка входа рабочего процесса"""
+    # Остановкой управляет приемник: Ctrl+C не должен прерывать обработку на середине
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    setup_logger(config=config.logging)
+    try:
+        asyncio.run(_run_worker(index, updates, config))
+    finally:
+        # Рабочий процесс завершается без atexit, поэтому очередь логов дописываем сами
+        shutdown_logger()
+
+
+class ShardedRunner:
+    """Рабочие процессы и очереди обновлений к ним"""
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.processes_count = max(1, config.sharding.processes)
+        self._context = multiprocessing.get_context('spawn')
+        self._queue_size = max(1, config.sharding.queue_size // self.processes_count)
+        self._queues: List[multiprocessing.Queue] = []
+        self._processes: List[multiprocessing.Process] = []
+
+    def _spawn(self, index: int):
+        """Запускает рабочий процесс index с новой очередью"""
+        updates = self._context.Queue(maxsize=self._queue_size)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(index, updates, self.config),
+            name=f"bot-worker-{index}",
+            daemon=True
+        )
+        process.start()
+        if index < len(self._processes):
+            self._queues[index] = updates
+            self._processes[index] = process
+        else:
+            self._queues.append(updates)
+            self._processes.append(process)
+
+    def start(self):
+        """Запускает рабочие процессы"""
+        for index in range(self.processes_count):
+            self._spawn(index)
+        logger.info(f"Started {self.processes_count} worker processes")
+
+    def _ensure_alive(self, index: int):
+        """Перезапускает рабочий процесс, если он завершился (обновления в его очереди теряются)"""
+        process = self._processes[index]
+        if process.is_alive():
+            return
+        logger.error(
+            f"Worker {process.name} died with exit code {process.exitcode}, restarting it; "
+            f"its queued updates are lost"
+        )
+        # Очередь мертвого процесса никто не прочитает: не ждем ее сброса при выходе
+        self._queues[index].cancel_join_thread()
+        self._spawn(index)
+
+    def _index_for(self, update: Dict[str, Any]) -> int:
+        return get_update_user_id(update) % self.processes_count
+
+    def submit(self, update: Dict[str, Any]) -> bool:
+        """Передает обновление рабочему процессу (False - его очередь заполнена)"""
+        index = self._index_for(update)
+        self._ensure_alive(index)
+        try:
+            self._queues[index].put_nowait(update)
+            return True
+        except queue.Full:
+            return False
+
+    async def put(self, update: Dict[str, Any]):
+        """Передает обновление рабочему процессу, дожидаясь места в его очереди"""
+        index = self._index_for(update)
+        loop = asyncio.get_running_loop()
+        while True:
+            self._ensure_alive(index)
+            try:
+                await loop.run_in_executor(None, self._queues[index].put, update, True, PUT_TIMEOUT)
+                return
+            except queue.Full:
+                logger.warning(f"Worker {self._processes[index].name} queue is full, waiting...")
+
+    async def stop(self, timeout: float = 30.0):
+        """Просит рабочие процессы завершиться после обработки принятых обновлений"""
+        loop = asyncio.get_running_loop()
+        for process, updates in zip(self._processes, self._queues):
+            if not process.is_alive():
+                updates.cancel_join_thread()
+                continue
+            try:
+                updates.put_nowait(None)
+            except queue.Full:
+                logger.warning(f"Worker {process.name} queue is full, it will be terminated after {timeout}s")
+        for process, updates in zip(self._processes, self._queues):
+            await loop.run_in_executor(None, process.join, timeout)
+            if process.is_alive():
+                logger.warning(f"Worker {process.name} did not stop in {timeout}s, terminating")
+                process.terminate()
+                updates.cancel_join_thread()
+        self._processes.clear()
+        self._queues.clear()
+
+
+async def _poll(bot: Bot, runner: ShardedRunner, allowed_updates: Optional[List[str]]):
+    """Получает обновления long polling'ом и передает их рабочим процессам"""
+    offset = None
+    delay = 1.0
+    while True:
+        try:
+            updates = await bot.get_updates(offset=offset, timeout=30, allowed_updates=allowed_updates)
+            delay = 1.0
+        except TelegramNetworkError as e:
+            logger.error(f"Network error while polling: {e}. Retrying in {delay:.0f} seconds...")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+            continue
+        except TelegramAPIError as e:
+            # 5xx и 409 Conflict временные: приемник не должен останавливать рабочие процессы
+            logger.error(f"Telegram API error while polling: {e}. Retrying in {delay:.0f} seconds...")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+            continue
+        except Exception as e:
+            logger.error(f"Unexpected error while polling: {e}. Retrying in {delay:.0f} seconds...")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+            continue
+
+        for update in updates:
+            offset = update.update_id + 1
+            await runner.put(update.model_dump(mode='json', exclude_none=True, by_alias=True))
+
+
+async def run_sharded(config: Config, bot: Bot, dp: Dispatcher):
+    """Запускает рабочие процессы и принимает для них обновления до остановки процесса"""
+    runner = ShardedRunner(config)
+    runner.start()
+    allowed_updates = dp.resolve_used_update_types()
+
+    try:
+        if config.bot.mode == 'webhook':
+            server = WebhookServer(
+                bot,
+                runner.submit,
+                path=config.webhook.path,
+                secret_token=config.webhook.secret or None
+            )
+            await server.start(config.webhook.host, config.webhook.port)
+            try:
+                await server.register(config.webhook.url, allowed_updates=allowed_updates)
+                await asyncio.Event().wait()
+            finally:
+                await server.stop()
+        else:
+            # Long polling требует, чтобы webhook не был установлен
+            await bot.delete_webhook()
+            await _poll(bot, runner, allowed_updates)
+    finally:
+        await runner.stop()
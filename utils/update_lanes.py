@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+from aiogram import Bot, Dispatcher
+
+logger = logging.getLogger('bot_logger')
+
+
+def get_update_user_id(update: Dict[str, Any]) -> int:
+    """Возвращает ID автора обновления из сырого JSON (0, если автора нет)"""
+    for value in update.values():
+        if isinstance(value, dict):
+            author = value.get('from') or value.get('user')
+            if isinstance(author, dict) and 'id' in author:
+                return author['id']
+    return 0
+
+
+class UpdateLanes:
+    """
+    Параллельная обработка обновлений с сохранением порядка для каждого пользователя.
+
+    Обновления раскладываются по ограниченным очередям ("полосам") по ID
+    автора. Каждую полосу обрабатывает своя задача строго по порядку,
+    поэтому шаги одного FSM-сценария не обгоняют друг друга, а разные
+    пользователи обрабатываются параллельно.
+    """
+
+    def __init__(self, dp: Dispatcher, bot: Bot, lanes: int = 8, queue_size: int = 1_000):
+        self.dp = dp
+        self.bot = bot
+        self.lanes_count = max(1, lanes)
+        self.queue_size = max(self.lanes_count, queue_size)
+
+        self._queues: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+        self._failed = 0
+
+    def _queue_for(self, update: Dict[str, Any]) -> asyncio.Queue:
+        return self._queues[get_update_user_id(update) % self.lanes_count]
+
+    def submit(self, update: Dict[str, Any]) -> bool:
+        """Ставит обновление в очередь (False - очередь заполнена)"""
+        try:
+            self._queue_for(update).put_nowait(update)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def put(self, update: Dict[str, Any]):
+        """Ставит обновление в очередь, дожидаясь свободного места"""
+        await self._queue_for(update).put(update)
+
+    async def _worker(self, queue: asyncio.Queue):
+        """Обрабатывает обновления своей очереди по одному"""
+        while True:
+            update = await queue.get()
+            try:
+                await self.dp.feed_raw_update(self.bot, update)
+            except Exception as e:
+                self._failed += 1
+                logger.error(f"Failed to process update {update.get('update_id')}: {e}")
+            finally:
+                queue.task_done()
+
+    def start(self):
+        """Запускает задачи-обработчики"""
+        per_lane = self.queue_size // self.lanes_count
+        self._queues = [asyncio.Queue(maxsize=per_lane) for _ in range(self.lanes_count)]
+        self._workers = [asyncio.create_task(self._worker(queue)) for queue in self._queues]
+
+    async def stop(self, drain_timeout: float = 10.0):
+        """Дожидается обработки уже принятых обновлений и останавливает обработчики"""
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues)),
+                drain_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Update queues were not drained before shutdown")
+
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> Dict[str, int]:
+        """Возвращает загрузку очередей для мониторинга"""
+        return {
+            'failed': self._failed,
+            'queue_depth': sum(queue.qsize() for queue in self._queues)
+        }
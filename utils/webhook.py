@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import secrets
+from typing import Any, Callable, Dict, Optional
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+
+from .update_lanes import UpdateLanes
+
+logger = logging.getLogger('bot_logger')
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookServer:
+    """
+    Прием обновлений от Telegram через webhook.
+
+    Запрос проверяется по секретному токену и сразу подтверждается, а
+    обновление передается в submit (очереди обработчиков этого процесса
+    или рабочих процессов). Если submit вернул False - очереди заполнены,
+    Telegram получает 503 и повторит доставку позже.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        submit: Callable[[Dict[str, Any]], bool],
+        path: str = "/webhook",
+        secret_token: Optional[str] = None
+    ):
+        self.bot = bot
+        self.submit = submit
+        self.path = path
+        # Без секрета любой, кто достучится до порта, сможет прислать обновление от имени админа,
+        # поэтому если секрет не задан, генерируем случайный (Telegram получит его в set_webhook)
+        if not secret_token:
+            secret_token = secrets.token_urlsafe(32)
+            logger.warning("WEBHOOK_SECRET is not set, using a random secret token for this run")
+        self.secret_token = secret_token
+        self._runner: Optional[web.AppRunner] = None
+
+        # Счетчики для мониторинга
+        self._received = 0
+        self._rejected = 0
+
+    def build_app(self) -> web.Application:
+        """Создает aiohttp-приложение с обработчиком webhook"""
+        app = web.Application()
+        app.router.add_post(self.path, self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Принимает обновление от Telegram"""
+        if not secrets.compare_digest(request.headers.get(SECRET_HEADER, ""), self.secret_token):
+            return web.Response(status=401, text="Unauthorized")
+
+        try:
+            update = await request.json(loads=self.bot.session.json_loads)
+        except ValueError:
+            return web.Response(status=400, text="Bad Request")
+        if not isinstance(update, dict):
+            return web.Response(status=400, text="Bad Request")
+
+        if not self.submit(update):
+            self._rejected += 1
+            logger.warning(f"Update queue is full, update {update.get('update_id')} rejected")
+            return web.Response(status=503, text="Busy")
+
+        self._received += 1
+        return web.Response(status=200)
+
+    async def start(self, host: str, port: int):
+        """Запускает HTTP-сервер"""
+        self._runner = web.AppRunner(self.build_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info(f"Webhook server listening on {host}:{port}{self.path}")
+
+    async def stop(self):
+        """Останавливает прием обновлений"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def register(self, url: str, allowed_updates=None):
+        """Сообщает Telegram адрес webhook"""
+        await self.bot.set_webhook(
+            url=f"{url.rstrip('/')}{self.path}",
+            secret_token=self.secret_token,
+            allowed_updates=allowed_updates
+        )
+        logger.info("Webhook registered, waiting for updates...")
+
+    def stats(self) -> Dict[str, int]:
+        """Возвращает количество принятых и отклоненных обновлений"""
+        return {
+            'received': self._received,
+            'rejected': self._rejected
+        }
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot, config) -> None:
+    """Регистрирует webhook в Telegram и обрабатывает обновления до остановки процесса"""
+    lanes = UpdateLanes(dp, bot, lanes=config.workers, queue_size=config.queue_size)
+    server = WebhookServer(bot, lanes.submit, path=config.path, secret_token=config.secret or None)
+
+    await dp.emit_startup(bot=bot)
+    lanes.start()
+    try:
+        await server.start(config.host, config.port)
+        await server.register(config.url, allowed_updates=dp.resolve_used_update_types())
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+        await lanes.stop()
+        await dp.emit_shutdown(bot=bot)